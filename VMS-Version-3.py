@@ -1,26 +1,60 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox, simpledialog, filedialog
+import csv
 import json
-from collections import deque
+import lzma
+import zlib
+import random
+import os
+import sys
+import time
+import hmac
+import hashlib
+import re
+import argparse
+import tempfile
+import heapq
+import uuid
+import bisect
+import queue
+import smtplib
+import socket
+import threading
+import weakref
+import warnings
+import tracemalloc
+import multiprocessing
+import socketserver
+from email.message import EmailMessage
+from datetime import date, datetime
+from collections import Counter, deque, namedtuple
+from collections.abc import Sequence
+from itertools import chain, islice
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
 
 # Base class for all users, storing common attributes including disabilities
 class Person:
     """Base class for all users."""
-    def __init__(self, name, email, phone, age, username, password, role, disabilities=""):
+    def __init__(self, name, email, phone, age, username, password, role, disabilities="", location="", accessibility=None):
         self.name = name           # Stores full name
         self.email = email         # Stores email address
         self.phone = phone         # Stores phone number
         self.age = int(age)        # Converts age to integer and stores it
         self.username = username    # Stores unique username
-        self.password = password    # Stores password 
+        self.password = password    # Stores password hash (or legacy plaintext until next login)
         self.role = role           # Stores user role 
         self.disabilities = disabilities  # Stores optional disabilities information
+        self.location = location   # Stores optional home town or area
+        # Structured accessibility needs (see ACCESSIBILITY_TAGS); derived from the free text if not given
+        self.accessibility = accessibility_tags(disabilities) if accessibility is None else clean_accessibility(accessibility)
 
 # Volunteer class, inherits from Person, for users who apply to opportunities
 class Volunteer(Person):
     """Volunteer user: can apply to opportunities and view own applications."""
-    def __init__(self, name, email, phone, age, username, password, disabilities=""):
-        super().__init__(name, email, phone, age, username, password, role="Volunteer", disabilities=disabilities)
+    def __init__(self, name, email, phone, age, username, password, disabilities="", location="", accessibility=None):
+        super().__init__(name, email, phone, age, username, password, role="Volunteer", disabilities=disabilities,
+                         location=location, accessibility=accessibility)
         self.my_applications = []  # Initializes an empty list to store the volunteer's applications
 
     # Method to apply for a volunteer opportunity
@@ -33,18 +67,26 @@ class Volunteer(Person):
 # Recruit class, inherits from Person, for users who manage opportunities and applications
 class Recruit(Person):
     """Recruiter user: can post opportunities and review applications."""
-    def __init__(self, name, email, phone, age, username, password, disabilities=""):
-        super().__init__(name, email, phone, age, username, password, role="Recruit", disabilities=disabilities)
+    def __init__(self, name, email, phone, age, username, password, disabilities="", location="", accessibility=None):
+        super().__init__(name, email, phone, age, username, password, role="Recruit", disabilities=disabilities,
+                         location=location, accessibility=accessibility)
 
 # Class to represent a volunteer opportunity
 class VolunteerOpportunity:
     """Represents an opportunity posted by a recruiter."""
-    def __init__(self, title, description, location, date, posted_by):
+    def __init__(self, title, description, location, date, posted_by, capacity=None, start=None, end=None, accessibility=None):
         self.title = title             # Stores opportunity title
         self.description = description # Stores opportunity description
         self.location = location       # Stores opportunity location
         self.date = date               # Stores opportunity date
         self.posted_by = posted_by     # Stores username of the user who posted the opportunity
+        self.capacity = capacity       # Maximum accepted volunteers (None means unlimited)
+        self.archived_accepted = 0     # Accepted applications moved to the cold store, still holding slots
+        self.start = start             # Start time "YYYY-MM-DD HH:MM" (None: the whole day of date)
+        self.end = end                 # End time "YYYY-MM-DD HH:MM"
+        self.closed = False            # Set once the opportunity has ended (see expire_opportunities)
+        # Accessibility provisions (see ACCESSIBILITY_TAGS); only what the recruiter declared, never guessed from the description
+        self.accessibility = set() if accessibility is None else clean_accessibility(accessibility)
 
 # Class to represent a volunteer application
 class VolunteerApplication:
@@ -54,15 +96,2183 @@ class VolunteerApplication:
         self.opportunity_title = opportunity_title  # Stores title of the opportunity
         self.posted_by = posted_by             # Stores username of the opportunity poster
         self.status = "Pending"                # Sets initial application status to "Pending"
+        self.updated_at = time.time()          # When the status last changed (None for legacy records)
+        self.app_id = uuid.uuid4().hex         # Stable identifier used by the status history
+
+# PASSWORD HASHING
+# Stored hashes look like "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>".
+# hashlib.pbkdf2_hmac releases the GIL, so a thread pool spreads hashing across cores.
+HASH_SCHEME = "pbkdf2_sha256"
+DEFAULT_HASH_ITERATIONS = 200_000  # Cost factor; raise it as hardware gets faster
+SALT_BYTES = 16
+
+# Hashes a password with a fresh random salt
+def hash_password(password, iterations=DEFAULT_HASH_ITERATIONS):
+    salt = os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{HASH_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+# Returns True if the stored value is a hash produced by hash_password
+def is_password_hash(stored):
+    return isinstance(stored, str) and stored.startswith(HASH_SCHEME + "$") and stored.count("$") == 3
+
+# Checks a password against a stored hash (or a legacy plaintext value); a malformed hash never matches
+def verify_password(password, stored):
+    if not is_password_hash(stored):
+        return hmac.compare_digest(password.encode("utf-8"), str(stored).encode("utf-8"))
+    _, iterations, salt_hex, digest_hex = stored.split("$")
+    try:
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt_hex), int(iterations))
+    except ValueError:
+        return False  # Bad iteration count or salt hex
+    return hmac.compare_digest(digest.hex(), digest_hex)
+
+# Returns True if a stored value should be re-hashed (plaintext or an outdated cost factor)
+def password_needs_rehash(stored, iterations):
+    if not is_password_hash(stored):
+        return True
+    return int(stored.split("$")[1]) != iterations
+
+# DATE AND TAG HELPERS
+OPP_DATE_FORMATS = ("%d/%m/%y", "%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y")
+
+# Parses an opportunity date string; returns None for free-text dates such as "TBC"
+def parse_opp_date(text):
+    for fmt in OPP_DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), fmt).date()
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+OPP_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Returns an opportunity's (start, end) as epoch seconds; whole day if no times are set, None if undatable
+def opportunity_interval(opp):
+    if opp.start and opp.end:
+        try:
+            return (datetime.strptime(opp.start, OPP_TIME_FORMAT).timestamp(),
+                    datetime.strptime(opp.end, OPP_TIME_FORMAT).timestamp())
+        except ValueError:
+            pass
+    day = parse_opp_date(opp.date)
+    if day is None:
+        return None
+    start = datetime(day.year, day.month, day.day).timestamp()
+    return start, start + 86400
+
+# Keywords that map a user's free-text disabilities onto accessibility tags
+ACCESSIBILITY_KEYWORDS = {
+    "wheelchair": ("wheelchair", "mobility", "step-free", "step free", "ramp"),
+    "visual": ("blind", "visual", "vision", "sight"),
+    "hearing": ("deaf", "hearing", "sign language"),
+    "sensory": ("autism", "autistic", "sensory", "quiet"),
+    "seated": ("seated", "sitting", "chronic pain", "fatigue"),
+}
+
+ACCESSIBILITY_TAGS = tuple(ACCESSIBILITY_KEYWORDS)  # Structured tags stored on users (needs) and opportunities (provisions)
+
+# Whole-word patterns per tag (so "supervision" is not "vision" and "trample" is not "ramp"); plurals still match
+ACCESSIBILITY_PATTERNS = {tag: re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")s?\b") for tag, words in ACCESSIBILITY_KEYWORDS.items()}
+
+# Derives a set of accessibility tags from free text
+def accessibility_tags(text):
+    text = (text or "").lower()
+    return {tag for tag, pattern in ACCESSIBILITY_PATTERNS.items() if pattern.search(text)}
+
+# Returns tags as a set, raising ValueError for any that are not in ACCESSIBILITY_TAGS
+def clean_accessibility(tags):
+    tags = set(tags)
+    unknown = tags - set(ACCESSIBILITY_TAGS)
+    if unknown:
+        raise ValueError(f"Unknown accessibility tag(s): {', '.join(sorted(unknown))}.")
+    return tags
+
+# Normalizes a location to a facet value: the part before the first comma, case-folded with spaces collapsed
+def normalize_location(text):
+    return " ".join((text or "").split(",")[0].replace(".", " ").split()).casefold()
+
+# FACETED FILTERING
+# Returns the location facet value of a user or opportunity (none if it has no location)
+def location_facet(item):
+    location = normalize_location(item.location)
+    return (location,) if location else ()
+
+BITMAP_CHUNK_BITS = 10  # Rows per bitmap chunk is 2**10; chunks holding no rows are not stored
+BITMAP_CHUNK_MASK = (1 << BITMAP_CHUNK_BITS) - 1
+
+class Bitmap:
+    """Compressed set of row numbers: chunk number -> int bitset of that chunk's rows.
+
+    Sparse values only pay for the chunks they touch, and intersections, unions and counts run as
+    C-level integer operations per chunk rather than per row."""
+    __slots__ = ("_chunks",)
+
+    def __init__(self, rows=(), chunks=None):
+        self._chunks = {} if chunks is None else chunks
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        high = row >> BITMAP_CHUNK_BITS
+        self._chunks[high] = self._chunks.get(high, 0) | (1 << (row & BITMAP_CHUNK_MASK))
+
+    def discard(self, row):
+        high = row >> BITMAP_CHUNK_BITS
+        bits = self._chunks.get(high, 0) & ~(1 << (row & BITMAP_CHUNK_MASK))
+        if bits:
+            self._chunks[high] = bits
+        else:
+            self._chunks.pop(high, None)
+
+    def __contains__(self, row):
+        return bool(self._chunks.get(row >> BITMAP_CHUNK_BITS, 0) >> (row & BITMAP_CHUNK_MASK) & 1)
+
+    def __and__(self, other):
+        small, large = sorted((self._chunks, other._chunks), key=len)
+        chunks = {}
+        for high, bits in small.items():
+            both = bits & large.get(high, 0)
+            if both:
+                chunks[high] = both
+        return Bitmap(chunks=chunks)
+
+    def __or__(self, other):
+        chunks = dict(self._chunks)
+        for high, bits in other._chunks.items():
+            chunks[high] = chunks.get(high, 0) | bits
+        return Bitmap(chunks=chunks)
+
+    def __eq__(self, other):
+        return isinstance(other, Bitmap) and self._chunks == other._chunks
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self._chunks.values())
+
+    def __bool__(self):
+        return bool(self._chunks)
+
+    # Yields rows in ascending order
+    def __iter__(self):
+        for high in sorted(self._chunks):
+            base = high << BITMAP_CHUNK_BITS
+            bits = bin(self._chunks[high])[:1:-1]  # Lowest bit first
+            row = bits.find("1")
+            while row >= 0:
+                yield base + row
+                row = bits.find("1", row + 1)
+
+class FacetIndex:
+    """Bitmap per facet value over one collection's rows (positions in its list).
+
+    facets maps a facet name to a function returning an item's values. Values of a facet listed in multi (such
+    as accessibility tags) must all be present on a row; values of any other facet are alternatives. Each row's
+    current values are kept (as a shared tuple, since most rows repeat a few combinations) so an update only
+    touches the bitmaps that changed."""
+    def __init__(self, facets, multi=(), key=None):
+        self.facets = facets
+        self.multi = set(multi)
+        self.key = key  # Optional function naming an item (e.g. its username), for row_of
+        self.rebuild(())
+
+    # Re-indexes a whole collection
+    def rebuild(self, items):
+        self._bitmaps = {name: {} for name in self.facets}  # facet -> value -> Bitmap
+        self._values = []   # row -> tuple of frozensets, one per facet
+        self._shared = {}   # Interned value tuples
+        self._rows = {}     # key -> first row with that key
+        self.all = Bitmap()
+        for item in items:
+            self.add(item)
+
+    # Indexes an item appended to the collection; returns its row
+    def add(self, item):
+        row = len(self._values)
+        self._values.append((frozenset(),) * len(self.facets))
+        self.all.add(row)
+        if self.key is not None:
+            self._rows.setdefault(self.key(item), row)
+        self.update(row, item)
+        return row
+
+    # Re-reads an item's facet values after it changed
+    def update(self, row, item):
+        old = self._values[row]
+        new = tuple(frozenset(values(item)) for values in self.facets.values())
+        new = self._shared.setdefault(new, new)
+        for name, before, after in zip(self.facets, old, new):
+            table = self._bitmaps[name]
+            for value in before - after:
+                table[value].discard(row)
+                if not table[value]:
+                    del table[value]
+            for value in after - before:
+                table.setdefault(value, Bitmap()).add(row)
+        self._values[row] = new
+
+    # Returns the row of the item with this key, or None
+    def row_of(self, key):
+        return self._rows.get(key)
+
+    # Returns the rows (within an optional bitmap) matching filters of the form {facet: values}
+    def select(self, filters, within=None):
+        result = self.all if within is None else within
+        for name, values in filters.items():
+            if not values:
+                continue
+            bitmaps = [self._bitmaps[name].get(value, Bitmap()) for value in values]
+            if name in self.multi:
+                for bitmap in bitmaps:
+                    result = result & bitmap
+            else:
+                union = Bitmap()
+                for bitmap in bitmaps:
+                    union = union | bitmap
+                result = result & union
+            if not result:
+                break
+        return result
+
+    # Returns {facet: {value: rows}} for the current selection; a facet whose values are alternatives is counted
+    # without its own filter, so the other choices still show how many rows they would give
+    def facet_counts(self, filters, within=None):
+        counts = {}
+        for name in self.facets:
+            own = name not in self.multi and filters.get(name)
+            base = self.select({k: v for k, v in filters.items() if k != name} if own else filters, within)
+            counts[name] = {}
+            for value, bitmap in self._bitmaps[name].items():
+                rows = len(bitmap & base)
+                if rows:
+                    counts[name][value] = rows
+        return counts
+
+    # Compares the bitmaps against a fresh index of the collection; returns mismatch descriptions
+    def verify(self, items, label):
+        expected = FacetIndex(self.facets, self.multi, self.key)
+        expected.rebuild(items)
+        problems = []
+        for name in self.facets:
+            mine, theirs = self._bitmaps[name], expected._bitmaps[name]
+            for value in set(mine) | set(theirs):
+                if mine.get(value, Bitmap()) != theirs.get(value, Bitmap()):
+                    problems.append(f"{label} facet {name}={value!r}: {len(mine.get(value, Bitmap()))} indexed, {len(theirs.get(value, Bitmap()))} actual")
+        return problems
+
+# RECOMMENDATION ENGINE
+class OpportunityRecommender:
+    """Scores opportunities for a volunteer and keeps per-volunteer candidate sets up to date.
+
+    Each cached volunteer keeps its profile next to its candidates, so scoring a new post costs
+    one _score call per cached volunteer; applying drops the entry and the next request rebuilds it."""
+    def __init__(self, system):
+        self.system = system
+        self._candidates = {}  # username -> (profile, {opportunity index: score})
+
+    # Builds the profile a volunteer is scored against
+    def _profile(self, volunteer):
+        applied = {(a.opportunity_title, a.posted_by) for a in volunteer.my_applications}
+        locations, recruiters = set(), set()
+        for opp in self.system.opportunities:
+            if (opp.title, opp.posted_by) in applied:
+                locations.add(normalize_location(opp.location))
+                recruiters.add(opp.posted_by)
+        return applied, locations, recruiters, volunteer.accessibility
+
+    # Scores one opportunity; None means it should not be recommended
+    def _score(self, opp, profile, today):
+        applied, locations, recruiters, needs = profile
+        if opp.closed or (opp.title, opp.posted_by) in applied:
+            return None  # Closed or already applied
+        when = parse_opp_date(opp.date)
+        if when is not None and when < today:
+            return None  # Already happened
+        score = 0.0
+        if normalize_location(opp.location) in locations:
+            score += 3.0
+        if opp.posted_by in recruiters:
+            score += 1.0
+        if when is not None:
+            score += 2.0 / (1 + (when - today).days / 7)  # Sooner events rank higher
+        if needs:
+            score += 2.0 * len(needs & opp.accessibility)
+        return score
+
+    # Scores every opportunity for a volunteer and caches the result
+    def _build(self, volunteer):
+        profile, today = self._profile(volunteer), date.today()
+        scores = {}
+        for i, opp in enumerate(self.system.opportunities):
+            score = self._score(opp, profile, today)
+            if score is not None:
+                scores[i] = score
+        self._candidates[volunteer.username] = (profile, scores)
+        return scores
+
+    # Returns the top-k (index, opportunity, score) tuples for a volunteer
+    def top_k(self, volunteer, k=10):
+        cached = self._candidates.get(volunteer.username)
+        scores = self._build(volunteer) if cached is None else cached[1]
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(i, self.system.opportunities[i], score) for i, score in best]
+
+    # Scores a newly posted opportunity into every cached candidate set
+    def opportunity_added(self, index):
+        opp, today = self.system.opportunities[index], date.today()
+        for profile, scores in self._candidates.values():
+            score = self._score(opp, profile, today)
+            if score is not None:
+                scores[index] = score
+
+    # Drops a volunteer's cached profile and candidates once they apply somewhere
+    def application_added(self, app):
+        self._candidates.pop(app.username, None)
+
+    # Drops a volunteer's cached candidates (their profile changed)
+    def invalidate(self, username=None):
+        if username is None:
+            self._candidates.clear()
+        else:
+            self._candidates.pop(username, None)
+
+# NEAR-DUPLICATE DETECTION
+DUPLICATE_SHINGLE = 4  # Characters per shingle
+
+class DuplicateOpportunityWarning(UserWarning):
+    """Issued by post_opportunity when the new post closely resembles existing ones."""
+
+# Returns the character shingles of an opportunity's normalized title, description and location
+def opportunity_shingles(title, description, location, k=DUPLICATE_SHINGLE):
+    text = " ".join(" ".join("".join(c if c.isalnum() else " " for c in part.lower()).split())
+                    for part in (title, description, location))
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+# Exact Jaccard similarity of two shingle sets
+def jaccard(a, b):
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if a or b else 1.0
+
+class DuplicateDetector:
+    """MinHash/LSH index over opportunity text for finding near-duplicate posts.
+
+    Signatures use one-permutation MinHash (each shingle is hashed once into one of num_bins bins,
+    empty bins borrow from the next filled one), split into bands; opportunities sharing a band are
+    candidates, confirmed by exact Jaccard similarity of their shingles, so a lookup only touches the
+    opportunities it collides with. The index catches up lazily as opportunities are appended."""
+    def __init__(self, system, threshold=0.7, num_bins=80, bands=16):
+        self.system = system
+        self.threshold = threshold  # Jaccard similarity at or above which two posts are duplicates
+        self.num_bins, self.bands, self.rows = num_bins, bands, num_bins // bands  # 16 x 5 finds ~95% of pairs at 0.7
+        self.invalidate()
+
+    # Forgets the index (the opportunity list was replaced)
+    def invalidate(self):
+        self._shingles = []  # Opportunity index -> shingle set
+        self._buckets = [{} for _ in range(self.bands)]  # Per band: band values -> [opportunity index, ...]
+
+    # Returns the LSH band keys of a shingle set's MinHash signature
+    def _band_keys(self, shingles):
+        n = self.num_bins
+        bins = [None] * n
+        for shingle in shingles:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+            slot, value = h % n, h // n
+            if bins[slot] is None or value < bins[slot]:
+                bins[slot] = value
+        # Densify: an empty bin takes the nearest filled bin to its right (wrapping), tagged with the distance
+        signature, nearest = list(bins), None
+        for i in range(2 * n - 1, -1, -1):
+            if bins[i % n] is not None:
+                nearest = (bins[i % n], i)
+            elif i < n:
+                signature[i] = (nearest[0], nearest[1] - i)
+        return [tuple(signature[i:i + self.rows]) for i in range(0, n, self.rows)]
+
+    # Indexes opportunities appended since the last call
+    def _catch_up(self):
+        opportunities = self.system.opportunities
+        for index in range(len(self._shingles), len(opportunities)):
+            opp = opportunities[index]
+            shingles = opportunity_shingles(opp.title, opp.description, opp.location)
+            self._shingles.append(shingles)
+            for band, key in zip(self._buckets, self._band_keys(shingles)):
+                band.setdefault(key, []).append(index)
+
+    # Returns (index, opportunity, similarity) for indexed opportunities resembling the given text, most similar first
+    def find(self, title, description, location):
+        self._catch_up()
+        shingles = opportunity_shingles(title, description, location)
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(shingles)):
+            candidates.update(band.get(key, ()))
+        matches = [(i, jaccard(shingles, self._shingles[i])) for i in candidates if self._comparable(shingles, self._shingles[i])]
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return [(i, self.system.opportunities[i], similarity) for i, similarity in matches if similarity >= self.threshold]
+
+    # Size bound: Jaccard can be no higher than the ratio of the smaller set to the larger
+    def _comparable(self, a, b):
+        return min(len(a), len(b)) >= self.threshold * max(len(a), len(b))
+
+    # Groups all opportunities into near-duplicate clusters; returns lists of (index, similarity to the first), largest first
+    def clusters(self):
+        self._catch_up()
+        parent = {}  # Union-find over opportunity indices; roots are the lowest index of their cluster
+        def root(i):
+            while parent.get(i, i) != i:
+                i = parent[i]
+            return i
+        for band in self._buckets:
+            for bucket in band.values():
+                representatives = []  # Compare against one member per cluster seen in this bucket, not every pair
+                for i in bucket:
+                    for rep in representatives:
+                        a, b = root(i), root(rep)
+                        if a == b or (self._comparable(self._shingles[i], self._shingles[rep])
+                                      and jaccard(self._shingles[i], self._shingles[rep]) >= self.threshold):
+                            if a != b:
+                                parent[max(a, b)] = min(a, b)
+                            break
+                    else:
+                        representatives.append(i)
+        groups = {}
+        for i in list(parent):
+            r = root(i)
+            groups.setdefault(r, {r}).add(i)
+        clusters = [[(i, jaccard(self._shingles[i], self._shingles[first])) for i in sorted(members)]
+                    for first, members in groups.items()]
+        return sorted(clusters, key=lambda c: (-len(c), c[0][0]))
+
+# STATUS COUNTERS
+APPLICATION_STATUSES = ("Pending", "Accepted", "Rejected", "Waitlisted")
+DECIDED_STATUSES = ("Accepted", "Rejected")  # Final decisions (waitlisting is not one)
+
+class StatusCounters:
+    """Pending/Accepted/Rejected counts per recruiter and per opportunity, updated on every mutation."""
+    def __init__(self):
+        self._by_recruiter = {}    # posted_by -> Counter of statuses
+        self._by_opportunity = {}  # (posted_by, opportunity title) -> Counter of statuses
+
+    # Adjusts both counters for one application by delta
+    def _bump(self, app, status, delta):
+        for table, key in ((self._by_recruiter, app.posted_by), (self._by_opportunity, (app.posted_by, app.opportunity_title))):
+            counts = table.setdefault(key, Counter())
+            counts[status] += delta
+            if counts[status] == 0:
+                del counts[status]
+
+    # Records a new application
+    def add(self, app):
+        self._bump(app, app.status, 1)
+
+    # Forgets an application that left the live queue
+    def remove(self, app):
+        self._bump(app, app.status, -1)
+
+    # Moves an application from one status to another
+    def change(self, app, old_status, new_status):
+        if old_status != new_status:
+            self._bump(app, old_status, -1)
+            self._bump(app, new_status, 1)
+
+    # Recounts everything from scratch
+    def rebuild(self, applications):
+        self._by_recruiter.clear()
+        self._by_opportunity.clear()
+        for app in applications:
+            self.add(app)
+
+    # Returns a dict of status -> count for one recruiter
+    def for_recruiter(self, recruit_username):
+        counts = self._by_recruiter.get(recruit_username, {})
+        return {status: counts.get(status, 0) for status in APPLICATION_STATUSES}
+
+    # Returns a dict of status -> count for one opportunity
+    def for_opportunity(self, posted_by, title):
+        counts = self._by_opportunity.get((posted_by, title), {})
+        return {status: counts.get(status, 0) for status in APPLICATION_STATUSES}
+
+    # Compares the counters against a full recount; returns a list of mismatch descriptions
+    def verify(self, applications):
+        expected = StatusCounters()
+        expected.rebuild(applications)
+        problems = []
+        for name, mine, theirs in (("recruiter", self._by_recruiter, expected._by_recruiter), ("opportunity", self._by_opportunity, expected._by_opportunity)):
+            for key in set(mine) | set(theirs):
+                if +mine.get(key, Counter()) != +theirs.get(key, Counter()):
+                    problems.append(f"{name} {key}: counted {dict(mine.get(key, {}))}, actual {dict(theirs.get(key, {}))}")
+        return problems
+
+# QUERIES
+QUERY_SORT_FIELDS = ("updated_at", "username", "posted_by", "opportunity_title", "status")
+QueryPlan = namedtuple("QueryPlan", "field values rows")  # Index bucket a query reads; None means a full scan
+
+class ApplicationIndex:
+    """Live applications bucketed by username, recruiter, (recruiter, opportunity title) and status.
+
+    Each application also holds a position key that sorts in list order (requeuing at the front takes a key below all others),
+    so rows read from a bucket can be returned in the same order a scan would produce."""
+    FIELDS = ("username", "posted_by", "opportunity", "status")
+
+    def __init__(self):
+        self._tables = {field: {} for field in self.FIELDS}  # field -> value -> {id(app): app}
+        self._position = {}  # id(app) -> position key
+        self._back = self._front = 0
+
+    # Returns an application's value for an indexed field
+    @staticmethod
+    def value(field, app):
+        if field == "opportunity":
+            return (app.posted_by, app.opportunity_title)
+        return getattr(app, field)
+
+    # Indexes an application appended to the list (or requeued at its front)
+    def add(self, app, front=False):
+        if front:
+            self._front -= 1
+            self._position[id(app)] = self._front
+        else:
+            self._back += 1
+            self._position[id(app)] = self._back
+        for field in self.FIELDS:
+            self._tables[field].setdefault(self.value(field, app), {})[id(app)] = app
+
+    # Returns True if the application is live (indexed)
+    def contains(self, app):
+        return id(app) in self._position
+
+    # Forgets an application that left the list
+    def remove(self, app):
+        if self._position.pop(id(app), None) is None:
+            return
+        for field in self.FIELDS:
+            self._discard(field, self.value(field, app), app)
+
+    def _discard(self, field, value, app):
+        bucket = self._tables[field].get(value)
+        if bucket is not None:
+            bucket.pop(id(app), None)
+            if not bucket:
+                del self._tables[field][value]
+
+    # Moves an application between status buckets (called before app.status changes)
+    def change_status(self, app, old_status, new_status):
+        if old_status != new_status and id(app) in self._position:
+            self._discard("status", old_status, app)
+            self._tables["status"].setdefault(new_status, {})[id(app)] = app
+
+    # Re-indexes everything from scratch
+    def rebuild(self, applications):
+        self.__init__()
+        for app in applications:
+            self.add(app)
+
+    # Returns how many applications match any of the values
+    def count(self, field, values):
+        table = self._tables[field]
+        return sum(len(table.get(value, ())) for value in values)
+
+    # Returns the applications matching any of the values, in list order
+    def lookup(self, field, values):
+        table = self._tables[field]
+        rows = list(chain.from_iterable(table.get(value, {}).values() for value in values))
+        rows.sort(key=lambda app: self._position[id(app)])
+        return rows
+
+    # Compares the index against a fresh one built from the list; returns a list of mismatch descriptions
+    def verify(self, applications):
+        expected = ApplicationIndex()
+        expected.rebuild(applications)
+        problems = []
+        for field in self.FIELDS:
+            mine, theirs = self._tables[field], expected._tables[field]
+            for value in set(mine) | set(theirs):
+                if mine.get(value, {}).keys() != theirs.get(value, {}).keys():
+                    problems.append(f"index {field} {value!r}: {len(mine.get(value, {}))} indexed, {len(theirs.get(value, {}))} actual")
+        if self._position.keys() == expected._position.keys():
+            keys = [self._position[id(app)] for app in applications]
+            if keys != sorted(keys):
+                problems.append("index positions are out of queue order")
+        return problems
+
+class ApplicationQuery:
+    """Composable query over live applications; every builder method returns a new query.
+
+    The planner probes the bucket size of each indexed filter (user, recruiter, opportunity, status), reads the
+    smallest bucket and applies the other filters to it; with no indexed filter it scans the list. Applicant
+    facets are resolved to a username filter through the user bitmaps first, so they can drive the plan too.
+    Results come back in queue order unless order_by is used."""
+    def __init__(self, system, filters=(), updated=(None, None), order=None, max_rows=None, applicant_facets=None):
+        self.system = system
+        self.filters = filters    # ((field, values), ...): each must match one of its values
+        self.updated = updated    # (start, end) epoch-second bounds on updated_at; None leaves a side open
+        self.order = order        # (field, descending), or None for queue order
+        self.max_rows = max_rows  # Row limit, or None for all
+        self.applicant_facets = applicant_facets  # (accessibility tags, locations) applicants must match, or None
+
+    def _with(self, **changes):
+        state = {'filters': self.filters, 'updated': self.updated, 'order': self.order, 'max_rows': self.max_rows,
+                 'applicant_facets': self.applicant_facets}
+        state.update(changes)
+        return ApplicationQuery(self.system, **state)
+
+    def _where(self, field, values):
+        return self._with(filters=self.filters + ((field, tuple(values)),))
+
+    # Applications made by a volunteer
+    def user(self, username):
+        return self._where("username", (username,))
+
+    # Applications to a recruiter's opportunities
+    def recruiter(self, username):
+        return self._where("posted_by", (username,))
+
+    # Applications to one opportunity
+    def opportunity(self, posted_by, title):
+        return self._where("opportunity", ((posted_by, title),))
+
+    # Applications in any of the given statuses
+    def status(self, *statuses):
+        return self._where("status", statuses)
+
+    # Applications last updated within [start, end) (epoch seconds); legacy records without a time never match
+    def updated_between(self, start=None, end=None):
+        return self._with(updated=(start, end))
+
+    # Applications whose applicant has every accessibility tag and is at any of the locations (if given)
+    def applicant(self, accessibility=(), locations=()):
+        return self._with(applicant_facets=(tuple(accessibility), tuple(locations)))
+
+    # Sorts by an application field instead of queue order
+    def order_by(self, field, descending=False):
+        if field not in QUERY_SORT_FIELDS:
+            raise ValueError(f"cannot sort by {field!r}; choose from {', '.join(QUERY_SORT_FIELDS)}")
+        return self._with(order=(field, descending))
+
+    # Returns at most n rows
+    def limit(self, n):
+        return self._with(max_rows=n)
+
+    # Returns the equality filters with applicant facets turned into a username filter (caller holds the lock)
+    def _resolved_filters(self):
+        if self.applicant_facets is None:
+            return self.filters
+        users = self.system.find_users(*self.applicant_facets)
+        return self.filters + (("username", tuple(u.username for u in users)),)
+
+    # Picks the smallest index bucket among the filters, or None to scan (caller holds the lock)
+    def plan(self, filters=None):
+        filters = self._resolved_filters() if filters is None else filters
+        best = None
+        for position, (field, values) in enumerate(filters):
+            rows = self.system.app_index.count(field, values)
+            if best is None or rows < best[1].rows:
+                best = (position, QueryPlan(field, values, rows))
+        return best
+
+    # Builds a predicate for every filter except the one the plan already satisfied
+    def _predicate(self, filters, skip):
+        checks = [(field, frozenset(values)) for position, (field, values) in enumerate(filters) if position != skip]
+        start, end = self.updated
+        bounded = start is not None or end is not None
+        def matches(app):
+            for field, values in checks:
+                if ApplicationIndex.value(field, app) not in values:
+                    return False
+            if bounded:
+                if app.updated_at is None or (start is not None and app.updated_at < start) or (end is not None and app.updated_at >= end):
+                    return False
+            return True
+        return matches
+
+    # Runs the query and returns the matching applications as a list
+    def all(self):
+        with self.system._lock:
+            filters = self._resolved_filters()
+            best = self.plan(filters)
+            if best is None:
+                skip, candidates = None, list(self.system.applications)
+            else:
+                skip, candidates = best[0], self.system.app_index.lookup(best[1].field, best[1].values)
+        rows = filter(self._predicate(filters, skip), candidates)
+        if self.order is None:
+            return list(islice(rows, self.max_rows))
+        field, descending = self.order
+        def key(app):
+            value = getattr(app, field)
+            return (value is not None, value)  # Legacy rows without updated_at sort first
+        if self.max_rows is None:
+            return sorted(rows, key=key, reverse=descending)
+        return (heapq.nlargest if descending else heapq.nsmallest)(self.max_rows, rows, key=key)
+
+    def __iter__(self):
+        return iter(self.all())
+
+    # Returns the first matching application, or None
+    def first(self):
+        rows = self.limit(1).all()
+        return rows[0] if rows else None
+
+    # Returns the number of matches (read straight from the index when one filter covers the whole query)
+    def count(self):
+        if len(self.filters) == 1 and self.applicant_facets is None and self.updated == (None, None):
+            with self.system._lock:
+                total = self.plan()[1].rows
+            return total if self.max_rows is None else min(total, self.max_rows)
+        return len(self.all())
+
+    # Describes the access path the planner picks, one step per line
+    def explain(self):
+        with self.system._lock:
+            filters = self._resolved_filters()
+            best = self.plan(filters)
+            considered = [self.system.app_index.count(field, values) for field, values in filters]
+            total = len(self.system.applications)
+        def describe(field, values):
+            if len(values) == 1:
+                return f"{field} = {values[0]!r}"
+            return f"{field} in {list(values)!r}" if len(values) <= 5 else f"{field} in ({len(values)} values)"
+        skip = None if best is None else best[0]
+        if best is None:
+            lines = [f"SCAN applications (~{total} rows)"]
+        else:
+            plan = best[1]
+            lines = [f"SEARCH applications USING INDEX {describe(plan.field, plan.values)} (~{plan.rows} of {total} rows)"]
+            lines += [f"  considered {describe(field, values)} (~{rows} rows)" for i, ((field, values), rows) in enumerate(zip(filters, considered)) if i != skip]
+        if self.applicant_facets is not None:
+            tags, locations = self.applicant_facets
+            lines.append(f"  username values from user bitmaps: accessibility {list(tags)!r}, location {list(locations)!r}")
+        lines += [f"FILTER {describe(field, values)}" for i, (field, values) in enumerate(filters) if i != skip]
+        start, end = self.updated
+        if start is not None or end is not None:
+            lines.append(f"FILTER updated_at in [{start}, {end})")
+        if self.order is not None:
+            lines.append(f"SORT BY {self.order[0]}{' DESC' if self.order[1] else ''}" + ("" if self.max_rows is None else f" (top {self.max_rows})"))
+        elif self.max_rows is not None:
+            lines.append(f"LIMIT {self.max_rows} (stops early, queue order)")
+        return "\n".join(lines)
+
+# CHANGE EVENTS
+class ChangeEvent:
+    """Base class for changes published by VolunteerSystem."""
+
+class UserRegistered(ChangeEvent):
+    """A new user was registered."""
+    def __init__(self, user):
+        self.user = user
+
+class OpportunityPosted(ChangeEvent):
+    """A new opportunity was appended at the given index."""
+    def __init__(self, index, opportunity):
+        self.index = index
+        self.opportunity = opportunity
+
+class ApplicationCreated(ChangeEvent):
+    """A volunteer applied to an opportunity."""
+    def __init__(self, application):
+        self.application = application
+
+class OpportunityClosed(ChangeEvent):
+    """An opportunity ended and was closed; its open applications were resolved separately."""
+    def __init__(self, opportunity):
+        self.opportunity = opportunity
+
+class ApplicationStatusChanged(ChangeEvent):
+    """An application's status changed; requeued means it also moved to the end of the queue."""
+    def __init__(self, application, old_status, new_status, requeued=False):
+        self.application = application
+        self.old_status = old_status
+        self.new_status = new_status
+        self.requeued = requeued
+
+class EventBus:
+    """Synchronous publish/subscribe hub for ChangeEvents."""
+    def __init__(self):
+        self._subscribers = []
+
+    # Registers a callback; returns a function that removes it again
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    # Delivers an event to every subscriber
+    def publish(self, event):
+        for callback in list(self._subscribers):
+            callback(event)
+
+# PAGINATED VIEWS
+class StaleCursorError(Exception):
+    """Raised when a page cursor is used after its collection was mutated."""
+
+class PageCursor:
+    """Resume point for CollectionView.page: raw position plus the collection version it was issued at."""
+    def __init__(self, collection, position, version):
+        self.collection = collection
+        self.position = position
+        self.version = version
+
+class Page:
+    """One page of (index, item) pairs and the cursor for the next page (None at the end)."""
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+class CollectionView(Sequence):
+    """Read-only view over a VolunteerSystem collection; indexing and paging never copy the underlying list."""
+    def __init__(self, system, collection):
+        self._system = system
+        self._collection = collection  # Attribute name on the system, e.g. "opportunities"
+
+    def _items(self):
+        return getattr(self._system, self._collection)
+
+    def __len__(self):
+        return len(self._items())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(islice(self._items(), *index.indices(len(self))))
+        return self._items()[index]
+
+    def __iter__(self):
+        return iter(self._items())
+
+    # Current mutation version of the underlying collection
+    @property
+    def version(self):
+        return self._system.collection_version(self._collection)
+
+    # Returns up to limit (index, item) pairs matching where, starting at cursor
+    def page(self, cursor=None, limit=20, where=None):
+        version = self.version
+        start = 0
+        if cursor is not None:
+            if cursor.collection != self._collection:
+                raise ValueError(f"Cursor belongs to {cursor.collection}, not {self._collection}.")
+            if cursor.version != version:
+                raise StaleCursorError(f"{self._collection} changed since this cursor was issued.")
+            start = cursor.position
+        items, position = [], start
+        for position, item in enumerate(islice(self._items(), start, None), start):
+            if where is None or where(item):
+                if len(items) == limit:
+                    return Page(items, PageCursor(self._collection, position, version))
+                items.append((position, item))
+        return Page(items, None)
+
+# STORAGE BACKENDS
+# Both stores exchange plain dicts of the form {'users': [...], 'opportunities': [...], 'applications': [...]}
+USERS_SHARD = "users"  # Dirty-key for the user list; every other key is a recruiter username
+
+# STORAGE CODECS
+# "pretty" is the original indented JSON; the others trade readability for bytes on disk
+STORAGE_CODECS = ("pretty", "compact", "zlib", "lzma")
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+# Serializes a document with the given codec
+def encode_document(data, codec="pretty"):
+    if codec == "pretty":
+        return json.dumps(data, indent=4).encode("utf-8")  # Indented for readability
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    if codec == "compact":
+        return raw
+    if codec == "zlib":
+        return zlib.compress(raw, 6)
+    if codec == "lzma":
+        return lzma.compress(raw, preset=1)
+    raise ValueError(f"Unknown storage codec: {codec}")
+
+# Detects the codec of stored bytes from their first bytes
+def detect_codec(raw):
+    if raw.startswith(XZ_MAGIC):
+        return "lzma"
+    if raw[:1] == b"\x78" and len(raw) > 1 and (raw[0] * 256 + raw[1]) % 31 == 0:
+        return "zlib"  # zlib header: CMF 0x78 and a checksum over CMF/FLG
+    return "compact"  # Plain JSON, indented or not
+
+# Parses stored bytes, whatever codec wrote them
+def decode_document(raw):
+    codec = detect_codec(raw)
+    if codec == "lzma":
+        raw = lzma.decompress(raw)
+    elif codec == "zlib":
+        raw = zlib.decompress(raw)
+    return json.loads(raw.decode("utf-8"))
+
+# CRASH-SAFE FILES
+# Stored files end with a fixed-size footer holding the payload's CRC-32 and length, so a torn or truncated
+# write is caught before parsing; files written before footers existed still load (unchecked).
+FOOTER_MAGIC = b"\n%VMS-CRC32 "
+FOOTER_SIZE = len(FOOTER_MAGIC) + 8 + 1 + 12 + 1  # magic, crc hex, space, length, newline
+BACKUP_SUFFIX = ".bak"  # Previous generation of each file, kept for fallback
+FSYNC_POLICIES = ("always", "grouped", "never")
+
+class CorruptFileError(ValueError):
+    """Raised when a stored file fails its footer check or cannot be decoded."""
+
+# Appends the integrity footer to encoded bytes
+def add_footer(payload):
+    return payload + FOOTER_MAGIC + b"%08x %012d\n" % (zlib.crc32(payload), len(payload))
+
+# Checks and removes the footer; bytes without one are returned unchanged
+def strip_footer(raw):
+    footer = raw[-FOOTER_SIZE:]
+    if len(raw) < FOOTER_SIZE or not footer.startswith(FOOTER_MAGIC):
+        return raw
+    crc, length = footer[len(FOOTER_MAGIC):-1].split(b" ")
+    payload = raw[:-FOOTER_SIZE]
+    if int(length) != len(payload) or int(crc, 16) != zlib.crc32(payload):
+        raise CorruptFileError("checksum mismatch")
+    return payload
+
+# Reads a document from disk, verifying its footer
+def read_json_file(path):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return decode_document(strip_footer(raw))
+    except (ValueError, zlib.error, lzma.LZMAError) as e:  # Includes JSON and UTF-8 decoding errors
+        raise CorruptFileError(f"{path}: {e}") from e
+
+# Reads a document, falling back to its previous generation if it is missing or corrupt; returns (data, path read)
+def read_with_fallback(path):
+    try:
+        return read_json_file(path), path
+    except (CorruptFileError, FileNotFoundError) as e:
+        try:
+            return read_json_file(path + BACKUP_SUFFIX), path + BACKUP_SUFFIX
+        except (CorruptFileError, FileNotFoundError):
+            raise e
+
+# Flushes a directory entry (so a rename survives power loss); not supported everywhere
+def fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# Writes a document atomically: temp file, optional fsync, then rename over the old one (kept as .bak if backup)
+def write_json_file(path, data, codec="pretty", fsync=False, backup=True):
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(add_footer(encode_document(data, codec)))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)  # mkstemp creates 0600; keep the file's mode
+            if backup:
+                os.replace(path, path + BACKUP_SUFFIX)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    if fsync:
+        fsync_directory(directory)
+
+class DurableFiles:
+    """Reads and writes a store's files crash-safely and applies its fsync policy.
+
+    Every write is atomic (temp file and rename), so a crash never leaves a torn file; the policy only
+    decides how many recent saves a power loss can roll back: "always" fsyncs each save, "grouped"
+    fsyncs once per group_saves saves or group_seconds (checked at save time, and on flush), and
+    "never" leaves it to the OS. Save timings are kept for measurement."""
+    def __init__(self, policy="always", group_saves=10, group_seconds=1.0):
+        if policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {policy}")
+        self.policy, self.group_saves, self.group_seconds = policy, group_saves, group_seconds
+        self.recovered = set()     # Paths loaded from their previous generation; their current file is bad
+        self._unsynced = set()     # Paths written since the last fsync
+        self._unsynced_saves = 0
+        self._last_sync = time.monotonic()
+        self.saves = self.syncs = 0
+        self.save_times = deque(maxlen=1000)  # Seconds per save, most recent last
+
+    # Reads a file with fallback to its previous generation; warns and remembers if the fallback was used
+    def read(self, path):
+        data, source = read_with_fallback(path)
+        if source != path:
+            self.recovered.add(path)
+            warnings.warn(f"{path} is missing or corrupt; loaded the previous generation from {source}", RuntimeWarning, stacklevel=3)
+        return data
+
+    # Decides whether this save is fsynced
+    def _should_sync(self):
+        if self.policy == "grouped":
+            return self._unsynced_saves + 1 >= self.group_saves or time.monotonic() - self._last_sync >= self.group_seconds
+        return self.policy == "always"
+
+    # Writes (path, data) pairs as one save
+    def write(self, files, codec):
+        start = time.perf_counter()
+        sync = self._should_sync()
+        for path, data in files:
+            write_json_file(path, data, codec, fsync=sync, backup=path not in self.recovered)  # Never rotate a bad file over a good backup
+            self.recovered.discard(path)
+            if not sync:
+                self._unsynced.add(path)
+        if sync:
+            self._sync_unsynced()  # Earlier saves of this group
+            self.syncs += 1
+        else:
+            self._unsynced_saves += 1
+        self.saves += 1
+        self.save_times.append(time.perf_counter() - start)
+
+    # Fsyncs files written without fsync, and their directories
+    def _sync_unsynced(self):
+        for path in self._unsynced:
+            try:
+                with open(path, 'rb') as f:
+                    os.fsync(f.fileno())
+            except FileNotFoundError:
+                pass
+        for directory in {os.path.dirname(p) or "." for p in self._unsynced}:
+            fsync_directory(directory)
+        self._unsynced.clear()
+        self._unsynced_saves = 0
+        self._last_sync = time.monotonic()
+
+    # Makes every save so far durable (unless the policy is "never"); called on close
+    def flush(self):
+        if self._unsynced and self.policy != "never":
+            self._sync_unsynced()
+            self.syncs += 1
+
+    # Returns save/fsync counts and save latency percentiles (milliseconds)
+    def stats(self):
+        times = sorted(self.save_times)
+        stats = {'saves': self.saves, 'syncs': self.syncs}
+        for p in (50, 99):
+            stats[f'p{p}_ms'] = 1000 * times[min(len(times) - 1, len(times) * p // 100)] if times else None
+        return stats
+
+class SingleFileStore:
+    """Keeps everything in one JSON file (the original data.json layout)."""
+    def __init__(self, path, codec="pretty", fsync="always"):
+        self.path = path
+        self.archive_path = path + ".archive.jsonl"  # Cold tier for closed applications
+        self.history_path = path + ".history.jsonl"  # Status transition log
+        self.codec = codec  # Codec used for writing; reads auto-detect
+        self.files = DurableFiles(fsync)
+
+    # Returns the stored data, or None if the file does not exist yet
+    def read(self):
+        try:
+            return self.files.read(self.path)
+        except FileNotFoundError:
+            return None
+
+    # Rewrites the whole file; the dirty set is irrelevant for a single file
+    def write(self, system, dirty):
+        self.files.write([(self.path, system._snapshot_dict())], self.codec)
+
+class ShardedStore:
+    """Partitions opportunities and applications into one file per recruiter, with users in their own file.
+
+    manifest.json maps each recruiter to their shard file, so a dashboard can load one
+    recruiter's shard (recruiter=...) without reading the others."""
+    def __init__(self, directory, recruiter=None, codec="pretty", fsync="always"):
+        self.directory = directory
+        self.codec = codec          # Codec used for writing; reads auto-detect
+        self.files = DurableFiles(fsync)
+        self.archive_path = os.path.join(directory, "archive.jsonl")  # Cold tier for closed applications
+        self.history_path = os.path.join(directory, "history.jsonl")  # Status transition log
+        self.recruiter = recruiter  # If set, only this recruiter's shard is read
+        self.manifest = {}          # recruiter username -> shard file name
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # Returns a filesystem-safe shard file name for a recruiter
+    def shard_name(self, recruiter):
+        return f"shard-{quote(recruiter, safe='')}.json"
+
+    # Reads users plus every shard (or only the selected recruiter's); None if nothing is stored yet
+    def read(self):
+        try:
+            self.manifest = self.files.read(self._path("manifest.json"))
+        except FileNotFoundError:
+            return None
+        data = {'users': self.files.read(self._path("users.json")), 'opportunities': [], 'applications': []}
+        recruiters = [self.recruiter] if self.recruiter is not None else list(self.manifest)
+        for recruiter in recruiters:
+            if recruiter not in self.manifest:
+                continue
+            shard = self.files.read(self._path(self.manifest[recruiter]))
+            data['opportunities'].extend(shard.get('opportunities', []))
+            data['applications'].extend(shard.get('applications', []))
+        return data
+
+    # Rewrites only the dirty shards (users and/or individual recruiters) as one save
+    def write(self, system, dirty):
+        os.makedirs(self.directory, exist_ok=True)
+        self.files.write(self._dirty_files(system, dirty), self.codec)
+
+    # Yields (path, data) for each file a save rewrites; shard data is built one file at a time
+    def _dirty_files(self, system, dirty):
+        if USERS_SHARD in dirty:
+            yield self._path("users.json"), [system._user_to_dict(u) for u in system.users]
+        new_shards = not os.path.exists(self._path("manifest.json"))
+        for recruiter in dirty - {USERS_SHARD}:
+            if recruiter not in self.manifest:
+                self.manifest[recruiter] = self.shard_name(recruiter)
+                new_shards = True
+            yield self._path(self.manifest[recruiter]), {
+                'opportunities': [system._opp_to_dict(o) for o in system.opportunities if o.posted_by == recruiter],
+                'applications': [system._app_to_dict(a) for a in system.applications if a.posted_by == recruiter],
+            }
+        if new_shards:  # Written last, so it never names a shard that is not on disk yet
+            yield self._path("manifest.json"), self.manifest
+
+# COLD TIER
+class ColdStore:
+    """Append-only JSON Lines archive of closed applications, paged in lazily by byte offset.
+
+    Records are deduplicated by app_id, so a sweep retried after a failed save does not archive twice;
+    readers skip a torn last line the way StatusHistory.load does."""
+    def __init__(self, path):
+        self.path = path
+        self._ids = None  # app_ids already archived, read on the first append
+
+    # Appends application dicts that are not archived yet; returns how many were written
+    def append(self, records):
+        if self._ids is None:
+            self._ids = {record.get('app_id') for record in self}
+        fresh = [record for record in records if record.get('app_id') not in self._ids]
+        if not fresh:
+            return 0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a+b') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")  # Close off a torn line so it doesn't swallow the next record
+            for record in fresh:
+                f.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._ids.update(record.get('app_id') for record in fresh)
+        return len(fresh)
+
+    # Returns up to limit records matching where, starting at a byte offset, plus the next offset (None at the end)
+    def page(self, offset=0, limit=50, where=None):
+        records = []
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                while True:
+                    line = f.readline()
+                    if not line:
+                        return records, None
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn append from a crash
+                    if where is None or where(record):
+                        records.append(record)
+                        if len(records) == limit:
+                            return records, f.tell()
+        except FileNotFoundError:
+            return records, None
+
+    # Streams every archived record
+    def __iter__(self):
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # Torn append from a crash
+        except FileNotFoundError:
+            return
+
+# REPORT EXPORT
+EXPORT_FORMATS = ("csv", "jsonl")
+APPLICANT_EXPORT_FIELDS = ("opportunity_title", "location", "date", "status", "username", "name", "email", "phone", "age", "disabilities")
+
+# Writes rows (dicts) to a text stream one at a time; returns how many were written
+def write_rows(rows, out, fmt="csv", fields=APPLICANT_EXPORT_FIELDS):
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(row) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return count
+
+# STATUS HISTORY
+class StatusHistory:
+    """Append-only log of application status transitions, indexed by application, recruiter and time.
+
+    Entries are dicts with app_id, username, opportunity_title, posted_by, old, new, actor and at
+    (epoch seconds); old is None for the creation entry written when a volunteer applies."""
+    def __init__(self, path):
+        self.path = path
+        self.entries = []          # All entries in time order
+        self._times = []           # Parallel list of entry times for bisecting
+        self._by_app = {}          # app_id -> [entry, ...]
+        self._by_recruiter = {}    # posted_by -> ([times], [entries])
+        self._created = {}         # app_id -> creation time
+        self._decision_times = {}  # posted_by -> sorted seconds from creation to first decision
+        self.load()
+
+    # Rebuilds the indexes from the log file
+    def load(self):
+        self.entries, self._times = [], []
+        self._by_app, self._by_recruiter, self._created, self._decision_times = {}, {}, {}, {}
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn append from a crash; the rest of the log is intact
+                    self._index(entry)
+        except FileNotFoundError:
+            pass
+
+    # Adds one entry to the in-memory indexes
+    def _index(self, entry):
+        at = entry['at']
+        if self._times and at < self._times[-1]:
+            at = entry['at'] = self._times[-1]  # Keep the log monotonic if the clock steps back
+        self.entries.append(entry)
+        self._times.append(at)
+        history = self._by_app.setdefault(entry['app_id'], [])
+        times, entries = self._by_recruiter.setdefault(entry['posted_by'], ([], []))
+        times.append(at)
+        entries.append(entry)
+        if entry['old'] is None:
+            self._created[entry['app_id']] = at
+        elif entry['new'] in DECIDED_STATUSES and not any(e['old'] is not None and e['new'] in DECIDED_STATUSES for e in history):
+            created = self._created.get(entry['app_id'])
+            if created is not None:
+                bisect.insort(self._decision_times.setdefault(entry['posted_by'], []), at - created)
+        history.append(entry)
+
+    # Appends a transition to the log and the indexes
+    def record(self, app, old_status, new_status, actor, at=None):
+        entry = {'app_id': app.app_id, 'username': app.username, 'opportunity_title': app.opportunity_title,
+                 'posted_by': app.posted_by, 'old': old_status, 'new': new_status, 'actor': actor,
+                 'at': time.time() if at is None else at}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._index(entry)
+        return entry
+
+    # Returns every transition of one application, oldest first
+    def for_application(self, app_id):
+        return list(self._by_app.get(app_id, []))
+
+    # Returns transitions in [start, end), optionally for one recruiter, found by bisecting the time index
+    def between(self, start=None, end=None, recruiter=None):
+        if recruiter is None:
+            times, entries = self._times, self.entries
+        else:
+            times, entries = self._by_recruiter.get(recruiter, ([], []))
+        lo = 0 if start is None else bisect.bisect_left(times, start)
+        hi = len(times) if end is None else bisect.bisect_left(times, end)
+        return entries[lo:hi]
+
+    # Returns decisions (Accepted/Rejected) made in [start, end), optionally by one actor
+    def decisions(self, start=None, end=None, recruiter=None, actor=None):
+        return [e for e in self.between(start, end, recruiter)
+                if e['old'] is not None and e['new'] in DECIDED_STATUSES and (actor is None or e['actor'] == actor)]
+
+    # Returns {percentile: seconds} from application to first decision, for one recruiter or everyone
+    def time_to_decision_percentiles(self, recruiter=None, percentiles=(50, 90, 99)):
+        if recruiter is None:
+            durations = sorted(chain.from_iterable(self._decision_times.values()))
+        else:
+            durations = self._decision_times.get(recruiter, [])
+        if not durations:
+            return {p: None for p in percentiles}
+        return {p: durations[min(len(durations) - 1, int(len(durations) * p / 100))] for p in percentiles}
+
+# NOTIFICATIONS
+class NotificationDispatcher:
+    """Queues outbound emails and sends them in batches over SMTP from worker threads.
+
+    Each batch reuses one SMTP connection. A permanent (5xx) rejection fails only that message and the rest
+    of the batch is still sent; connection and temporary (4xx) errors retry the undelivered remainder with
+    exponential backoff, and messages still failing after max_retries are counted as failed."""
+    def __init__(self, host="localhost", port=25, sender="noreply@volunteerly.org", workers=2,
+                 batch_size=20, batch_wait=0.5, max_retries=4, backoff=0.5, timeout=10):
+        self.host, self.port, self.sender = host, port, sender
+        self.batch_size = batch_size  # Most messages sent per connection
+        self.batch_wait = batch_wait  # Seconds to wait for a batch to fill
+        self.max_retries = max_retries
+        self.backoff = backoff        # First retry delay; doubles each attempt
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.sent = self.failed = self.retries = 0
+        self._latencies = deque(maxlen=1000)  # Seconds from enqueue to delivery, most recent first out
+        self._workers = [threading.Thread(target=self._run, name=f"notify-{i}", daemon=True) for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    # Queues a message for delivery
+    def enqueue(self, to, subject, body):
+        msg = EmailMessage()
+        msg["From"], msg["To"], msg["Subject"] = self.sender, to, subject
+        msg.set_content(body)
+        self._queue.put((time.time(), msg))
+
+    # Takes up to batch_size messages, waiting at most batch_wait for the batch to fill
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch, deadline = [first], time.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0, deadline - time.time()))
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Leave the stop marker for this worker's next loop
+                break
+            batch.append(item)
+        return batch
+
+    # Sends one batch over a single SMTP connection, removing each message once delivered or permanently refused
+    def _send_batch(self, batch):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            while batch:
+                enqueued_at, msg = batch[0]
+                try:
+                    smtp.send_message(msg)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as error:
+                    if not permanent_smtp_error(error):
+                        raise  # Temporary: retry the remainder after a backoff
+                    batch.pop(0)  # smtplib has already reset the transaction, so the connection carries on
+                    with self._stats_lock:
+                        self.failed += 1
+                    continue
+                batch.pop(0)
+                with self._stats_lock:
+                    self.sent += 1
+                    self._latencies.append(time.time() - enqueued_at)
+
+    # Worker loop: batch, send, retry with backoff
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self._send_batch(batch)
+                    break
+                except (OSError, smtplib.SMTPException):
+                    if attempt == self.max_retries:
+                        with self._stats_lock:
+                            self.failed += len(batch)
+                        break
+                    with self._stats_lock:
+                        self.retries += 1
+                    time.sleep(self.backoff * 2 ** attempt)
+
+    # Returns queue depth, counters and delivery latency percentiles (seconds)
+    def metrics(self):
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            stats = {'queue_depth': self._queue.qsize(), 'sent': self.sent, 'failed': self.failed, 'retries': self.retries}
+        for p in (50, 95, 99):
+            stats[f'latency_p{p}'] = latencies[min(len(latencies) - 1, len(latencies) * p // 100)] if latencies else None
+        return stats
+
+    # Delivers what is queued, then stops the workers
+    def close(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+# True if an SMTP error permanently rejects one message (5xx), rather than a connection or temporary (4xx) problem
+def permanent_smtp_error(error):
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+# Minimal local SMTP server that accepts every message and hands it to on_message(mail_from, rcpt_tos, data)
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Stand-in SMTP server for testing notification delivery on one machine.
+
+    Recipients in refuse are answered with 550, like a mailbox that does not exist."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 0), on_message=None, refuse=()):
+        self.refuse = {address.lower() for address in refuse}
+        self.messages = []
+        self.on_message = on_message or (lambda mail_from, rcpt_tos, data: self.messages.append((mail_from, rcpt_tos, data)))
+        super().__init__(address, SMTPSinkHandler)
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) for smtplib."""
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        self.reply("220 volunteerly sink ready")
+        mail_from, rcpt_tos = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command[:4].upper()
+            if verb in ("HELO", "EHLO"):
+                self.reply("250 sink")
+            elif verb == "MAIL":
+                mail_from, rcpt_tos = command[10:].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipient = command[8:].strip()
+                if recipient.strip("<>").lower() in self.server.refuse:
+                    self.reply("550 No such user here")
+                else:
+                    rcpt_tos.append(recipient)
+                    self.reply("250 OK")
+            elif verb == "DATA" and not rcpt_tos:
+                self.reply("503 No valid recipients")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                self.server.on_message(mail_from, rcpt_tos, b"".join(lines))
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:  # RSET, NOOP and anything else
+                self.reply("250 OK")
+
+# CAPACITY AND WAITLISTS
+class SlotLedger:
+    """Accepted-slot counts and FIFO waitlists per opportunity, keyed by (posted_by, title).
+
+    Every operation is O(1) amortised; callers hold VolunteerSystem._lock so a reserve is atomic
+    across recruiters and worker threads."""
+    def __init__(self):
+        self._capacity = {}   # key -> capacity (None = unlimited)
+        self._accepted = Counter()  # key -> accepted slots in use (live plus archived)
+        self._waitlist = {}   # key -> deque of Waitlisted applications, oldest first
+
+    # Rebuilds counts and waitlists from loaded data
+    def rebuild(self, opportunities, applications):
+        self._capacity, self._accepted, self._waitlist = {}, Counter(), {}
+        for opp in opportunities:
+            self.register_opportunity(opp)
+        waiting = [a for a in applications if a.status == "Waitlisted"]
+        waiting.sort(key=lambda a: a.updated_at or 0)
+        for app in applications:
+            if app.status == "Accepted":
+                self._accepted[(app.posted_by, app.opportunity_title)] += 1
+        for app in waiting:
+            self.enqueue_waitlist((app.posted_by, app.opportunity_title), app)
+
+    # Starts tracking an opportunity's capacity
+    def register_opportunity(self, opp):
+        key = (opp.posted_by, opp.title)
+        self._capacity[key] = opp.capacity
+        self._accepted[key] += opp.archived_accepted
+
+    # Takes a slot if one is free; returns False when the opportunity is full
+    def try_reserve(self, key):
+        capacity = self._capacity.get(key)
+        if capacity is not None and self._accepted[key] >= capacity:
+            return False
+        self._accepted[key] += 1
+        return True
+
+    # Gives a slot back
+    def release(self, key):
+        if self._accepted[key] > 0:
+            self._accepted[key] -= 1
+
+    # Adds an application to the back of the waitlist
+    def enqueue_waitlist(self, key, app):
+        self._waitlist.setdefault(key, deque()).append(app)
+
+    # Puts an application back at the front of the waitlist
+    def requeue_waitlist_front(self, key, app):
+        self._waitlist.setdefault(key, deque()).appendleft(app)
+
+    # Pops the oldest application still Waitlisted (entries changed since are skipped lazily)
+    def next_waitlisted(self, key):
+        waiting = self._waitlist.get(key)
+        while waiting:
+            app = waiting.popleft()
+            if app.status == "Waitlisted":
+                return app
+        return None
+
+    # Returns free slots, or None if unlimited
+    def remaining(self, key):
+        capacity = self._capacity.get(key)
+        return None if capacity is None else max(0, capacity - self._accepted[key])
+
+# SCHEDULES
+class ScheduleConflictWarning(UserWarning):
+    """Loaded data holds accepted commitments that overlap for the same volunteer."""
+
+class ScheduleConflictError(ValueError):
+    """Accepting an application would double-book the volunteer; the application keeps its status."""
+    def __init__(self, app, clash):
+        super().__init__(f"{app.username} is already committed to '{clash.opportunity_title}' at that time.")
+        self.app, self.clash = app, clash
+
+class ScheduleIndex:
+    """Per-volunteer intervals of accepted commitments, sorted by start, with a running maximum end.
+
+    Conflict checks bisect on start times and walk back only while the running maximum still reaches past the
+    new start, so they stay correct even if stored commitments overlap (e.g. data written before this check)."""
+    def __init__(self):
+        self._starts = {}     # username -> sorted start times
+        self._intervals = {}  # username -> [(start, end, application)] in the same order
+        self._reach = {}      # username -> [max end of intervals[0..i]] in the same order
+
+    def clear(self):
+        self._starts, self._intervals, self._reach = {}, {}, {}
+
+    # Returns a commitment overlapping [start, end), or None
+    def conflict(self, username, start, end, ignore=None):
+        intervals, reach = self._intervals.get(username, []), self._reach.get(username, [])
+        j = bisect.bisect_left(self._starts.get(username, []), end) - 1  # Last interval starting before end
+        while j >= 0 and reach[j] > start:  # Nothing at or before j ends after start once reach drops
+            other_start, other_end, app = intervals[j]
+            if other_end > start and app is not ignore:
+                return app
+            j -= 1
+        return None
+
+    # Recomputes the running maximum end from position i onwards
+    def _update_reach(self, username, i):
+        intervals, reach = self._intervals[username], self._reach[username]
+        del reach[i:]
+        top = reach[-1] if reach else float("-inf")
+        for _, end, _ in intervals[i:]:
+            top = max(top, end)
+            reach.append(top)
+
+    # Records an accepted commitment
+    def add(self, username, start, end, app):
+        starts = self._starts.setdefault(username, [])
+        i = bisect.bisect_right(starts, start)
+        starts.insert(i, start)
+        self._intervals.setdefault(username, []).insert(i, (start, end, app))
+        self._reach.setdefault(username, [])
+        self._update_reach(username, i)
+
+    # Drops a commitment that is no longer accepted
+    def remove(self, username, app):
+        intervals = self._intervals.get(username, [])
+        for i, (_, _, other) in enumerate(intervals):
+            if other is app:
+                del intervals[i]
+                del self._starts[username][i]
+                self._update_reach(username, i)
+                return
+
+    # Returns (username, earlier application, later application) for every pair of overlapping commitments
+    def overlaps(self):
+        found = []
+        for username, intervals in self._intervals.items():
+            for i, (start, _, app) in enumerate(intervals):
+                j = i - 1
+                while j >= 0 and self._reach[username][j] > start:
+                    if intervals[j][1] > start:
+                        found.append((username, intervals[j][2], app))
+                    j -= 1
+        return found
+
+    # Returns a volunteer's commitments in time order
+    def schedule(self, username):
+        return list(self._intervals.get(username, []))
+
+# EXPIRY
+EXPIRY_MAX_WAIT = 60.0  # Longest a timer sleeps, so opportunities posted meanwhile are swept promptly
+OPEN_STATUSES = ("Pending", "Waitlisted")  # Applications still waiting on a decision
+
+class ExpiryScheduler:
+    """Min-heap of open opportunities keyed by end time, so a sweep pops only what has expired.
+
+    Each expiry costs O(log n); entries for opportunities closed some other way are skipped when popped."""
+    def __init__(self):
+        self._heap = []  # (end epoch seconds, sequence, opportunity); sequence breaks ties
+        self._sequence = 0
+
+    # Rebuilds the heap from loaded opportunities
+    def rebuild(self, opportunities):
+        self._heap = []
+        for opp in opportunities:
+            interval = None if opp.closed else opportunity_interval(opp)
+            if interval is not None:
+                self._sequence += 1
+                self._heap.append((interval[1], self._sequence, opp))
+        heapq.heapify(self._heap)
+
+    # Schedules a newly posted opportunity (undatable ones never expire)
+    def add(self, opp):
+        interval = None if opp.closed else opportunity_interval(opp)
+        if interval is not None:
+            self._sequence += 1
+            heapq.heappush(self._heap, (interval[1], self._sequence, opp))
+
+    # Removes and returns the open opportunities that ended at or before now
+    def pop_expired(self, now):
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            opp = heapq.heappop(self._heap)[2]
+            if not opp.closed:
+                expired.append(opp)
+        return expired
+
+    # Returns when the next opportunity ends (epoch seconds), or None if nothing is scheduled
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+class ExpiryTimer:
+    """Background thread that sweeps a system whenever its next opportunity ends (headless runs).
+
+    The GUI drives the same sweep with Tk's after instead, so its change events stay on the Tk thread."""
+    def __init__(self, system, max_wait=EXPIRY_MAX_WAIT, on_sweep=None, resolve_as="Rejected"):
+        self.system = system
+        self.max_wait = max_wait
+        self.resolve_as = resolve_as
+        self.on_sweep = on_sweep  # Called with (closed, resolved) after sweeps that closed something
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="expiry", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            closed, resolved = self.system.expire_opportunities(resolve_as=self.resolve_as)
+            if closed and self.on_sweep is not None:
+                self.on_sweep(closed, resolved)
+            self._stop.wait(self.system.seconds_until_expiry(self.max_wait))
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+# READ SNAPSHOTS
+# Frozen application fields as seen by a snapshot
+AppRecord = namedtuple("AppRecord", "username opportunity_title posted_by status updated_at app_id")
+
+class ReadSnapshot:
+    """Point-in-time read view sharing structure with the live system.
+
+    The users, opportunities and applications lists are only ever appended to in place (a write that
+    removes or reorders builds a new list), so the snapshot keeps each live list and its length and
+    reads the prefix without copying. Status changes store the pre-change status in an overlay, so
+    taking a snapshot is O(1) and writers pay only for what they change."""
+    def __init__(self, system):
+        self._system = system
+        self._users, self._user_count = system.users, len(system.users)
+        self._opps, self._opp_count = system.opportunities, len(system.opportunities)
+        self._apps, self._app_count = system.applications, len(system.applications)
+        self._overlay = {}  # id(application) -> (status, updated_at) before its first change
+        self.taken_at = time.time()
+
+    # Called by the system before an application's status changes
+    def _preserve(self, app):
+        if id(app) not in self._overlay:
+            self._overlay[id(app)] = (app.status, app.updated_at)
+
+    def users(self):
+        return islice(self._users, self._user_count)
+
+    def opportunities(self):
+        return islice(self._opps, self._opp_count)
+
+    # Streams AppRecords with the statuses they had when the snapshot was taken
+    def applications(self):
+        overlay = self._overlay
+        for app in islice(self._apps, self._app_count):  # List iterators tolerate appends made meanwhile
+            status, updated_at = app.status, app.updated_at  # Read live first; the overlay wins if a write raced us
+            status, updated_at = overlay.get(id(app), (status, updated_at))
+            yield AppRecord(app.username, app.opportunity_title, app.posted_by, status, updated_at, app.app_id)
+
+    # Counts statuses as of the snapshot
+    def status_counts(self, recruit_username=None):
+        counts = Counter(a.status for a in self.applications() if recruit_username is None or a.posted_by == recruit_username)
+        return {status: counts.get(status, 0) for status in APPLICATION_STATUSES}
+
+    # Stops receiving copy-on-write callbacks
+    def close(self):
+        self._system._snapshots.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# REPLICATION
+# Primary and followers exchange newline-delimited JSON over TCP. Each save() becomes one journal entry
+# {seq, at, shards: {key: partition}}, keyed by the same dirty keys ShardedStore writes (USERS_SHARD or a
+# recruiter username), so a follower replaces exactly the partitions the primary rewrote.
+REPLICATION_HEARTBEAT = 1.0  # Seconds between heartbeats while no entries are flowing
+
+class ReadOnlyReplicaError(RuntimeError):
+    """Raised when a follower's system is asked to save before it has been promoted."""
+
+# Builds the journal partition for one dirty key from a system's live data
+def replication_partition(system, key):
+    if key == USERS_SHARD:
+        return [system._user_to_dict(u) for u in system.users]
+    return {'opportunities': [system._opp_to_dict(o) for o in system.opportunities if o.posted_by == key],
+            'applications': [system._app_to_dict(a) for a in system.applications if a.posted_by == key]}
+
+# Writes one message as a JSON line
+def send_line(wfile, message):
+    wfile.write((json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8"))
+    wfile.flush()
+
+class ReplicationPrimary(socketserver.ThreadingTCPServer):
+    """Streams a system's journal to followers and tracks how far behind each one is.
+
+    The last backlog entries stay in memory: a follower reconnecting within them is caught up entry
+    by entry, otherwise (or if it last followed another primary) it is sent a full snapshot first."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, system, address=("127.0.0.1", 0), backlog=1000, start_seq=0):
+        self.system = system
+        self.primary_id = uuid.uuid4().hex  # New on every start, so followers of another primary resync
+        self.seq = start_seq
+        self.journal = deque(maxlen=backlog)  # Recent entries, oldest first
+        self.followers = {}  # peer -> {'queue', 'acked', 'closed'}
+        self.ack_latencies = deque(maxlen=1000)  # Seconds from save to follower ack
+        self._journal_lock = threading.Lock()
+        super().__init__(address, ReplicationHandler)
+        threading.Thread(target=self.serve_forever, name="replication", daemon=True).start()
+
+    # Appends a journal entry for the shards a save rewrote and queues it for every follower
+    def publish(self, dirty):
+        shards = {key: replication_partition(self.system, key) for key in dirty}
+        with self._journal_lock:
+            self.seq += 1
+            entry = {'seq': self.seq, 'at': time.time(), 'shards': shards}
+            self.journal.append(entry)
+            for follower in self.followers.values():
+                follower['queue'].put(entry)
+
+    # Registers a follower; returns its state and the entries (or snapshot) it needs to catch up
+    def _attach(self, peer, primary_id, last_seq):
+        with self.system._lock, self._journal_lock:  # Same order as save() -> publish()
+            if primary_id == self.primary_id and last_seq >= self.seq - len(self.journal):
+                backlog = [e for e in self.journal if e['seq'] > last_seq]
+            else:
+                backlog = [{'seq': self.seq, 'at': time.time(), 'snapshot': self.system._snapshot_dict()}]
+                last_seq = 0
+            follower = self.followers[peer] = {'queue': queue.Queue(), 'acked': last_seq, 'closed': False}
+            return follower, backlog
+
+    # Records a follower's acknowledgement of everything up to seq
+    def _ack(self, follower, seq):
+        with self._journal_lock:
+            follower['acked'] = seq
+            if self.journal and self.journal[0]['seq'] <= seq:
+                self.ack_latencies.append(time.time() - self.journal[seq - self.journal[0]['seq']]['at'])
+
+    def _detach(self, peer):
+        with self._journal_lock:
+            self.followers.pop(peer, None)
+
+    # Returns the current seq plus each follower's acked seq and lag in entries and seconds
+    def status(self):
+        now = time.time()
+        with self._journal_lock:
+            first = self.journal[0]['seq'] if self.journal else self.seq + 1
+            followers = {}
+            for peer, follower in self.followers.items():
+                behind = self.seq - follower['acked']
+                oldest = follower['acked'] + 1 - first  # Journal index of the oldest unacknowledged entry
+                lag = now - self.journal[oldest]['at'] if behind and 0 <= oldest < len(self.journal) else (0.0 if not behind else None)
+                followers[peer] = {'acked_seq': follower['acked'], 'lag_entries': behind, 'lag_seconds': lag}
+            return {'primary_id': self.primary_id, 'seq': self.seq, 'followers': followers}
+
+    # Stops accepting followers and disconnects the current ones
+    def close(self):
+        self.shutdown()
+        with self._journal_lock:
+            for follower in self.followers.values():
+                follower['queue'].put(None)
+        self.server_close()
+
+class ReplicationHandler(socketserver.StreamRequestHandler):
+    """Sends one follower its catch-up entries, then live entries and heartbeats, and reads its acks."""
+    def handle(self):
+        hello = json.loads(self.rfile.readline() or b"{}")
+        peer = f"{self.client_address[0]}:{self.client_address[1]}"
+        follower, backlog = self.server._attach(peer, hello.get('primary_id'), hello.get('seq', 0))
+        threading.Thread(target=self.read_acks, args=(follower,), daemon=True).start()
+        try:
+            send_line(self.wfile, {'primary_id': self.server.primary_id, 'seq': self.server.seq})
+            for entry in backlog:
+                send_line(self.wfile, entry)
+            while not follower['closed']:
+                try:
+                    entry = follower['queue'].get(timeout=REPLICATION_HEARTBEAT)
+                except queue.Empty:
+                    entry = {'heartbeat': self.server.seq, 'at': time.time()}
+                if entry is None:
+                    break
+                send_line(self.wfile, entry)
+        except OSError:
+            pass  # Follower went away; it resumes from its last acked seq when it reconnects
+        finally:
+            self.server._detach(peer)
+
+    def read_acks(self, follower):
+        try:
+            for line in self.rfile:
+                self.server._ack(follower, json.loads(line)['ack'])
+        except (OSError, ValueError, KeyError):
+            pass
+        follower['closed'] = True
+
+class ReplicaFollower:
+    """Applies a primary's journal to a local, read-only VolunteerSystem from a background thread.
+
+    Queries can be served from .system at any time; its save() raises ReadOnlyReplicaError until
+    promote() is called. With promote_after set, the follower promotes itself once the primary has
+    been unreachable for that many seconds, and with serve_address it then accepts followers itself."""
+    def __init__(self, system, primary_address, promote_after=None, serve_address=None, on_promote=None):
+        self.system = system
+        system.read_only = True
+        self.primary_address = tuple(primary_address)
+        self.promote_after = promote_after
+        self.serve_address = serve_address
+        self.on_promote = on_promote  # Called with the follower after promotion
+        self.primary_id = None
+        self.applied_seq = self.primary_seq = 0
+        self.applied_at = None   # Primary save time of the last applied entry
+        self.last_delay = 0.0    # Seconds from primary save to local apply, for the last entry
+        self.last_contact = time.time()
+        self.connected = self.promoted = False
+        self.server = None       # ReplicationPrimary once promoted with a serve_address
+        self._stop = threading.Event()
+        self._sock = self._wfile = None
+        self._inbox = queue.Queue()  # Received entries waiting for the applier thread
+        threading.Thread(target=self._apply_loop, name="replica-apply", daemon=True).start()
+        self._thread = threading.Thread(target=self._run, name="replica", daemon=True)
+        self._thread.start()
+
+    # Follows the primary, reconnecting after failures, until stopped or promoted
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._follow()
+            except (OSError, ValueError, KeyError):
+                pass
+            self.connected = False
+            if self._stop.is_set():
+                return
+            if self.promote_after is not None and time.time() - self.last_contact >= self.promote_after:
+                self.promote()
+                return
+            self._stop.wait(REPLICATION_HEARTBEAT / 4)
+
+    # One connection: handshake, then hand entries to the applier thread
+    def _follow(self):
+        self._inbox.join()  # Apply what the last connection delivered so the handshake seq is current
+        with socket.create_connection(self.primary_address, timeout=3 * REPLICATION_HEARTBEAT) as sock:
+            self._sock = sock
+            rfile, self._wfile = sock.makefile('rb'), sock.makefile('wb')
+            send_line(self._wfile, {'primary_id': self.primary_id, 'seq': self.applied_seq})
+            hello = json.loads(rfile.readline())
+            self.primary_id, self.primary_seq = hello['primary_id'], hello['seq']
+            self.connected, self.last_contact = True, time.time()
+            for line in rfile:
+                if self._stop.is_set():
+                    return
+                message = json.loads(line)
+                self.last_contact = time.time()
+                if 'heartbeat' in message:
+                    self.primary_seq = max(self.primary_seq, message['heartbeat'])
+                    continue
+                self.primary_seq = max(self.primary_seq, message['seq'])
+                self._inbox.put(message)
+
+    # Applies everything received so far as one batch, then acks the last seq
+    def _apply_loop(self):
+        while True:
+            entries = [self._inbox.get()]
+            while True:
+                try:
+                    entries.append(self._inbox.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.apply(entries)
+                send_line(self._wfile, {'ack': self.applied_seq})
+            except (OSError, ValueError, AttributeError):
+                pass  # Connection gone; the next handshake reports applied_seq instead
+            finally:
+                for _ in entries:
+                    self._inbox.task_done()
+
+    # Replaces the partitions named by journal entries (everything, for a snapshot), rebuilding and writing once
+    def apply(self, entries):
+        system = self.system
+        with system._lock:
+            if self.promoted:
+                return
+            snapshots = [i for i, entry in enumerate(entries) if 'snapshot' in entry]
+            if snapshots:
+                entries = entries[snapshots[-1]:]  # Later entries build on the newest snapshot
+            shards = {}
+            for entry in entries[1:] if snapshots else entries:
+                shards.update(entry['shards'])  # A later partition for the same key supersedes an earlier one
+            dirty = set(shards)
+            if snapshots:
+                data = entries[0]['snapshot']
+                system.users = [system._user_from_dict(u) for u in data['users']]
+                system.opportunities = [system._opp_from_dict(o) for o in data['opportunities']]
+                system.applications = [system._app_from_dict(a) for a in data['applications']]
+                dirty |= {USERS_SHARD} | {o.posted_by for o in system.opportunities} | {a.posted_by for a in system.applications}
+            for key, partition in shards.items():
+                # New containers rather than in-place edits, so open ReadSnapshots stay valid
+                if key == USERS_SHARD:
+                    system.users = [system._user_from_dict(u) for u in partition]
+                    continue
+                system.opportunities = [o for o in system.opportunities if o.posted_by != key] + \
+                                       [system._opp_from_dict(o) for o in partition['opportunities']]
+                system.applications = [a for a in system.applications if a.posted_by != key] + \
+                                      [system._app_from_dict(a) for a in partition['applications']]
+            system._rebuild_indexes()
+            system.store.write(system, dirty)
+            last = entries[-1]
+            self.applied_seq, self.applied_at = last['seq'], last['at']
+            self.last_delay = time.time() - last['at']
+
+    # Returns connection state and replication lag as seen from the follower
+    def status(self):
+        behind = self.primary_seq - self.applied_seq
+        return {'connected': self.connected, 'promoted': self.promoted, 'applied_seq': self.applied_seq,
+                'primary_seq': self.primary_seq, 'lag_entries': behind,
+                'lag_seconds': time.time() - self.applied_at if behind and self.applied_at is not None else self.last_delay,
+                'since_contact': time.time() - self.last_contact}
+
+    # Drops the connection to the primary
+    def _disconnect(self):
+        self._stop.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # Stops following and makes the local system writable; returns the new ReplicationPrimary, if serving
+    def promote(self):
+        self._disconnect()
+        with self.system._lock:
+            if self.promoted:
+                return self.server
+            self.system.read_only = False
+            self.promoted = True
+            if self.serve_address is not None:  # Continue the old journal's numbering
+                self.server = self.system.enable_replication(self.serve_address, start_seq=self.applied_seq)
+        if self.on_promote is not None:
+            self.on_promote(self)
+        return self.server
+
+    # Stops following without promoting
+    def close(self):
+        self._disconnect()
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+# BACKGROUND SEARCH
+# Splits a search query into lowercase terms
+def search_terms(query):
+    return query.lower().split()
+
+# True if every term appears in one of the fields (case-insensitive)
+def matches_terms(terms, *fields):
+    text = " ".join(str(f) for f in fields).lower()
+    return all(term in text for term in terms)
+
+class StreamingSearch:
+    """Runs one filter at a time on a worker thread and streams matches back in batches.
+
+    submit() supersedes whatever is queued or running: the worker compares generations between
+    items and abandons stale scans. Results are queued as (generation, items, done) for the owner
+    to drain on its own thread, at least every batch_seconds while a scan is running."""
+    def __init__(self, batch_size=50, batch_seconds=0.05):
+        self.batch_size, self.batch_seconds = batch_size, batch_seconds
+        self.generation = 0
+        self.results = queue.Queue()
+        self._jobs = queue.Queue()
+        threading.Thread(target=self._run, name="search", daemon=True).start()
+
+    # Starts filtering items (iterated on the worker) with match; returns the query's generation
+    def submit(self, items, match):
+        self.generation += 1
+        self._jobs.put((self.generation, items, match))
+        return self.generation
+
+    # Abandons the current query
+    def cancel(self):
+        self.generation += 1
+
+    # Stops the worker
+    def close(self):
+        self.cancel()
+        self._jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            generation, items, match = job
+            batch, flushed_at = [], time.monotonic()
+            for item in items:
+                if generation != self.generation:
+                    break  # Superseded; drop the rest
+                if match(item):
+                    batch.append(item)
+                if batch and (len(batch) >= self.batch_size or time.monotonic() - flushed_at >= self.batch_seconds):
+                    self.results.put((generation, batch, False))
+                    batch, flushed_at = [], time.monotonic()
+            else:
+                self.results.put((generation, batch, True))
+
+# MEMORY ACCOUNTING
+# Estimates the bytes reachable from obj that are not already in seen (shared objects count once)
+def deep_sizeof(obj, seen):
+    total, stack = 0, [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, threading.Thread, VolunteerSystem, MemoryAccountant)) or callable(item) and not hasattr(item, "__dict__"):
+            continue  # Back-references to the system are not owned by the structure being measured
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__") and not isinstance(item, (str, bytes)):
+            stack.append(item.__dict__)
+    return total
+
+class MemoryAccountant:
+    """Opt-in memory accounting: size estimates per entity type, recruiter and index, plus tracemalloc snapshots.
+
+    Snapshots are labelled so any two can be diffed to spot growth between operations."""
+    def __init__(self, system, frames=1):
+        self.system = system
+        self.snapshots = {}  # label -> (estimate report, tracemalloc snapshot)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    # Estimates bytes per category; live entities are counted first so indexes only show their own overhead
+    def report(self):
+        system, seen = self.system, set()
+        volunteers = [u for u in system.users if isinstance(u, Volunteer)]
+        report = {
+            'entity:applications': deep_sizeof(system.applications, seen),
+            'entity:opportunities': deep_sizeof(system.opportunities, seen),
+            'entity:my_applications': sum(deep_sizeof(v.my_applications, seen) for v in volunteers),
+            'entity:users': deep_sizeof(system.users, seen),
+        }
+        for name in ("status_counters", "slots", "schedules", "recommender", "duplicates", "expiry", "history", "_opps_by_key", "app_index", "user_facets", "opp_facets", "_versions", "events"):
+            report[f'index:{name}'] = deep_sizeof(getattr(system, name), seen)
+        by_recruiter = {}
+        for opp in system.opportunities:
+            by_recruiter.setdefault(opp.posted_by, []).append(opp)
+        for app in system.applications:
+            by_recruiter.setdefault(app.posted_by, []).append(app)
+        for recruiter, items in by_recruiter.items():
+            report[f'recruiter:{recruiter}'] = deep_sizeof(items, set()) - sys.getsizeof(items)
+        return report
+
+    # Records an estimate report and a tracemalloc snapshot under a label
+    def snapshot(self, label):
+        self.snapshots[label] = (self.report(), tracemalloc.take_snapshot())
+        return self.snapshots[label][0]
+
+    # Returns (per-category byte deltas, top allocation-site deltas) between two labelled snapshots
+    def diff(self, before, after, top=10):
+        (old_report, old_snap), (new_report, new_snap) = self.snapshots[before], self.snapshots[after]
+        deltas = {key: new_report.get(key, 0) - old_report.get(key, 0) for key in set(old_report) | set(new_report)}
+        sites = new_snap.compare_to(old_snap, "lineno")[:top]
+        return deltas, sites
 
 # Main system controller class to manage users, opportunities, and applications
 class VolunteerSystem:
     """Manages users, opportunities and applications (with JSON persistence)."""
-    def __init__(self, file_path='data.json'):
-        self.file_path = file_path  # Path to JSON file for data persistence
+    def __init__(self, file_path='data.json', hash_iterations=DEFAULT_HASH_ITERATIONS, hash_workers=None, storage="single", recruiter=None, codec="pretty", fsync="always"):
+        self.file_path = file_path  # Path to JSON file (or shard directory) for data persistence
+        if storage == "sharded":
+            self.store = ShardedStore(file_path, recruiter, codec, fsync)  # One file per recruiter plus users
+        else:
+            self.store = SingleFileStore(file_path, codec, fsync)
+        self._dirty = set()        # Shards touched since the last save (users and/or recruiter usernames)
+        self.cold_store = ColdStore(self.store.archive_path)  # Archived (closed) applications
+        self.history = StatusHistory(self.store.history_path)  # Who changed which status, and when
+        self._unsaved_history = []  # (app, old, new, actor, at) transitions, logged once a save persists them
+        self.notifier = None  # NotificationDispatcher, once enable_notifications is called
         self.users = []            # List to store all registered users
         self.opportunities = []    # List to store all volunteer opportunities
-        self.applications = deque()  # Deque to store all volunteer applications
+        self.applications = []     # List to store all volunteer applications (appended to in place, otherwise replaced)
+        self.hash_iterations = hash_iterations  # PBKDF2 cost factor for new and upgraded hashes
+        self._dummy_hash = f"{HASH_SCHEME}${hash_iterations}${'00' * SALT_BYTES}${'00' * 32}"  # Checked for unknown usernames
+        self._hash_pool = ThreadPoolExecutor(max_workers=hash_workers or os.cpu_count() or 1, thread_name_prefix="pwhash")
+        self._lock = threading.RLock()  # Guards mutations made from pool threads
+        self.recommender = OpportunityRecommender(self)  # Per-volunteer top-k recommendations
+        self.duplicates = DuplicateDetector(self)  # MinHash/LSH index for near-duplicate opportunities
+        self.status_counters = StatusCounters()  # O(1) status counts per recruiter/opportunity
+        self.slots = SlotLedger()  # Capacity accounting and waitlists
+        self.schedules = ScheduleIndex()  # Accepted commitments per volunteer, for conflict checks
+        self.expiry = ExpiryScheduler()  # Open opportunities by end time
+        self.app_index = ApplicationIndex()  # Live applications by user, recruiter, opportunity and status
+        self.user_facets = FacetIndex({"accessibility": lambda u: u.accessibility, "location": location_facet,
+                                       "role": lambda u: (u.role,)}, multi=("accessibility",), key=lambda u: u.username)
+        self.opp_facets = FacetIndex({"accessibility": lambda o: o.accessibility, "location": location_facet,
+                                      "state": lambda o: ("closed" if o.closed else "open",)}, multi=("accessibility",), key=id)
+        self._opps_by_key = {}  # (posted_by, title) -> opportunity
+        self.events = EventBus()  # Dashboards subscribe here for incremental updates
+        self._versions = Counter()  # Mutation count per collection, used to detect stale cursors
+        self.memory = None  # MemoryAccountant, once enable_memory_accounting is called
+        self._snapshots = weakref.WeakSet()  # Open ReadSnapshots needing copy-on-write callbacks
+        self.replication = None  # ReplicationPrimary, once enable_replication is called
+        self.read_only = False   # True while a ReplicaFollower is applying a primary's journal
         self.load()                # Load data from JSON file on initialization
 
     # SERIALIZATION HELPERS
@@ -77,16 +2287,19 @@ class VolunteerSystem:
             'password': user.password,
             'role': user.role,
             'disabilities': user.disabilities,
+            'location': user.location,
+            'accessibility': sorted(user.accessibility),
         }
 
     # Creates a user object from a dictionary
     def _user_from_dict(self, d):
         role = d['role']
         disabilities = d.get('disabilities', "")
+        extra = (d.get('location', ""), d.get('accessibility'))  # Legacy records derive tags from disabilities
         if role == 'Volunteer':
-            return Volunteer(d['name'], d['email'], d['phone'], d['age'], d['username'], d['password'], disabilities)
+            return Volunteer(d['name'], d['email'], d['phone'], d['age'], d['username'], d['password'], disabilities, *extra)
         elif role == 'Recruit':
-            return Recruit(d['name'], d['email'], d['phone'], d['age'], d['username'], d['password'], disabilities)
+            return Recruit(d['name'], d['email'], d['phone'], d['age'], d['username'], d['password'], disabilities, *extra)
 
     # Converts an opportunity object to a dictionary for JSON serialization
     def _opp_to_dict(self, opp):
@@ -96,11 +2309,21 @@ class VolunteerSystem:
             'location': opp.location,
             'date': opp.date,
             'posted_by': opp.posted_by,
+            'capacity': opp.capacity,
+            'archived_accepted': opp.archived_accepted,
+            'start': opp.start,
+            'end': opp.end,
+            'closed': opp.closed,
+            'accessibility': sorted(opp.accessibility),
         }
 
     # Creates an opportunity object from a dictionary
     def _opp_from_dict(self, d):
-        return VolunteerOpportunity(d['title'], d['description'], d['location'], d['date'], d['posted_by'])
+        opp = VolunteerOpportunity(d['title'], d['description'], d['location'], d['date'], d['posted_by'],
+                                   d.get('capacity'), d.get('start'), d.get('end'), d.get('accessibility'))
+        opp.archived_accepted = d.get('archived_accepted', 0)
+        opp.closed = d.get('closed', False)
+        return opp
 
     # Converts an application object to a dictionary for JSON serialization
     def _app_to_dict(self, app):
@@ -109,39 +2332,91 @@ class VolunteerSystem:
             'opportunity_title': app.opportunity_title,
             'posted_by': app.posted_by,
             'status': app.status,
+            'updated_at': app.updated_at,
+            'app_id': app.app_id,
         }
 
     # Creates an application object from a dictionary
     def _app_from_dict(self, d):
         app = VolunteerApplication(d['username'], d['opportunity_title'], d['posted_by'])
         app.status = d['status']
+        app.updated_at = d.get('updated_at')
+        app.app_id = d.get('app_id') or app.app_id  # Legacy records: see _assign_legacy_ids
         return app
 
     # LOAD/SAVE METHODS
-    # Loads data from the JSON file
+    # Loads data from the configured store
     def load(self):
-        try:
-            with open(self.file_path, 'r') as f:
-                data = json.load(f)
-                self.users = [self._user_from_dict(u) for u in data.get('users', [])]
-                self.opportunities = [self._opp_from_dict(o) for o in data.get('opportunities', [])]
-                self.applications = deque([self._app_from_dict(a) for a in data.get('applications', [])])
-                # Populate volunteer my_applications from loaded applications
-                for user in self.users:
-                    if isinstance(user, Volunteer):
-                        user.my_applications = [app for app in self.applications if app.username == user.username]
-        except FileNotFoundError:
-            pass  # If file doesn't exist, start with empty data
+        data = self.store.read()
+        if data is not None:  # If nothing is stored yet, start with empty data
+            self.users = [self._user_from_dict(u) for u in data.get('users', [])]
+            self.opportunities = [self._opp_from_dict(o) for o in data.get('opportunities', [])]
+            self.applications = [self._app_from_dict(a) for a in data.get('applications', [])]
+            self._assign_legacy_ids(data.get('applications', []))
+        self._dirty.clear()
+        self._rebuild_indexes()
 
-    # Saves data to the JSON file
-    def save(self):
-        data = {
+    # Gives legacy records (stored without an app_id) an id derived from their contents and position among
+    # identical records, so every load (and every export of an unsaved store) assigns the same ids
+    def _assign_legacy_ids(self, records):
+        seen = Counter()
+        for record, app in zip(records, self.applications):
+            if not record.get('app_id'):
+                key = (app.username, app.posted_by, app.opportunity_title)
+                seen[key] += 1
+                app.app_id = uuid.uuid5(uuid.NAMESPACE_URL, "vms-app:" + "\0".join(key) + f"\0{seen[key]}").hex
+
+    # Recomputes every derived structure from users, opportunities and applications
+    def _rebuild_indexes(self):
+        # Populate volunteer my_applications from loaded applications (one pass, grouped by username)
+        by_username = {}
+        for app in self.applications:
+            by_username.setdefault(app.username, []).append(app)
+        for user in self.users:
+            if isinstance(user, Volunteer):
+                user.my_applications = by_username.get(user.username, [])
+        self.recommender.invalidate()
+        self.duplicates.invalidate()
+        self.status_counters.rebuild(self.applications)
+        self.slots.rebuild(self.opportunities, self.applications)
+        self._opps_by_key = {(o.posted_by, o.title): o for o in self.opportunities}
+        self.expiry.rebuild(self.opportunities)
+        self.app_index.rebuild(self.applications)
+        self.user_facets.rebuild(self.users)
+        self.opp_facets.rebuild(self.opportunities)
+        self.schedules.clear()
+        for app in self.applications:
+            if app.status == "Accepted":
+                self._schedule_add(app)
+        clashes = self.schedules.overlaps()
+        if clashes:
+            warnings.warn(f"{len(clashes)} pair(s) of accepted commitments overlap; run 'check' for details", ScheduleConflictWarning)
+        self._touch("users", "opportunities", "applications")
+
+    # Builds the full single-document form of the data
+    def _snapshot_dict(self):
+        return {
             'users': [self._user_to_dict(u) for u in self.users],
             'opportunities': [self._opp_to_dict(o) for o in self.opportunities],
             'applications': [self._app_to_dict(a) for a in self.applications],
         }
-        with open(self.file_path, 'w') as f:
-            json.dump(data, f, indent=4)  # Save data with indentation for readability
+
+    # Records which shards a mutation touched
+    def _mark_dirty(self, *keys):
+        self._dirty.update(keys)
+
+    # Saves data to the store; only shards marked dirty are rewritten (everything loaded if none are)
+    def save(self):
+        if self.read_only:
+            raise ReadOnlyReplicaError("This system is a read-only replica; promote it before writing.")
+        dirty = set(self._dirty or {USERS_SHARD} | {o.posted_by for o in self.opportunities} | {a.posted_by for a in self.applications})
+        self.store.write(self, dirty)
+        for transition in self._unsaved_history:
+            self.history.record(*transition)  # Only now did the change happen; a failed write leaves them queued
+        self._unsaved_history.clear()
+        if self.replication is not None:
+            self.replication.publish(dirty)  # Ship the same partitions to followers
+        self._dirty.clear()
 
     # VALIDATION METHODS
     # Checks if a username already exists in the system
@@ -177,7 +2452,15 @@ class VolunteerSystem:
 
     # REGISTRATION
     # Registers a new user with validation
-    def register(self, name, email, phone, age, username, password, confirm_pw, role, disabilities):
+    def register(self, name, email, phone, age, username, password, confirm_pw, role, disabilities, location="", accessibility=None):
+        return self.register_async(name, email, phone, age, username, password, confirm_pw, role, disabilities, location, accessibility).result()
+
+    # Starts registration on the hashing pool; returns a Future resolving to (user or None, message)
+    def register_async(self, *args, **kwargs):
+        return self._hash_pool.submit(self._register, *args, **kwargs)
+
+    # Validates and hashes (already on a pool thread), then adds the user
+    def _register(self, name, email, phone, age, username, password, confirm_pw, role, disabilities, location="", accessibility=None):
         if self.username_exists(username):
             return None, "Username already exists."
         if not self.valid_name(name):
@@ -194,69 +2477,512 @@ class VolunteerSystem:
             return None, "Password must be 6+ chars, include uppercase and a digit."
         if role == "Volunteer" and int(age) < 16:
             return None, "Volunteers must be at least 16 years old."
+        if role not in ("Volunteer", "Recruit"):
+            return None, "Invalid role selected."
+        if accessibility is not None and not set(accessibility) <= set(ACCESSIBILITY_TAGS):
+            return None, "Unknown accessibility tag selected."
+        hashed = hash_password(password, self.hash_iterations)
         if role == "Volunteer":
-            user = Volunteer(name, email, phone, age, username, password, disabilities)
-        elif role == "Recruit":
-            user = Recruit(name, email, phone, age, username, password, disabilities)
+            user = Volunteer(name, email, phone, age, username, hashed, disabilities, location, accessibility)
         else:
-            return None, "Invalid role selected."
-        self.users.append(user)  # Add user to the users list
-        self.save()              # Save data to JSON file
+            user = Recruit(name, email, phone, age, username, hashed, disabilities, location, accessibility)
+        with self._lock:
+            if self.username_exists(username):
+                return None, "Username already exists."  # Taken while we were hashing
+            self.users.append(user)  # Add user to the users list
+            self.user_facets.add(user)
+            self._touch("users")
+            self._mark_dirty(USERS_SHARD)
+            self.save()              # Save data to JSON file
+        self.events.publish(UserRegistered(user))
         return user, f"{name} registered successfully as {role}."
 
     # LOGIN
     # Authenticates a user based on username and password
     def login(self, username, password):
-        for u in self.users:
-            if u.username == username and u.password == password:
-                return u  # Returns user object if credentials match
-        return None   # Returns None if login fails
+        return self.login_async(username, password).result()
+
+    # Starts authentication on the hashing pool; returns a Future resolving to the user or None
+    def login_async(self, username, password):
+        return self._hash_pool.submit(self._check_login, username, password)
+
+    # Verifies credentials and transparently upgrades legacy or outdated hashes
+    def _check_login(self, username, password):
+        user = self.get_user_by_username(username)
+        if user is None:
+            verify_password(password, self._dummy_hash)  # Same cost as a real check, so timing doesn't reveal unknown usernames
+            return None
+        if not verify_password(password, user.password):
+            return None   # Returns None if login fails
+        if password_needs_rehash(user.password, self.hash_iterations):
+            upgraded = hash_password(password, self.hash_iterations)
+            with self._lock:
+                user.password = upgraded
+                self._mark_dirty(USERS_SHARD)
+                self.save()
+        return user  # Returns user object if credentials match
+
+    # Stops the hashing pool (used by headless commands and benchmarks)
+    def close(self):
+        self._hash_pool.shutdown(wait=True)
+        self.store.files.flush()  # Make grouped saves durable
+        if self.notifier is not None:
+            self.notifier.close()
+        if self.replication is not None:
+            self.replication.close()
+
+    # REPLICATION
+    # Starts streaming every save to followers connecting on address; returns the ReplicationPrimary
+    def enable_replication(self, address=("127.0.0.1", 0), backlog=1000, start_seq=0):
+        self.replication = ReplicationPrimary(self, tuple(address), backlog, start_seq)
+        return self.replication
+
+    # MEMORY ACCOUNTING
+    # Turns on tracemalloc-backed memory accounting (off by default because tracing slows allocation)
+    def enable_memory_accounting(self, frames=1):
+        if self.memory is None:
+            self.memory = MemoryAccountant(self, frames)
+        return self.memory
+
+    # NOTIFICATIONS
+    # Emails volunteers when their application is accepted or rejected (sent by the dispatcher's workers)
+    def enable_notifications(self, dispatcher):
+        self.notifier = dispatcher
+        self.events.subscribe(self._notify_status_change)
+
+    # Queues an email for a decided application
+    def _notify_status_change(self, event):
+        if not isinstance(event, ApplicationStatusChanged) or event.old_status == event.new_status or event.new_status == "Pending":
+            return
+        volunteer = self.get_user_by_username(event.application.username)
+        if volunteer is None or not volunteer.email:
+            return
+        self.notifier.enqueue(volunteer.email, f"Your application for {event.application.opportunity_title}",
+                              f"Hi {volunteer.name},\n\nYour application for '{event.application.opportunity_title}' "
+                              f"has been {event.new_status.lower()}.\n\nVolunteerly")
 
     # OPPORTUNITY AND APPLICATION MANAGEMENT
     # Posts a new volunteer opportunity
-    def post_opportunity(self, title, description, location, date, posted_by):
-        opp = VolunteerOpportunity(title, description, location, date, posted_by)
-        self.opportunities.append(opp)  # Adds opportunity to the opportunities list
-        self.save()                    # Save data to JSON file
+    # Warns with DuplicateOpportunityWarning if it resembles existing posts (pass warn_duplicates=False once confirmed)
+    def post_opportunity(self, title, description, location, date, posted_by, capacity=None, start=None, end=None, warn_duplicates=True, accessibility=None):
+        opp = VolunteerOpportunity(title, description, location, date, posted_by, capacity, start, end, accessibility)
+        with self._lock:
+            if warn_duplicates:
+                matches = self.duplicates.find(title, description, location)
+                if matches:
+                    warnings.warn(f"'{title}' resembles " + ", ".join(f"'{o.title}' by {o.posted_by} ({s:.0%})" for _, o, s in matches[:3]),
+                                  DuplicateOpportunityWarning, stacklevel=2)
+            self.opportunities.append(opp)  # Adds opportunity to the opportunities list
+            self._opps_by_key[(posted_by, title)] = opp
+            self.opp_facets.add(opp)
+            self._touch("opportunities")
+            self._mark_dirty(posted_by)
+            self.slots.register_opportunity(opp)
+            self.expiry.add(opp)
+            self.recommender.opportunity_added(len(self.opportunities) - 1)
+            self.save()                    # Save data to JSON file
+        self.events.publish(OpportunityPosted(len(self.opportunities) - 1, opp))
         return opp                     # Returns the created opportunity
 
-    # Returns a copy of all opportunities
+    # Returns (index, opportunity, similarity) for existing opportunities resembling this text, most similar first
+    def find_duplicate_opportunities(self, title, description, location):
+        with self._lock:
+            return self.duplicates.find(title, description, location)
+
+    # Returns near-duplicate clusters as lists of (index, opportunity, similarity to the first), largest first
+    def duplicate_report(self):
+        with self._lock:
+            return [[(i, self.opportunities[i], similarity) for i, similarity in cluster] for cluster in self.duplicates.clusters()]
+
+    # Returns a read-only view of all opportunities (no copy is made)
     def get_opportunities(self):
-        return self.opportunities.copy()
+        return CollectionView(self, "opportunities")
+
+    # Returns a read-only view of all applications (no copy is made)
+    def get_applications(self):
+        return CollectionView(self, "applications")
+
+    # READ SNAPSHOTS
+    # Returns a consistent point-in-time view for long reads (use as a context manager to release it early)
+    def read_snapshot(self):
+        with self._lock:
+            snapshot = ReadSnapshot(self)
+            self._snapshots.add(snapshot)
+        return snapshot
+
+    # Bumps the version of each named collection after a mutation
+    def _touch(self, *collections):
+        for name in collections:
+            self._versions[name] += 1
+
+    # Returns the mutation version of a collection
+    def collection_version(self, collection):
+        return self._versions[collection]
 
     # Allows a volunteer to apply for an opportunity
     def apply_to_opportunity(self, volunteer: Volunteer, opp_index):
         if opp_index < 0 or opp_index >= len(self.opportunities):
             return None, "Invalid opportunity selection."
         opp = self.opportunities[opp_index]
-        app = volunteer.apply(opp)        # Create application via Volunteer class
-        self.applications.append(app)     # Add application to deque
-        self.save()                      # Save data to JSON file
+        if opp.closed:
+            return None, "This opportunity has ended and is closed."
+        with self._lock:
+            clash = self.find_conflict(volunteer.username, opp)
+            if clash is not None:
+                return None, f"This clashes with your accepted commitment '{clash.opportunity_title}'."
+            app = volunteer.apply(opp)        # Create application via Volunteer class
+            self.applications.append(app)     # Add application to the list
+            self.app_index.add(app)
+            self._touch("applications")
+            self._mark_dirty(app.posted_by)
+            self._unsaved_history.append((app, None, app.status, volunteer.username, app.updated_at))
+            self.status_counters.add(app)
+            self.recommender.application_added(app)  # Profile changed, rescore on next request
+            self.save()                      # Save data to JSON file
+        self.events.publish(ApplicationCreated(app))
         return app, f"Applied for '{opp.title}' successfully."
 
+    # Returns the top-k recommended (index, opportunity, score) tuples for a volunteer
+    def recommend_opportunities(self, volunteer, k=10):
+        return self.recommender.top_k(volunteer, k)
+
     # Returns applications posted by a specific recruit
     def get_applications_for_recruit(self, recruit_username):
-        return [app for app in self.applications if app.posted_by == recruit_username]
+        return self.query_applications().recruiter(recruit_username).all()
+
+    # QUERIES
+    # Starts a query over live applications, e.g. query_applications().recruiter(name).status("Pending").limit(20)
+    def query_applications(self):
+        return ApplicationQuery(self)
+
+    # Records one status transition in the counters, history and dirty set (caller holds the lock)
+    def _record_status(self, app, old_status, new_status, actor):
+        for snapshot in list(self._snapshots):
+            snapshot._preserve(app)
+        self.status_counters.change(app, old_status, new_status)
+        self.app_index.change_status(app, old_status, new_status)
+        app.status = new_status  # Update application status
+        app.updated_at = time.time()
+        self._touch("applications")
+        self._mark_dirty(app.posted_by)
+        self._unsaved_history.append((app, old_status, new_status, actor, app.updated_at))
+
+    # SCHEDULE CONFLICTS
+    # Returns the opportunity an application belongs to
+    def get_opportunity_for(self, app):
+        return self._opps_by_key.get((app.posted_by, app.opportunity_title))
+
+    # Returns the accepted application that overlaps an opportunity for a volunteer, or None
+    def find_conflict(self, username, opp, ignore=None):
+        interval = opportunity_interval(opp) if opp is not None else None
+        if interval is None:
+            return None
+        return self.schedules.conflict(username, interval[0], interval[1], ignore)
 
-    # Updates the status of an application
+    # Adds an accepted application to its volunteer's schedule
+    def _schedule_add(self, app):
+        opp = self.get_opportunity_for(app)
+        interval = opportunity_interval(opp) if opp is not None else None
+        if interval is not None:
+            self.schedules.add(app.username, interval[0], interval[1], app)
+
+    # Returns a volunteer's accepted commitments as (start, end, application) in time order
+    def get_schedule(self, username):
+        return self.schedules.schedule(username)
+
+    # Changes an application's status with capacity accounting: accepting into a full opportunity
+    # waitlists instead, accepting into a schedule clash raises ScheduleConflictError and changes
+    # nothing, and freeing a slot promotes the oldest waitlisted application.
+    # Caller holds the lock; returns the ChangeEvents to publish once saved.
+    def _change_status(self, app, new_status, actor, requeued=False):
+        key = (app.posted_by, app.opportunity_title)
+        old_status = app.status
+        if new_status == "Accepted" and old_status != "Accepted":
+            clash = self.find_conflict(app.username, self.get_opportunity_for(app), ignore=app)
+            if clash is not None:
+                raise ScheduleConflictError(app, clash)
+        if new_status == "Accepted" and old_status != "Accepted" and not self.slots.try_reserve(key):
+            new_status = "Waitlisted"
+        if new_status == "Waitlisted" and old_status != "Waitlisted":
+            self.slots.enqueue_waitlist(key, app)
+        self._record_status(app, old_status, new_status, actor)
+        events = [ApplicationStatusChanged(app, old_status, new_status, requeued)]
+        if new_status == "Accepted" and old_status != "Accepted":
+            self._schedule_add(app)
+        if old_status == "Accepted" and new_status != "Accepted":
+            self.schedules.remove(app.username, app)
+            self.slots.release(key)
+            promoted, skipped = self.slots.next_waitlisted(key), []
+            while promoted is not None and self.find_conflict(promoted.username, self.get_opportunity_for(promoted)) is not None:
+                skipped.append(promoted)  # Can't take this slot without a clash; keep their place
+                promoted = self.slots.next_waitlisted(key)
+            for waiting in reversed(skipped):
+                self.slots.requeue_waitlist_front(key, waiting)
+            if promoted is not None and self.slots.try_reserve(key):
+                self._record_status(promoted, "Waitlisted", "Accepted", "system")
+                self._schedule_add(promoted)
+                events.append(ApplicationStatusChanged(promoted, "Waitlisted", "Accepted"))
+        return events
+
+    # Updates the status of an application, given its index in get_applications_for_recruit
     def set_application_status(self, app_index, new_status, recruit_username):
-        apps = self.get_applications_for_recruit(recruit_username)
-        if app_index < 0 or app_index >= len(apps):
-            return False, "Invalid application selection."
-        target = apps[app_index]
-        target.status = new_status  # Update application status
-        self.save()                 # Save data to JSON file
-        return True, f"Application by {target.username} marked as {new_status}."
+        with self._lock:
+            apps = self.get_applications_for_recruit(recruit_username)
+            target = apps[app_index] if 0 <= app_index < len(apps) else None
+        return self.set_application_status_many([(target, new_status)], recruit_username)[0]
+
+    # Applies (application, new_status) decisions with one save; returns an (ok, message) result per decision, in order.
+    # Applications are passed as objects, not list positions, so a list rebuilt since it was shown can't redirect a
+    # decision; one that is no longer live (dequeued or archived) or not the recruiter's is an invalid selection
+    def set_application_status_many(self, decisions, recruit_username):
+        def live(app):
+            return app is not None and app.posted_by == recruit_username and self.app_index.contains(app)
+        with self._lock:
+            results, events = self._apply_decisions(
+                (app if live(app) else None, new_status, recruit_username) for app, new_status in decisions)
+        for event in events:
+            self.events.publish(event)
+        return results
+
+    # Applies (application, new_status, actor) decisions in order and saves once if any succeeded (caller holds the lock
+    # and publishes the returned events); a None application is reported as an invalid selection. Each (ok, message)
+    # result goes to on_result if given (so streamed input is not collected), otherwise into the returned list
+    def _apply_decisions(self, decisions, on_result=None):
+        results, events = [], []
+        report = on_result or (lambda ok, msg: results.append((ok, msg)))
+        for target, new_status, actor in decisions:
+            if target is None:
+                report(False, "Invalid application selection.")
+                continue
+            if new_status not in APPLICATION_STATUSES:
+                report(False, f"Unknown status '{new_status}'.")
+                continue
+            try:
+                events.extend(self._change_status(target, new_status, actor))  # Counters are updated per transition
+            except ScheduleConflictError as e:
+                report(False, str(e))
+                continue
+            report(True, f"Application by {target.username} marked as {target.status}.")
+        if events:
+            self.save()  # One write for the whole batch
+        return results, events
 
     # Processes the next pending application for a recruit
     def process_next_pending(self, recruit_username):
-        for i, app in enumerate(self.applications):
-            if app.posted_by == recruit_username and app.status == "Pending":
-                pending_app = self.applications[i]
-                del self.applications[i]  # Remove from deque (O(n) for deque, acceptable for small sizes)
+        with self._lock:
+            pending_app = self.query_applications().recruiter(recruit_username).status("Pending").first()
+            if pending_app is not None:
+                self.applications = [a for a in self.applications if a is not pending_app]  # New list; open snapshots keep theirs
+                self._touch("applications")
+                self.status_counters.remove(pending_app)
+                self.app_index.remove(pending_app)
                 return pending_app, "Next pending application dequeued."
         return None, "No pending applications."
 
+    # Returns an application taken by process_next_pending to the queue with its decision
+    # (new_status None puts it back at the front, still Pending)
+    def finish_pending(self, app, new_status=None, actor=None):
+        with self._lock:
+            if new_status is None:
+                self.applications = [app] + self.applications  # Back at the front, in a new list for open snapshots
+            else:
+                self.applications.append(app)  # Re-enqueue at end for history
+            self.app_index.add(app, front=new_status is None)
+            self.status_counters.add(app)
+            self._touch("applications")
+            self._mark_dirty(app.posted_by)
+            if new_status == "Accepted" and self.find_conflict(app.username, self.get_opportunity_for(app)) is not None:
+                new_status = None  # Clashes with an accepted commitment; leave it pending
+            if new_status is None:
+                events = [ApplicationStatusChanged(app, app.status, app.status, requeued=True)]
+            else:
+                events = self._change_status(app, new_status, actor or app.posted_by, requeued=True)
+            self.save()
+        for event in events:
+            self.events.publish(event)
+
+    # Returns how many slots an opportunity has left (None if unlimited)
+    def slots_left(self, opp):
+        return self.slots.remaining((opp.posted_by, opp.title))
+
+    # ARCHIVAL
+    # Moves closed applications that are older than max_age_days, or whose opportunity date has passed,
+    # from the live list to the cold store; returns how many were archived. Accepted applications stay
+    # live until their event has ended, so the volunteer's schedule still sees the commitment
+    def archive_closed_applications(self, max_age_days=30, now=None):
+        with self._lock:  # One consistent sweep; appliers and the expiry thread wait for it
+            now = time.time() if now is None else now
+            today = date.fromtimestamp(now)
+            opps_by_key = {(o.posted_by, o.title): o for o in self.opportunities}
+            cutoff = now - max_age_days * 86400
+            keep, archived = [], []
+            for app in self.applications:
+                opp = opps_by_key.get((app.posted_by, app.opportunity_title))
+                when = parse_opp_date(opp.date) if opp is not None else None
+                interval = opportunity_interval(opp) if opp is not None else None
+                closed = app.status in DECIDED_STATUSES
+                old = app.updated_at is None or app.updated_at < cutoff
+                upcoming = app.status == "Accepted" and interval is not None and interval[1] > now
+                if closed and not upcoming and (old or (when is not None and when < today)):
+                    archived.append(app)
+                else:
+                    keep.append(app)
+            if not archived:
+                return 0
+            self.cold_store.append(self._app_to_dict(a) for a in archived)  # Archive first; a retry after a failed save is deduplicated
+            self.applications = keep
+            gone = set(map(id, archived))
+            for app in archived:
+                self.status_counters.remove(app)
+                self.app_index.remove(app)
+                self._mark_dirty(app.posted_by)
+                opp = opps_by_key.get((app.posted_by, app.opportunity_title))
+                if app.status == "Accepted" and opp is not None:
+                    opp.archived_accepted += 1  # The slot stays taken after archiving
+                self.schedules.remove(app.username, app)
+            for user in self.users:
+                if isinstance(user, Volunteer):
+                    user.my_applications = [a for a in user.my_applications if id(a) not in gone]
+            self._touch("applications")
+            self.save()
+            return len(archived)
+
+    # EXPIRY
+    # Closes opportunities that have ended and resolves their open applications as actor "system";
+    # returns (closed opportunities, resolved applications)
+    def expire_opportunities(self, now=None, resolve_as="Rejected"):
+        now = time.time() if now is None else now
+        events, resolved = [], []
+        with self._lock:
+            closed = self.expiry.pop_expired(now)
+            for opp in closed:
+                opp.closed = True
+                self.opp_facets.update(self.opp_facets.row_of(id(opp)), opp)
+                self._mark_dirty(opp.posted_by)
+                key = (opp.posted_by, opp.title)
+                current = self._opps_by_key.get(key)
+                if current is not None and current is not opp and not current.closed:
+                    continue  # A later post reuses this title and is still open; its applicants keep waiting
+                for app in self.app_index.lookup("opportunity", (key,)):
+                    if app.status in OPEN_STATUSES:
+                        try:
+                            events.extend(self._change_status(app, resolve_as, "system"))
+                        except ScheduleConflictError:
+                            continue  # Accepting would double-book; left open for the recruiter to decide
+                        resolved.append(app)
+            if closed:
+                self._touch("opportunities")
+                self.recommender.invalidate()
+                self.save()  # One write per sweep
+        for opp in closed:
+            self.events.publish(OpportunityClosed(opp))
+        for event in events:
+            self.events.publish(event)
+        return closed, resolved
+
+    # Returns seconds until the next opportunity ends, capped at max_wait (0 if one is already due)
+    def seconds_until_expiry(self, max_wait=EXPIRY_MAX_WAIT):
+        with self._lock:
+            due = self.expiry.next_due()
+        return max_wait if due is None else min(max_wait, max(0.0, due - time.time()))
+
+    # Returns one page of archived applications for a volunteer and/or recruiter, plus the next offset
+    def get_archived_applications(self, username=None, posted_by=None, offset=0, limit=50):
+        def where(d):
+            return (username is None or d['username'] == username) and (posted_by is None or d['posted_by'] == posted_by)
+        records, next_offset = self.cold_store.page(offset, limit, where)
+        return [self._app_from_dict(d) for d in records], next_offset
+
+    # FACETED FILTERING
+    # Builds opportunity facet filters (open ones only unless include_closed)
+    def _opportunity_filters(self, accessibility, locations, include_closed):
+        return {"accessibility": tuple(accessibility), "location": tuple(normalize_location(l) for l in locations),
+                "state": () if include_closed else ("open",)}
+
+    # Returns (index, opportunity) pairs providing every given accessibility tag, at any of the locations
+    def find_opportunities(self, accessibility=(), locations=(), include_closed=False):
+        with self._lock:
+            rows = self.opp_facets.select(self._opportunity_filters(accessibility, locations, include_closed))
+            return [(i, self.opportunities[i]) for i in rows]
+
+    # Returns {facet: {value: count}} over the opportunities the same filters select
+    def opportunity_facet_counts(self, accessibility=(), locations=(), include_closed=False):
+        with self._lock:
+            return self.opp_facets.facet_counts(self._opportunity_filters(accessibility, locations, include_closed))
+
+    # Returns users with every given accessibility need, at any of the locations (and of a role, if given)
+    def find_users(self, accessibility=(), locations=(), role=None):
+        filters = {"accessibility": tuple(accessibility), "location": tuple(normalize_location(l) for l in locations),
+                   "role": () if role is None else (role,)}
+        with self._lock:
+            return [self.users[i] for i in self.user_facets.select(filters)]
+
+    # Returns {facet: {value: count}} over the distinct volunteers who applied to a recruiter's opportunities
+    def applicant_facet_counts(self, recruit_username, accessibility=(), locations=()):
+        filters = {"accessibility": tuple(accessibility), "location": tuple(normalize_location(l) for l in locations)}
+        with self._lock:
+            names = {app.username for app in self.app_index.lookup("posted_by", (recruit_username,))}
+            applicants = Bitmap(row for row in map(self.user_facets.row_of, names) if row is not None)
+            return self.user_facets.facet_counts(filters, within=applicants)
+
+    # STATUS HISTORY QUERIES
+    # Returns decisions made by a recruiter on a given day (default today); "system" resolutions
+    # of their applications (expiry, waitlist promotion) are not theirs and are left out
+    def get_decisions_on(self, recruit_username, day=None):
+        day = day or date.today()
+        start = datetime(day.year, day.month, day.day).timestamp()
+        return self.history.decisions(start, start + 86400, recruiter=recruit_username, actor=recruit_username)
+
+    # Returns time-to-decision percentiles in seconds for a recruiter (or everyone)
+    def get_time_to_decision(self, recruit_username=None, percentiles=(50, 90, 99)):
+        return self.history.time_to_decision_percentiles(recruit_username, percentiles)
+
+    # Returns Pending/Accepted/Rejected counts for a recruiter, or for one of their opportunities
+    def get_status_counts(self, recruit_username, opportunity_title=None):
+        if opportunity_title is None:
+            return self.status_counters.for_recruiter(recruit_username)
+        return self.status_counters.for_opportunity(recruit_username, opportunity_title)
+
+    # Verifies the incremental counters against a full recount; returns mismatches
+    def check_status_counters(self):
+        return self.status_counters.verify(self.applications)
+
+    # Checks references, duplicates, derived indexes and capacity; returns a list of problem descriptions
+    def check_integrity(self):
+        problems = []
+        seen = Counter(u.username for u in self.users)
+        problems += [f"duplicate username {name!r} ({count}x)" for name, count in seen.items() if count > 1]
+        app_ids = Counter(a.app_id for a in self.applications)
+        problems += [f"duplicate app_id {app_id}" for app_id, count in app_ids.items() if count > 1]
+        opp_keys = Counter((o.posted_by, o.title) for o in self.opportunities)
+        problems += [f"duplicate opportunity {title!r} by {posted_by!r} ({count}x)" for (posted_by, title), count in opp_keys.items() if count > 1]
+        for app in self.applications:
+            if app.username not in seen:
+                problems.append(f"application {app.app_id} references unknown user {app.username!r}")
+            if app.posted_by not in seen:
+                problems.append(f"application {app.app_id} references unknown recruiter {app.posted_by!r}")
+            if (app.posted_by, app.opportunity_title) not in self._opps_by_key:
+                problems.append(f"application {app.app_id} references unknown opportunity {app.opportunity_title!r}")
+            if app.status not in APPLICATION_STATUSES:
+                problems.append(f"application {app.app_id} has invalid status {app.status!r}")
+        for user in self.users:
+            if isinstance(user, Volunteer):
+                live = {id(a) for a in self.applications if a.username == user.username}
+                if {id(a) for a in user.my_applications} != live:
+                    problems.append(f"my_applications out of sync for {user.username!r}")
+        for opp in self.opportunities:
+            if opp.capacity is not None:
+                accepted = self.get_status_counts(opp.posted_by, opp.title)['Accepted'] + opp.archived_accepted
+                if accepted > opp.capacity:
+                    problems.append(f"opportunity {opp.title!r} by {opp.posted_by!r} is over capacity ({accepted}/{opp.capacity})")
+        problems += self.check_status_counters()
+        problems += [f"{username!r} has overlapping accepted commitments {a.opportunity_title!r} and {b.opportunity_title!r}"
+                     for username, a, b in self.schedules.overlaps()]
+        problems += self.app_index.verify(self.applications)
+        problems += self.user_facets.verify(self.users, "user")
+        problems += self.opp_facets.verify(self.opportunities, "opportunity")
+        return problems
+
     # Retrieves a user by their username
     def get_user_by_username(self, username):
         for u in self.users:
@@ -264,9 +2990,850 @@ class VolunteerSystem:
                 return u
         return None
 
+    # EXPORT
+    # Streams one row per applicant to a recruiter's opportunities, joined to user and opportunity
+    # through dict indexes built once (instead of a user scan per row)
+    def iter_applicant_rows(self, recruit_username, opportunity_title=None, include_archived=False):
+        with self.read_snapshot() as snapshot:  # Rows stay consistent while other threads keep deciding
+            users = {u.username: u for u in snapshot.users()}
+            opps = {o.title: o for o in snapshot.opportunities() if o.posted_by == recruit_username}
+            apps = (a for a in snapshot.applications() if a.posted_by == recruit_username)
+            if include_archived:
+                archived = (self._app_from_dict(d) for d in self.cold_store if d['posted_by'] == recruit_username)
+                apps = chain(apps, archived)
+            for app in apps:
+                if opportunity_title is not None and app.opportunity_title != opportunity_title:
+                    continue
+                opp, person = opps.get(app.opportunity_title), users.get(app.username)
+                yield {
+                    'opportunity_title': app.opportunity_title,
+                    'location': opp.location if opp else "",
+                    'date': opp.date if opp else "",
+                    'status': app.status,
+                    'username': app.username,
+                    'name': person.name if person else "",
+                    'email': person.email if person else "",
+                    'phone': person.phone if person else "",
+                    'age': person.age if person else "",
+                    'disabilities': person.disabilities if person else "",
+                }
+
+    # Writes a recruiter's applicant report to a path ("-" for stdout); returns the row count
+    def export_applicants(self, recruit_username, path, fmt="csv", opportunity_title=None, include_archived=False):
+        rows = self.iter_applicant_rows(recruit_username, opportunity_title, include_archived)
+        if path == "-":
+            return write_rows(rows, sys.stdout, fmt)
+        with open(path, 'w', newline='') as f:
+            return write_rows(rows, f, fmt)
+
+# BENCHMARKS
+# Measures login throughput through the hashing pool, reported per core
+def bench_logins(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        system = VolunteerSystem(os.path.join(tmp, "bench.json"), hash_iterations=args.iterations, hash_workers=args.workers)
+        for i in range(args.users):
+            system.register("Bench User", f"bench{i}@example.com", "0211234567", "30", f"bench{i}", "Passw0rd", "Passw0rd", "Volunteer", "")
+        start = time.perf_counter()
+        futures = [system.login_async(f"bench{i % args.users}", "Passw0rd") for i in range(args.logins)]
+        ok = sum(1 for f in futures if f.result() is not None)
+        elapsed = time.perf_counter() - start
+        system.close()
+    workers = args.workers or os.cpu_count() or 1
+    rate = args.logins / elapsed if elapsed else float("inf")
+    print(f"{ok}/{args.logins} logins in {elapsed:.3f}s with {workers} worker(s), {args.iterations} iterations")
+    print(f"{rate:.1f} logins/s total, {rate / workers:.1f} logins/s per core")
+    return 0
+
+# STORAGE COMMANDS
+# Copies a single-file store into a sharded directory
+def convert_to_shards(args):
+    system = VolunteerSystem(args.source)
+    system.store = ShardedStore(args.directory, codec=args.codec)
+    system.save()  # Nothing is dirty, so every shard is written
+    system.close()
+    print(f"Wrote {len(system.store.manifest)} recruiter shard(s) to {args.directory}")
+    return 0
+
+# SYNTHETIC DATA
+# Builds a reproducible dataset in the on-disk dict format (passwords are left in legacy plaintext)
+def make_synthetic_data(n_volunteers=2000, n_recruiters=50, n_opportunities=1000, n_applications=10000, seed=1):
+    rng = random.Random(seed)
+    towns = ["Auckland", "Wellington", "Christchurch", "Hamilton", "Dunedin", "Tauranga", "Napier", "Nelson"]
+    words = ["beach", "cleanup", "food", "bank", "tree", "planting", "library", "reading", "animal", "shelter", "sports", "coaching", "wheelchair", "accessible", "quiet", "seated"]
+    users = [{'name': f"Recruiter {i}", 'email': f"recruiter{i}@example.org", 'phone': "0211234567", 'age': 40,
+              'username': f"recruiter{i}", 'password': "Passw0rd", 'role': "Recruit", 'disabilities': ""} for i in range(n_recruiters)]
+    users += [{'name': f"Volunteer {i}", 'email': f"volunteer{i}@example.com", 'phone': "0217654321", 'age': 16 + i % 60,
+               'username': f"volunteer{i}", 'password': "Passw0rd", 'role': "Volunteer", 'location': towns[i % len(towns)],
+               'disabilities': rng.choice(["", "", "", "wheelchair user", "hard of hearing", "low vision"])} for i in range(n_volunteers)]
+    opportunities = [{'title': f"{rng.choice(words).title()} {rng.choice(words)} #{i}",
+                      'description': " ".join(rng.choice(words) for _ in range(20)),
+                      'location': rng.choice(towns),
+                      'date': f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.choice([25, 26, 27])}",
+                      'posted_by': f"recruiter{rng.randrange(n_recruiters)}", 'capacity': None} for i in range(n_opportunities)]
+    for opp in opportunities:
+        opp['accessibility'] = sorted(accessibility_tags(opp['description']))  # Declared provisions for the facet indexes
+    applications = []
+    for _ in range(n_applications):
+        opp = rng.choice(opportunities)
+        applications.append({'username': f"volunteer{rng.randrange(n_volunteers)}", 'opportunity_title': opp['title'],
+                             'posted_by': opp['posted_by'], 'status': rng.choice(("Pending", "Accepted", "Rejected"))})
+    return {'users': users, 'opportunities': opportunities, 'applications': applications}
+
+# Writes a synthetic dataset to a file for benchmarks and load tests
+def write_synthetic_file(path, codec="pretty", **sizes):
+    write_json_file(path, make_synthetic_data(**sizes), codec)
+
+# Compares file size, save latency and load latency for each storage codec
+def bench_codecs(args):
+    data = make_synthetic_data(n_applications=args.applications, seed=args.seed)
+    print(f"{'codec':<8} {'bytes':>12} {'save ms':>10} {'load ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in STORAGE_CODECS:
+            path = os.path.join(tmp, f"bench.{codec}")
+            system = VolunteerSystem(path, codec=codec, hash_workers=1)
+            write_json_file(path, data, codec)
+            system.load()
+            save_times, load_times = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter(); system.save(); save_times.append(time.perf_counter() - start)
+                start = time.perf_counter(); system.load(); load_times.append(time.perf_counter() - start)
+            system.close()
+            print(f"{codec:<8} {os.path.getsize(path):>12} {1000 * min(save_times):>10.1f} {1000 * min(load_times):>10.1f}")
+    return 0
+
+# Moves closed applications to the cold tier
+def archive_command(args):
+    system = VolunteerSystem(args.file, storage=args.storage)
+    moved = system.archive_closed_applications(args.max_age_days)
+    system.close()
+    print(f"Archived {moved} closed application(s) to {system.cold_store.path}")
+    return 0
+
+# Streams a recruiter's applicant report as CSV or JSONL
+def export_applicants_command(args):
+    system = VolunteerSystem(args.file, storage=args.storage, recruiter=args.recruiter if args.storage == "sharded" else None)
+    count = system.export_applicants(args.recruiter, args.output, args.format, args.opportunity, args.include_archived)
+    system.close()
+    print(f"Exported {count} row(s)", file=sys.stderr)
+    return 0
+
+# Runs a local SMTP sink that prints every message it receives
+def smtp_sink_command(args):
+    def show(mail_from, rcpt_tos, data):
+        print(f"--- from {mail_from} to {', '.join(rcpt_tos)}\n{data.decode('utf-8', 'replace')}", flush=True)
+    server = SMTPSink((args.host, args.port), show)
+    print(f"SMTP sink listening on {server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+# Sends decision emails for a burst of status changes through a local sink and reports the dispatcher metrics
+def bench_notifications(args):
+    server = SMTPSink()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.json")
+        write_synthetic_file(path, n_applications=args.decisions, seed=args.seed)
+        system = VolunteerSystem(path, hash_workers=1)
+        system.enable_notifications(NotificationDispatcher("127.0.0.1", server.server_address[1], workers=args.workers))
+        system.save = lambda: None  # Measure the notification path, not persistence
+        start = time.perf_counter()
+        for app in list(system.applications):
+            old = app.status
+            app.status = "Accepted" if old != "Accepted" else "Rejected"
+            system.events.publish(ApplicationStatusChanged(app, old, app.status))
+        peak = system.notifier.metrics()['queue_depth']
+        system.close()
+        elapsed = time.perf_counter() - start
+        stats = system.notifier.metrics()
+    server.shutdown()
+    print(f"{stats['sent']} sent, {stats['failed']} failed, {stats['retries']} retries in {elapsed:.2f}s (peak queue depth {peak})")
+    print(f"delivery latency p50 {stats['latency_p50']:.3f}s p95 {stats['latency_p95']:.3f}s p99 {stats['latency_p99']:.3f}s")
+    return 0
+
+# LOAD TESTING
+LOAD_OPERATIONS = ("login", "browse", "apply", "accept")
+
+# Parses "login=1,browse=5,apply=2,accept=1" into operation weights
+def parse_mix(text):
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in LOAD_OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}' (choose from {', '.join(LOAD_OPERATIONS)})")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+# Runs one load-test worker process against its own copy of the dataset; returns latencies, resource use and
+# the epoch window its operations ran in. Workers share nothing, so this measures per-process throughput, not contention
+def run_load_worker(worker_id, source_path, operations, mix, seed, hash_iterations, codec):
+    rng = random.Random(seed * 1000 + worker_id)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "load.json")
+        write_json_file(path, read_json_file(source_path), codec)
+        system = VolunteerSystem(path, hash_iterations=hash_iterations, hash_workers=1, codec=codec)
+        volunteers = [u for u in system.users if isinstance(u, Volunteer)]
+        recruiters = [u for u in system.users if isinstance(u, Recruit)]
+        names, weights = list(mix), [mix[name] for name in mix]
+        latencies = {name: [] for name in names}
+        cpu_start, wall_start, began = time.process_time(), time.perf_counter(), time.time()
+        for _ in range(operations):
+            op = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            if op == "login":
+                system.login(rng.choice(volunteers + recruiters).username, "Passw0rd")
+            elif op == "browse":
+                view = system.get_opportunities()
+                view.page(PageCursor("opportunities", rng.randrange(max(1, len(view))), view.version), limit=20)
+                system.recommend_opportunities(rng.choice(volunteers), k=10)
+            elif op == "apply":
+                system.apply_to_opportunity(rng.choice(volunteers), rng.randrange(len(system.opportunities)))
+            elif op == "accept":
+                recruit = rng.choice(recruiters).username
+                count = system.get_status_counts(recruit)
+                total = sum(count.values())
+                if total:
+                    system.set_application_status(rng.randrange(total), rng.choice(DECIDED_STATUSES), recruit)
+            latencies[op].append(time.perf_counter() - start)
+        wall, cpu, ended = time.perf_counter() - wall_start, time.process_time() - cpu_start, time.time()
+        system.close()
+    try:
+        import resource  # POSIX only
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        peak_kb = None
+    return {'latencies': latencies, 'wall': wall, 'cpu': cpu, 'peak_kb': peak_kb, 'window': (began, ended)}
+
+# Returns the p-th percentile of a sorted list
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+# Drives VolunteerSystem from several processes with a seeded operation mix and reports latency percentiles.
+# Each worker mutates a private copy of the store, so the processes never contend for the same file or lock
+def load_test(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.data
+        if source is None:
+            source = os.path.join(tmp, "synthetic.json")
+            write_synthetic_file(source, n_volunteers=args.volunteers, n_recruiters=args.recruiters,
+                                 n_opportunities=args.opportunities, n_applications=args.applications, seed=args.seed)
+        # fork keeps workers from re-running this script's GUI section; other platforms fall back to spawn
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        start = time.perf_counter()
+        with multiprocessing.get_context(method).Pool(args.processes) as pool:
+            results = pool.starmap(run_load_worker, [(i, source, args.operations, args.mix, args.seed, args.hash_iterations, args.codec)
+                                                     for i in range(args.processes)])
+        elapsed = time.perf_counter() - start
+    # Rates are over the wall-clock span in which any worker was running operations (setup excluded)
+    measured = max(r['window'][1] for r in results) - min(r['window'][0] for r in results)
+    print(f"isolated workers: {args.processes} process(es) x {args.operations} ops, seed {args.seed}, {elapsed:.2f}s wall ({measured:.2f}s measured)")
+    print("each process works on its own private copy of the store, so nothing is shared and nothing contends;"
+          " the rates below add up independent stores, not one store under concurrent load")
+    print(f"{'operation':<10} {'count':>8} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for op in args.mix:
+        values = sorted(chain.from_iterable(r['latencies'][op] for r in results))
+        rate = len(values) / measured if measured > 0 else 0.0
+        p50, p95, p99 = (1000 * (percentile(values, p) or 0) for p in (50, 95, 99))
+        print(f"{op:<10} {len(values):>8} {rate:>10.1f} {p50:>9.2f} {p95:>9.2f} {p99:>9.2f}")
+    total_ops = args.processes * args.operations
+    cpu = sum(r['cpu'] for r in results)
+    peaks = [r['peak_kb'] for r in results if r['peak_kb'] is not None]
+    print(f"sum of isolated workers {total_ops / measured if measured > 0 else 0.0:.1f} ops/s, CPU {cpu:.2f}s across workers"
+          + (f", peak RSS per worker {max(peaks) / 1024:.1f} MiB" if peaks else ""))
+    return 0
+
+# REPLICATION COMMANDS
+# Parses "host:port"
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    if not port.isdigit():
+        raise argparse.ArgumentTypeError(f"Expected host:port, got '{text}'")
+    return (host or "127.0.0.1", int(port))
+
+# Follows a primary into a local store, printing lag until interrupted; promotes itself if the primary disappears
+def replica_command(args):
+    system = VolunteerSystem(args.file, hash_workers=1, storage=args.storage, codec=args.codec)
+    follower = ReplicaFollower(system, args.primary, promote_after=args.promote_after, serve_address=args.serve,
+                               on_promote=lambda f: print(f"Promoted at seq {f.applied_seq}"
+                                                          + (f"; serving followers on {f.server.server_address[1]}" if f.server else ""), flush=True))
+    try:
+        while True:
+            time.sleep(args.interval)
+            status = follower.status()
+            if status['promoted']:
+                continue
+            print(f"{'connected' if status['connected'] else 'disconnected'} seq {status['applied_seq']}/{status['primary_seq']} "
+                  f"lag {status['lag_entries']} entr(ies) {status['lag_seconds']:.3f}s", flush=True)
+    except KeyboardInterrupt:
+        pass
+    follower.close()
+    system.close()
+    return 0
+
+# Follows a primary in a child process until promotion, then reports what the replica holds
+def run_replica_process(addresses, path, promote_after, results):
+    system = VolunteerSystem(path, hash_workers=1, codec="compact")
+    promoted = threading.Event()
+    follower = ReplicaFollower(system, addresses.get(), promote_after=promote_after, on_promote=lambda f: promoted.set())
+    promoted.wait()
+    promoted_at = time.time()
+    system.save()  # Writable once promoted
+    results.put({'promoted_at': promoted_at, 'applied_seq': follower.applied_seq,
+                 'statuses': dict(Counter(a.status for a in system.applications))})
+    system.close()
+
+# Decides applications on a primary with a follower process attached, then kills the primary and times the promotion
+def bench_replication(args):
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "primary.json")
+        write_synthetic_file(path, "compact", n_applications=args.applications, seed=args.seed)
+        addresses, results = context.Queue(), context.Queue()
+        replica = context.Process(target=run_replica_process, args=(addresses, os.path.join(tmp, "replica.json"), args.promote_after, results))
+        replica.start()  # Before the primary exists, so the child inherits no listening socket
+        system = VolunteerSystem(path, hash_workers=1, codec="compact")
+        primary = system.enable_replication()
+        addresses.put(primary.server_address)
+        deadline = time.time() + 30
+        while not any(f['acked_seq'] == primary.seq for f in primary.status()['followers'].values()) and time.time() < deadline:
+            time.sleep(0.05)
+        rng = random.Random(args.seed)
+        recruiters = sorted({a.posted_by for a in system.applications})
+        start = time.perf_counter()
+        for _ in range(args.decisions):
+            app, _ = system.process_next_pending(rng.choice(recruiters))
+            if app is not None:
+                system.finish_pending(app, rng.choice(DECIDED_STATUSES), "bench")
+        elapsed = time.perf_counter() - start
+        while primary.status()['followers'] and any(f['lag_entries'] for f in primary.status()['followers'].values()) and time.time() < deadline + 30:
+            time.sleep(0.05)
+        latencies = sorted(primary.ack_latencies)
+        expected = dict(Counter(a.status for a in system.applications))
+        seq = primary.seq
+        failed_at = time.time()
+        system.close()  # Simulated primary failure
+        result = results.get(timeout=args.promote_after + 30)
+        replica.join()
+    print(f"{seq} journal entries in {elapsed:.2f}s; follower acked {result['applied_seq']}")
+    p50, p99 = (1000 * (percentile(latencies, p) or 0) for p in (50, 99))
+    print(f"save-to-ack lag p50 {p50:.1f} ms p99 {p99:.1f} ms")
+    print(f"promoted {result['promoted_at'] - failed_at:.2f}s after the primary stopped (promote-after {args.promote_after}s)")
+    match = result['statuses'] == expected
+    print("replica matches primary" if match else f"replica differs: {result['statuses']} vs {expected}")
+    return 0 if match else 1
+
+# BATCH COMMANDS
+# Record types used by export/import (one JSON object per line)
+RECORD_TYPES = ("user", "opportunity", "application")
+
+# Opens the system named by the common --file/--storage/--codec options
+def open_system(args):
+    return VolunteerSystem(args.file, hash_workers=1, storage=args.storage, codec=getattr(args, "codec", None) or "pretty",
+                           fsync=getattr(args, "fsync", None) or "always")
+
+# Opens a path for streaming text, with "-" meaning stdin/stdout
+def open_stream(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="")
+
+# Streams the store as JSON Lines records tagged with their type
+def export_command(args):
+    system = open_system(args)
+    out = open_stream(args.output, "w")
+    sources = {"user": (system.users, system._user_to_dict),
+               "opportunity": (system.opportunities, system._opp_to_dict),
+               "application": (system.applications, system._app_to_dict)}
+    count = 0
+    for kind in args.types:
+        items, to_dict = sources[kind]
+        for item in items:
+            out.write(json.dumps(dict(to_dict(item), type=kind)) + "\n")
+            count += 1
+    if out is not sys.stdout:
+        out.close()
+    system.close()
+    print(f"Exported {count} record(s)", file=sys.stderr)
+    return 0
+
+# Streams JSON Lines records into the store, skipping duplicate users; saves once at the end
+def import_command(args):
+    system = open_system(args)
+    usernames = {u.username for u in system.users}
+    opp_keys = {(o.posted_by, o.title) for o in system.opportunities}
+    app_ids = {a.app_id for a in system.applications}
+    counts, duplicates, skipped = Counter(), Counter(), 0
+    source = open_stream(args.input, "r")
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            kind = record.pop("type")
+            if kind == "user":
+                if record['username'] in usernames:
+                    duplicates[kind] += 1
+                    continue
+                user = system._user_from_dict(record)
+                if user is None:
+                    raise ValueError(f"unknown role {record['role']!r}")
+                system.users.append(user)
+                usernames.add(user.username)
+                system._mark_dirty(USERS_SHARD)
+            elif kind == "opportunity":
+                key = (record['posted_by'], record['title'])
+                if key in opp_keys:
+                    duplicates[kind] += 1
+                    continue
+                system.opportunities.append(system._opp_from_dict(record))
+                opp_keys.add(key)
+                system._mark_dirty(record['posted_by'])
+            elif kind == "application":
+                if record.get('app_id') in app_ids:
+                    duplicates[kind] += 1
+                    continue
+                app = system._app_from_dict(record)
+                system.applications.append(app)
+                app_ids.add(app.app_id)
+                system._mark_dirty(record['posted_by'])
+            else:
+                raise ValueError(f"unknown record type {kind!r}")
+            counts[kind] += 1
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"line {line_number}: skipped ({e})", file=sys.stderr)
+            skipped += 1
+    if source is not sys.stdin:
+        source.close()
+    system._rebuild_indexes()
+    system.save()
+    system.close()
+    print(f"Imported {dict(counts)}; already present {dict(duplicates)}; skipped {skipped}", file=sys.stderr)
+    return 0
+
+# Prints collection sizes, status totals and the busiest recruiters
+def stats_command(args):
+    system = open_system(args)
+    roles = Counter(u.role for u in system.users)
+    statuses = Counter(a.status for a in system.applications)
+    print(f"users: {len(system.users)} ({', '.join(f'{k} {v}' for k, v in sorted(roles.items()))})")
+    print(f"opportunities: {len(system.opportunities)}")
+    print(f"applications: {len(system.applications)} ({', '.join(f'{k} {v}' for k, v in sorted(statuses.items()))})")
+    recruiters = Counter(a.posted_by for a in system.applications)
+    for recruit, total in recruiters.most_common(args.top):
+        counts = system.get_status_counts(recruit)
+        print(f"  {recruit}: {total} " + " ".join(f"{k[0]}:{v}" for k, v in counts.items()))
+    system.close()
+    return 0
+
+# Applies status updates streamed as JSON Lines ({"app_id": ..., "status": ...}) or CSV with those columns
+def set_status_command(args):
+    system = open_system(args)
+    by_id = {a.app_id: a for a in system.applications}
+    source = open_stream(args.input, "r")
+    rows = csv.DictReader(source) if args.format == "csv" else (line for line in source if line.strip())
+    current = {}  # The row being applied, for reporting; rows are read and decided one at a time
+    counts = Counter()
+    def decisions():
+        for row in rows:
+            current['row'] = row.strip() if isinstance(row, str) else row
+            if args.format != "csv":
+                try:
+                    row = json.loads(row)
+                except ValueError as e:
+                    report(False, f"not valid JSON ({e})")
+                    continue
+                if not isinstance(row, dict):
+                    report(False, "not a JSON object")
+                    continue
+            yield by_id.get(row.get('app_id')), row.get('status'), row.get('actor') or args.actor
+    def report(ok, msg):
+        counts[ok] += 1
+        if not ok:
+            print(f"skipped {current['row']}: {msg}", file=sys.stderr)
+    with system._lock:
+        _, events = system._apply_decisions(decisions(), report)
+    applied, failed = counts[True], counts[False]
+    for event in events:
+        system.events.publish(event)
+    if source is not sys.stdin:
+        source.close()
+    system.close()
+    print(f"Updated {applied} application(s); skipped {failed}", file=sys.stderr)
+    return 1 if failed else 0
+
+# Rewrites the store (optionally with another codec) after archiving old closed applications
+def compact_command(args):
+    system = open_system(args)
+    moved = system.archive_closed_applications(args.archive_days) if args.archive_days is not None else 0
+    system._dirty.clear()
+    system.save()  # Nothing dirty, so everything is rewritten with the chosen codec
+    system.close()
+    print(f"Compacted {args.file} with codec {system.store.codec}; archived {moved} application(s)", file=sys.stderr)
+    return 0
+
+# Runs integrity checks; exits non-zero if anything is wrong
+def check_command(args):
+    system = open_system(args)
+    problems = [f"{path}: corrupt or missing, loaded the previous generation" for path in sorted(system.store.files.recovered)]
+    problems += system.check_integrity()
+    for problem in problems:
+        print(problem)
+    system.close()
+    print(f"{len(problems)} problem(s) found", file=sys.stderr)
+    return 1 if problems else 0
+
+# Closes opportunities that have ended and resolves their open applications; with --watch, keeps sweeping on a timer
+def expire_command(args):
+    system = open_system(args)
+    def report(closed, resolved):
+        for opp in closed:
+            print(f"closed {opp.title!r} by {opp.posted_by} ({opp.date})", flush=True)
+        print(f"Closed {len(closed)} opportunit(ies); resolved {len(resolved)} open application(s) as {args.resolve_as}", file=sys.stderr, flush=True)
+    if args.watch:
+        timer = ExpiryTimer(system, args.max_wait, report, args.resolve_as)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        timer.stop()
+    else:
+        report(*system.expire_opportunities(resolve_as=args.resolve_as))
+    system.close()
+    return 0
+
+# Prints live applications matching the filters as JSON Lines; --explain prints the query plan instead
+def query_command(args):
+    system = open_system(args)
+    query = system.query_applications()
+    if args.user:
+        query = query.user(args.user)
+    if args.recruiter:
+        query = query.recruiter(args.recruiter)
+    if args.opportunity:
+        if not args.recruiter:
+            system.close()
+            print("--opportunity needs --recruiter", file=sys.stderr)
+            return 2
+        query = query.opportunity(args.recruiter, args.opportunity)
+    if args.status:
+        query = query.status(*args.status)
+    if args.needs or args.applicant_location:
+        query = query.applicant(args.needs or (), args.applicant_location or ())
+    if args.since or args.until:
+        bound = lambda text: datetime.strptime(text, "%Y-%m-%d").timestamp() if text else None
+        query = query.updated_between(bound(args.since), bound(args.until))
+    if args.sort:
+        query = query.order_by(args.sort, args.desc)
+    if args.limit is not None:
+        query = query.limit(args.limit)
+    if args.explain:
+        print(query.explain())
+    else:
+        for app in query:
+            print(json.dumps(system._app_to_dict(app)))
+    system.close()
+    return 0
+
+# Prints facet counts for open opportunities (or a recruiter's applicants), optionally listing the matches
+def facets_command(args):
+    system = open_system(args)
+    needs, locations = args.accessibility or (), args.location or ()
+    if args.recruiter:
+        counts = system.applicant_facet_counts(args.recruiter, needs, locations)
+        matches = system.query_applications().recruiter(args.recruiter).applicant(needs, locations) if args.list else ()
+        rows = (f"{app.username} -> {app.opportunity_title} ({app.status})" for app in matches)
+    else:
+        counts = system.opportunity_facet_counts(needs, locations, args.include_closed)
+        matches = system.find_opportunities(needs, locations, args.include_closed) if args.list else ()
+        rows = (f"[{i+1}] {opp.title} - {opp.location} ({opp.date}) {', '.join(sorted(opp.accessibility))}" for i, opp in matches)
+    for facet, values in counts.items():
+        print(f"{facet}: " + ", ".join(f"{value} {n}" for value, n in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))))
+    for row in rows:
+        print(row)
+    system.close()
+    return 0
+
+# Times saves under each fsync policy, the footer check on load, and recovery from a truncated file
+def bench_durability(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'policy':<8} {'saves':>6} {'fsyncs':>7} {'p50 ms':>9} {'p99 ms':>9}")
+        for policy in FSYNC_POLICIES:
+            path = os.path.join(tmp, f"{policy}.json")
+            write_synthetic_file(path, args.codec, n_applications=args.applications, seed=args.seed)
+            system = VolunteerSystem(path, hash_workers=1, codec=args.codec, fsync=policy)
+            system.store.files.group_saves = args.group
+            apps = list(system.applications)
+            for i in range(args.saves):
+                try:
+                    system._change_status(apps[i % len(apps)], DECIDED_STATUSES[i % 2], "bench")
+                except ScheduleConflictError:
+                    pass  # Random data; the save is still timed
+                system.save()
+            system.close()
+            stats = system.store.files.stats()
+            print(f"{policy:<8} {stats['saves']:>6} {stats['syncs']:>7} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+        with open(path, 'rb') as f:
+            raw = f.read()
+        start = time.perf_counter()
+        strip_footer(raw)
+        check = time.perf_counter() - start
+        start = time.perf_counter()
+        decode_document(strip_footer(raw))
+        parse = time.perf_counter() - start
+        print(f"footer check {1000 * check:.2f} ms for {len(raw)} bytes (full parse {1000 * parse:.1f} ms)")
+        with open(path, 'r+b') as f:
+            f.truncate(len(raw) // 2)  # Simulate a torn write
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            system = VolunteerSystem(path, hash_workers=1, codec=args.codec)
+        recovered = bool(system.store.files.recovered)
+        system.close()
+        print(f"truncated file: {'recovered previous generation' if recovered else 'NOT recovered'} ({len(system.applications)} applications)")
+    return 0 if recovered else 1
+
+# Lists clusters of near-duplicate opportunities with how their applications are split
+def dedup_report_command(args):
+    system = open_system(args)
+    system.duplicates.threshold = args.threshold
+    start = time.perf_counter()
+    clusters = system.duplicate_report()
+    elapsed = time.perf_counter() - start
+    for number, cluster in enumerate(clusters, 1):
+        print(f"cluster {number}: {len(cluster)} posts")
+        for index, opp, similarity in cluster:
+            applications = sum(system.status_counters.for_opportunity(opp.posted_by, opp.title).values())
+            print(f"  #{index:<6} {similarity:>5.0%}  {opp.title!r} by {opp.posted_by} at {opp.location} on {opp.date} ({applications} application(s))")
+    system.close()
+    print(f"{len(clusters)} cluster(s) among {len(system.opportunities)} opportunities in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+# Prints a memory report; with --top-recruiters the largest recruiters are listed too
+def print_memory_report(report, top_recruiters=5):
+    entries = sorted(((k, v) for k, v in report.items() if not k.startswith("recruiter:")), key=lambda kv: -kv[1])
+    for key, size in entries:
+        print(f"  {key:<28} {size / 1024:>12.1f} KiB")
+    recruiters = sorted(((k, v) for k, v in report.items() if k.startswith("recruiter:")), key=lambda kv: -kv[1])
+    for key, size in recruiters[:top_recruiters]:
+        print(f"  {key:<28} {size / 1024:>12.1f} KiB")
+
+# Reports estimated memory per entity type, index and recruiter for a store
+def memory_report_command(args):
+    system = open_system(args)
+    print_memory_report(system.enable_memory_accounting().report(), args.top)
+    system.close()
+    return 0
+
+# Snapshots memory across load, a burst of applies, decisions and archiving on the synthetic dataset
+def bench_memory(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.json")
+        write_synthetic_file(path, "compact", n_applications=args.applications, seed=args.seed)
+        tracemalloc.start()
+        system = VolunteerSystem(path, hash_workers=1, codec="compact")
+        system.save = lambda: None  # Keep persistence out of the measurement
+        memory = system.enable_memory_accounting()
+        memory.snapshot("load")
+        rng = random.Random(args.seed)
+        volunteers = [u for u in system.users if isinstance(u, Volunteer)]
+        for _ in range(args.operations):
+            system.apply_to_opportunity(rng.choice(volunteers), rng.randrange(len(system.opportunities)))
+        memory.snapshot("apply")
+        for app in list(system.applications)[:args.operations]:
+            if app.status == "Pending":
+                try:
+                    system._change_status(app, rng.choice(DECIDED_STATUSES), "bench")
+                except ScheduleConflictError:
+                    pass
+        memory.snapshot("decide")
+        system.archive_closed_applications(max_age_days=0)
+        memory.snapshot("archive")
+        print("after load:")
+        print_memory_report(memory.snapshots["load"][0], 3)
+        for before, after in (("load", "apply"), ("apply", "decide"), ("decide", "archive")):
+            deltas, sites = memory.diff(before, after, top=3)
+            print(f"{before} -> {after}:")
+            for key, delta in sorted(deltas.items(), key=lambda kv: -abs(kv[1]))[:6]:
+                print(f"  {key:<28} {delta / 1024:>+12.1f} KiB")
+            for stat in sites:
+                print(f"  {stat}")
+        system.close()
+    return 0
+
+# HEADLESS COMMAND LINE
+# Builds the argument parser for commands that run without the GUI
+def build_cli_parser():
+    parser = argparse.ArgumentParser(description="Volunteering Management System (headless commands)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("bench-logins", help="Benchmark login throughput of the password hashing pool")
+    p.add_argument("--users", type=int, default=50)
+    p.add_argument("--logins", type=int, default=400)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--iterations", type=int, default=DEFAULT_HASH_ITERATIONS)
+    p.set_defaults(func=bench_logins)
+    p = sub.add_parser("bench-codecs", help="Benchmark size and save/load latency of each storage codec")
+    p.add_argument("--applications", type=int, default=10000)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_codecs)
+    p = sub.add_parser("shard", help="Convert a single data.json into a sharded storage directory")
+    p.add_argument("source")
+    p.add_argument("directory")
+    p.add_argument("--codec", choices=STORAGE_CODECS, default="pretty")
+    p.set_defaults(func=convert_to_shards)
+    p = sub.add_parser("archive", help="Move old closed applications to the append-only cold store")
+    p.add_argument("--file", default="data.json")
+    p.add_argument("--storage", choices=["single", "sharded"], default="single")
+    p.add_argument("--max-age-days", type=int, default=30)
+    p.set_defaults(func=archive_command)
+    p = sub.add_parser("export-applicants", help="Stream a recruiter's applicants to CSV or JSONL")
+    p.add_argument("recruiter")
+    p.add_argument("--file", default="data.json")
+    p.add_argument("--storage", choices=["single", "sharded"], default="single")
+    p.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    p.add_argument("--output", default="-", help="Output path, or - for stdout")
+    p.add_argument("--opportunity", default=None, help="Only export applicants for this opportunity title")
+    p.add_argument("--include-archived", action="store_true")
+    p.set_defaults(func=export_applicants_command)
+    p = sub.add_parser("smtp-sink", help="Run a local stand-in SMTP server that prints received mail")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8025)
+    p.set_defaults(func=smtp_sink_command)
+    p = sub.add_parser("bench-notifications", help="Measure notification throughput and latency against a local sink")
+    p.add_argument("--decisions", type=int, default=2000)
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_notifications)
+    p = sub.add_parser("load-test", help="Run isolated worker processes, each on its own private copy of the store, and report latency percentiles")
+    p.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--operations", type=int, default=500, help="Operations per process")
+    p.add_argument("--mix", type=parse_mix, default=parse_mix("login=1,browse=5,apply=2,accept=1"))
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--data", default=None, help="Dataset to copy into each worker (default: synthetic)")
+    p.add_argument("--volunteers", type=int, default=2000)
+    p.add_argument("--recruiters", type=int, default=50)
+    p.add_argument("--opportunities", type=int, default=1000)
+    p.add_argument("--applications", type=int, default=10000)
+    p.add_argument("--hash-iterations", type=int, default=DEFAULT_HASH_ITERATIONS)
+    p.add_argument("--codec", choices=STORAGE_CODECS, default="compact")
+    p.set_defaults(func=load_test)
+    p = sub.add_parser("replica", help="Follow a primary into a local read-only store, promoting on primary failure")
+    p.add_argument("primary", type=parse_address, help="host:port the primary replicates on")
+    p.add_argument("--file", default="replica.json")
+    p.add_argument("--storage", choices=["single", "sharded"], default="single")
+    p.add_argument("--codec", choices=STORAGE_CODECS, default="pretty")
+    p.add_argument("--promote-after", type=float, default=None, help="Promote after this many seconds without the primary")
+    p.add_argument("--serve", type=parse_address, default=None, help="host:port to accept followers on once promoted")
+    p.add_argument("--interval", type=float, default=2.0, help="Seconds between lag reports")
+    p.set_defaults(func=replica_command)
+    p = sub.add_parser("bench-replication", help="Measure follower lag and failover time on one machine")
+    p.add_argument("--applications", type=int, default=5000)
+    p.add_argument("--decisions", type=int, default=500)
+    p.add_argument("--promote-after", type=float, default=3.0)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_replication)
+
+    # Batch administration commands share the store options
+    def add_store_options(p, codec=False):
+        p.add_argument("--file", default="data.json", help="data file, or shard directory with --storage sharded")
+        p.add_argument("--storage", choices=["single", "sharded"], default="single")
+        if codec:
+            p.add_argument("--codec", choices=STORAGE_CODECS, default="pretty", help="codec used when writing")
+            p.add_argument("--fsync", choices=FSYNC_POLICIES, default="always", help="fsync every save, per group of saves, or never")
+    p = sub.add_parser("export", help="Stream users, opportunities and applications as JSON Lines")
+    add_store_options(p)
+    p.add_argument("--output", default="-")
+    p.add_argument("--types", nargs="+", choices=RECORD_TYPES, default=list(RECORD_TYPES))
+    p.set_defaults(func=export_command)
+    p = sub.add_parser("import", help="Stream JSON Lines records (as written by export) into the store")
+    add_store_options(p, codec=True)
+    p.add_argument("input", help="JSON Lines file, or - for stdin")
+    p.set_defaults(func=import_command)
+    p = sub.add_parser("stats", help="Print collection sizes and status counts")
+    add_store_options(p)
+    p.add_argument("--top", type=int, default=10, help="How many recruiters to list")
+    p.set_defaults(func=stats_command)
+    p = sub.add_parser("set-status", help="Apply bulk status updates keyed by app_id")
+    add_store_options(p, codec=True)
+    p.add_argument("input", help="JSON Lines or CSV with app_id,status[,actor] columns, or - for stdin")
+    p.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    p.add_argument("--actor", default="admin", help="Actor recorded in the status history when a row has none")
+    p.set_defaults(func=set_status_command)
+    p = sub.add_parser("compact", help="Rewrite the store, optionally with another codec and archiving old closed applications")
+    add_store_options(p, codec=True)
+    p.add_argument("--archive-days", type=int, default=None)
+    p.set_defaults(func=compact_command)
+    p = sub.add_parser("check", help="Run integrity checks; exits 1 if problems are found")
+    add_store_options(p)
+    p.set_defaults(func=check_command)
+    p = sub.add_parser("expire", help="Close ended opportunities and resolve their pending/waitlisted applications")
+    add_store_options(p, codec=True)
+    p.add_argument("--resolve-as", choices=DECIDED_STATUSES, default="Rejected")
+    p.add_argument("--watch", action="store_true", help="Keep running, sweeping whenever the next opportunity ends")
+    p.add_argument("--max-wait", type=float, default=EXPIRY_MAX_WAIT, help="Longest sleep between sweeps in seconds")
+    p.set_defaults(func=expire_command)
+    p = sub.add_parser("query", help="List live applications by user, recruiter, opportunity, status and update date")
+    add_store_options(p)
+    p.add_argument("--user")
+    p.add_argument("--recruiter")
+    p.add_argument("--opportunity", help="opportunity title (with --recruiter)")
+    p.add_argument("--status", nargs="+", choices=APPLICATION_STATUSES)
+    p.add_argument("--needs", nargs="+", choices=ACCESSIBILITY_TAGS, help="applicant has every one of these accessibility tags")
+    p.add_argument("--applicant-location", nargs="+", help="applicant is at any of these locations")
+    p.add_argument("--since", help="updated on or after YYYY-MM-DD")
+    p.add_argument("--until", help="updated before YYYY-MM-DD")
+    p.add_argument("--sort", choices=QUERY_SORT_FIELDS)
+    p.add_argument("--desc", action="store_true", help="sort descending")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--explain", action="store_true", help="print the plan instead of the rows")
+    p.set_defaults(func=query_command)
+    p = sub.add_parser("facets", help="Count open opportunities (or a recruiter's applicants) by accessibility and location")
+    add_store_options(p)
+    p.add_argument("--accessibility", nargs="+", choices=ACCESSIBILITY_TAGS, help="require every one of these tags")
+    p.add_argument("--location", nargs="+", help="any of these locations")
+    p.add_argument("--recruiter", help="count this recruiter's applicants instead of opportunities")
+    p.add_argument("--include-closed", action="store_true")
+    p.add_argument("--list", action="store_true", help="also list the matches")
+    p.set_defaults(func=facets_command)
+    p = sub.add_parser("bench-durability", help="Measure save latency per fsync policy and recovery from a torn file")
+    p.add_argument("--applications", type=int, default=10000)
+    p.add_argument("--saves", type=int, default=100)
+    p.add_argument("--group", type=int, default=10, help="Saves per fsync under the grouped policy")
+    p.add_argument("--codec", choices=STORAGE_CODECS, default="compact")
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_durability)
+    p = sub.add_parser("dedup-report", help="List clusters of near-duplicate opportunities (MinHash/LSH)")
+    add_store_options(p)
+    p.add_argument("--threshold", type=float, default=0.7, help="Jaccard similarity of text shingles to count as a duplicate")
+    p.set_defaults(func=dedup_report_command)
+    p = sub.add_parser("memory-report", help="Estimate memory per entity type, index and recruiter")
+    add_store_options(p)
+    p.add_argument("--top", type=int, default=5, help="How many recruiters to list")
+    p.set_defaults(func=memory_report_command)
+    p = sub.add_parser("bench-memory", help="Diff memory snapshots across apply/decide/archive on synthetic data")
+    p.add_argument("--applications", type=int, default=10000)
+    p.add_argument("--operations", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=bench_memory)
+    return parser
+
+# Any command line arguments run a headless command instead of the GUI
+if __name__ == "__main__" and len(sys.argv) > 1:
+    cli_args = build_cli_parser().parse_args()
+    sys.exit(cli_args.func(cli_args))
+
 # GUI IMPLEMENTATION USING TKINTER (GREEN THEME)
 # Create the main VolunteerSystem instance
 system = VolunteerSystem()
+if os.environ.get("VMS_SMTP_HOST"):  # e.g. VMS_SMTP_HOST=127.0.0.1 VMS_SMTP_PORT=8025 with the smtp-sink command
+    system.enable_notifications(NotificationDispatcher(os.environ["VMS_SMTP_HOST"], int(os.environ.get("VMS_SMTP_PORT", "25"))))
+if os.environ.get("VMS_REPLICATION_PORT"):  # Followers attach with: python VMS-Version-3.py replica 127.0.0.1:PORT
+    system.enable_replication(("127.0.0.1", int(os.environ["VMS_REPLICATION_PORT"])))
 
 # Define color constants for green theme
 GREEN_BG = "#d8f3dc"       # Light green background
@@ -281,18 +3848,146 @@ root.geometry("520x360")  # Set window size
 root.configure(bg=GREEN_BG)  # Apply green background
 title_label = tk.Label(root, text="Volunteering Management System", font=("Arial", 16, "bold"), fg=DARK_GREEN, bg=GREEN_BG)
 title_label.pack(pady=10)
+if system.store.files.recovered:  # Loaded the previous generation because the current file was damaged
+    messagebox.showwarning("Data Recovered", "The data file was damaged or missing, so the previous save was loaded.\n"
+                           "Changes made in the most recent save may be lost.")
 
 # BUTTON HELPER
 # Creates a styled button with consistent green theme
 def make_button(parent, text, command, width=16):
     return tk.Button(parent, text=text, width=width, command=command, bg=BUTTON_GREEN, fg=DARK_GREEN, activebackground=BUTTON_ACTIVE, font=("Arial", 10, "bold"), relief="raised", bd=3)
 
+# EVENT BATCHING
+# Collects ChangeEvents for a dashboard and delivers them once per Tk idle cycle
+class TkEventBatcher:
+    """Subscribes a window to system.events and hands the handler batches of events on the Tk thread.
+
+    Events are published from whichever thread made the change (the hashing pool, the expiry timer, a
+    replica applier), so enqueue only touches a thread-safe queue; the window drains it by polling with after."""
+    def __init__(self, window, handler, poll_ms=50):
+        self.window = window
+        self.handler = handler    # Called with a list of events
+        self.poll_ms = poll_ms
+        self.pending = queue.Queue()
+        self.unsubscribe = system.events.subscribe(self.enqueue)
+        self.after_id = window.after(poll_ms, self.flush)
+        window.bind("<Destroy>", self.on_destroy, add="+")
+
+    # Queues an event (any thread)
+    def enqueue(self, event):
+        self.pending.put(event)
+
+    # Hands all queued events to the handler, then polls again (Tk thread)
+    def flush(self):
+        events = []
+        while True:
+            try:
+                events.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        self.after_id = self.window.after(self.poll_ms, self.flush)
+        if events:
+            self.handler(events)
+
+    # Stops listening when the window closes
+    def on_destroy(self, event):
+        if event.widget is self.window:
+            self.unsubscribe()
+            if self.after_id is not None:
+                self.window.after_cancel(self.after_id)
+                self.after_id = None
+
+# SEARCH BOXES
+# Filters a listbox as the user types: keystrokes are debounced, matching runs on a StreamingSearch
+# worker, and matches are streamed in by polling with after (Tk widgets are only touched on the Tk thread)
+class TkSearchBox:
+    """Search entry that fills a listbox from a background filter.
+
+    source() is called on the Tk thread and returns what to scan; match(terms, item) runs on the
+    worker; show_all() restores the unfiltered list; clear() and add(items) update the listbox."""
+    def __init__(self, entry, source, match, show_all, clear, add, delay_ms=250, poll_ms=30):
+        self.entry = entry
+        self.source, self.match, self.show_all, self.clear, self.add = source, match, show_all, clear, add
+        self.delay_ms, self.poll_ms = delay_ms, poll_ms
+        self.terms = []
+        self.search = StreamingSearch()
+        self.generation = None  # Generation whose results the listbox is showing
+        self.debounce_id = self.poll_id = None
+        entry.bind("<KeyRelease>", self.on_key)
+        entry.bind("<Destroy>", lambda event: self.search.close(), add="+")
+
+    # Restarts the debounce timer on every keystroke
+    def on_key(self, event=None):
+        if self.debounce_id is not None:
+            self.entry.after_cancel(self.debounce_id)
+        self.debounce_id = self.entry.after(self.delay_ms, self.run)
+
+    # Starts a query for the current text (or shows everything if it is empty)
+    def run(self):
+        self.debounce_id = None
+        self.terms = search_terms(self.entry.get())
+        if not self.terms:
+            self.search.cancel()
+            self.generation = None
+            self.show_all()
+            return
+        terms, match = self.terms, self.match
+        self.clear()
+        self.generation = self.search.submit(self.source(), lambda item: match(terms, item))
+        if self.poll_id is None:
+            self.poll_id = self.entry.after(self.poll_ms, self.poll)
+
+    # Moves finished batches into the listbox, skipping those from superseded queries
+    def poll(self):
+        self.poll_id = None
+        done = False
+        while True:
+            try:
+                generation, items, finished = self.search.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                self.add(items)
+                done = finished
+        if self.generation is not None and not done:
+            self.poll_id = self.entry.after(self.poll_ms, self.poll)
+
+    # True if a filter is active and item passes it (used to patch rows for live changes)
+    def accepts(self, item):
+        return not self.terms or self.match(self.terms, item)
+
+# ARCHIVE WINDOW
+# Opens a window that pages archived applications in from the cold store on demand
+def open_archive_window(parent, title, username=None, posted_by=None):
+    win = tk.Toplevel(parent)
+    win.title(title)
+    win.geometry("420x320")
+    win.configure(bg=GREEN_BG)
+    listbox = tk.Listbox(win, width=60, height=12, bg="white", fg=DARK_GREEN)
+    listbox.pack(padx=8, pady=8)
+    cursor = {"offset": 0}
+
+    # Function to append the next page of archived applications
+    def load_more():
+        if cursor["offset"] is None:
+            return
+        apps, cursor["offset"] = system.get_archived_applications(username, posted_by, cursor["offset"])
+        for app in apps:
+            listbox.insert(tk.END, f"{app.username} -> {app.opportunity_title} ({app.status})")
+        if cursor["offset"] is None:
+            more_button.config(state="disabled")
+
+    more_button = make_button(win, "Load More", load_more, width=14)
+    more_button.pack(pady=4)
+    make_button(win, "Close", win.destroy, width=10).pack()
+    load_more()
+
 # REGISTER WINDOW
 # Opens a new window for user registration
 def open_register_window():
     reg = tk.Toplevel(root)  # Create a new top-level window
     reg.title("Register")
-    reg.geometry("420x520")  # Set window size
+    reg.geometry("420x620")  # Set window size
     reg.configure(bg=GREEN_BG)  # Apply green background
     tk.Label(reg, text="Register", font=("Arial", 14, "bold"), fg=DARK_GREEN, bg=GREEN_BG).pack(pady=8)
     # Create entry fields for registration details
@@ -312,11 +4007,18 @@ def open_register_window():
     entry_confirm = tk.Entry(reg, show="*", width=40); entry_confirm.pack(padx=12, pady=2)
     tk.Label(reg, text="Disabilities (if any)", fg=DARK_GREEN, bg=GREEN_BG).pack(anchor="w", padx=12)
     entry_disabilities = tk.Entry(reg, width=40); entry_disabilities.pack(padx=12, pady=2)
+    tk.Label(reg, text="Accessibility needs", fg=DARK_GREEN, bg=GREEN_BG).pack(anchor="w", padx=12)
+    needs_frame = tk.Frame(reg, bg=GREEN_BG); needs_frame.pack(anchor="w", padx=12)
+    need_vars = {tag: tk.IntVar() for tag in ACCESSIBILITY_TAGS}
+    for tag, var in need_vars.items():
+        tk.Checkbutton(needs_frame, text=tag, variable=var, fg=DARK_GREEN, bg=GREEN_BG).pack(side="left")
+    tk.Label(reg, text="Location (town)", fg=DARK_GREEN, bg=GREEN_BG).pack(anchor="w", padx=12)
+    entry_location = tk.Entry(reg, width=40); entry_location.pack(padx=12, pady=2)
     tk.Label(reg, text="Role", fg=DARK_GREEN, bg=GREEN_BG).pack(anchor="w", padx=12)
     role_var = tk.StringVar(value="Volunteer")
     tk.OptionMenu(reg, role_var, "Volunteer", "Recruit").pack(padx=12, pady=6)
 
-    # Function to handle registration submission
+    # Function to handle registration submission (hashing runs on the pool, so poll instead of blocking Tk)
     def submit_registration():
         name = entry_name.get().strip()
         email = entry_email.get().strip().lower()
@@ -326,13 +4028,24 @@ def open_register_window():
         password = entry_password.get()
         confirm = entry_confirm.get()
         disabilities = entry_disabilities.get().strip()
+        location = entry_location.get().strip()
+        needs = {tag for tag, var in need_vars.items() if var.get()}
         role = role_var.get()
-        user, msg = system.register(name, email, phone, age, username, password, confirm, role, disabilities)
-        if user:
-            messagebox.showinfo("Success", msg)  # Show success message
-            reg.destroy()                       # Close registration window
-        else:
-            messagebox.showerror("Registration error", msg)  # Show error message
+        # Ticked needs are stored as given; with none ticked they are derived from the disabilities text
+        future = system.register_async(name, email, phone, age, username, password, confirm, role, disabilities, location, needs or None)
+
+        def finish_registration():
+            if not future.done():
+                reg.after(20, finish_registration)
+                return
+            user, msg = future.result()
+            if user:
+                messagebox.showinfo("Success", msg)  # Show success message
+                reg.destroy()                       # Close registration window
+            else:
+                messagebox.showerror("Registration error", msg)  # Show error message
+
+        finish_registration()
 
     # Buttons for registration and closing the window
     make_button(reg, "Register", submit_registration, width=18).pack(pady=10)
@@ -351,17 +4064,25 @@ def open_login_window():
     tk.Label(login, text="Password", fg=DARK_GREEN, bg=GREEN_BG).pack(anchor="w", padx=12)
     entry_password = tk.Entry(login, show="*", width=34); entry_password.pack(padx=12, pady=6)
 
-    # Function to handle login submission
+    # Function to handle login submission (hashing runs on the pool, so poll instead of blocking Tk)
     def submit_login():
         username = entry_username.get().strip()
         pw = entry_password.get()
-        user = system.login(username, pw)
-        if user:
-            messagebox.showinfo("Welcome", f"Welcome, {user.name} ({user.role})!")  # Show welcome message
-            login.destroy()  # Close login window
-            open_dashboard(user)  # Open role-specific dashboard
-        else:
-            messagebox.showerror("Login failed", "Invalid username or password.")  # Show error message
+        future = system.login_async(username, pw)
+
+        def finish_login():
+            if not future.done():
+                login.after(20, finish_login)
+                return
+            user = future.result()
+            if user:
+                messagebox.showinfo("Welcome", f"Welcome, {user.name} ({user.role})!")  # Show welcome message
+                login.destroy()  # Close login window
+                open_dashboard(user)  # Open role-specific dashboard
+            else:
+                messagebox.showerror("Login failed", "Invalid username or password.")  # Show error message
+
+        finish_login()
 
     # Buttons for login and closing the window
     make_button(login, "Login", submit_login, width=14).pack(pady=6)
@@ -382,26 +4103,110 @@ def open_dashboard(user):
         left = tk.Frame(dash, bg=GREEN_BG)
         left.pack(side="left", fill="both", expand=True, padx=8, pady=8)
         tk.Label(left, text="Available Opportunities:", font=("Arial", 11, "bold"), fg=DARK_GREEN, bg=GREEN_BG).pack(anchor="w")
-        opp_listbox = tk.Listbox(left, width=50, height=18, bg="white", fg=DARK_GREEN)
+        search_frame = tk.Frame(left, bg=GREEN_BG)
+        search_frame.pack(fill="x", padx=6)
+        tk.Label(search_frame, text="Search:", fg=DARK_GREEN, bg=GREEN_BG).pack(side="left")
+        e_search = tk.Entry(search_frame, width=42); e_search.pack(side="left", padx=4)
+        facet_frame = tk.Frame(left, bg=GREEN_BG)
+        facet_frame.pack(fill="x", padx=6)
+        tk.Label(facet_frame, text="Needs:", fg=DARK_GREEN, bg=GREEN_BG).pack(side="left")
+        need_vars = {tag: tk.IntVar() for tag in ACCESSIBILITY_TAGS}  # Unfiltered until the volunteer ticks a need
+        need_buttons = {tag: tk.Checkbutton(facet_frame, text=tag, variable=var, fg=DARK_GREEN, bg=GREEN_BG, command=lambda: apply_facets())
+                        for tag, var in need_vars.items()}
+        for button in need_buttons.values():
+            button.pack(side="left")
+        location_frame = tk.Frame(left, bg=GREEN_BG)
+        location_frame.pack(fill="x", padx=6)
+        tk.Label(location_frame, text="Location:", fg=DARK_GREEN, bg=GREEN_BG).pack(side="left")
+        location_var = tk.StringVar(value="Any")
+        location_menu = tk.OptionMenu(location_frame, location_var, "Any")
+        location_menu.pack(side="left", padx=4)
+        opp_listbox = tk.Listbox(left, width=50, height=14, bg="white", fg=DARK_GREEN)
         opp_listbox.pack(padx=6, pady=6)
         tk.Label(left, text="Description:", font=("Arial", 11, "bold"), fg=DARK_GREEN, bg=GREEN_BG).pack(anchor="w")
         desc_text = tk.Text(left, width=50, height=5, wrap="word", bg="white", fg=DARK_GREEN)
         desc_text.pack(padx=6, pady=6)
         desc_text.config(state="disabled")  # Make description text read-only
 
+        shown_opp_indices = []  # Maps listbox rows to indexes in system.opportunities
+        view = {"recommended": False}  # Whether the list shows recommendations or everything
+        facets = {"accessibility": (), "locations": ()}  # Active facet filters
+
+        # True if an opportunity passes the active facet filters (for rows arriving via events)
+        def facets_accept(opp):
+            return set(facets["accessibility"]) <= opp.accessibility and (not facets["locations"] or normalize_location(opp.location) in facets["locations"])
+
+        # Reads the facet controls, relabels them with counts from the bitmap index and re-lists the opportunities
+        def apply_facets():
+            chosen = location_var.get()
+            facets["accessibility"] = tuple(tag for tag, var in need_vars.items() if var.get())
+            facets["locations"] = () if chosen == "Any" else (chosen,)
+            counts = system.opportunity_facet_counts(facets["accessibility"], facets["locations"])
+            for tag, button in need_buttons.items():
+                button.config(text=f"{tag} ({counts['accessibility'].get(tag, 0)})")
+            menu = location_menu["menu"]
+            menu.delete(0, tk.END)
+            for value in ["Any"] + sorted(counts['location']):
+                label = value if value == "Any" else f"{value} ({counts['location'][value]})"
+                menu.add_command(label=label, command=lambda v=value: (location_var.set(v), apply_facets()))
+            refresh_opps()
+
+        # Formats one opportunity row
+        def opp_row(i, opp):
+            left = system.slots_left(opp)
+            return f"[{i+1}] {opp.title} - {opp.location} ({opp.date})" + ("" if left is None else f" [{left} slots left]")
+
         # Function to refresh the opportunities listbox
         def refresh_opps():
+            view["recommended"] = False
+            e_search.delete(0, tk.END)
+            opp_search.run()  # Empty query: cancels any search and shows everything
+
+        # Lists every open opportunity passing the facet filters
+        def show_all_opps():
             opp_listbox.delete(0, tk.END)
-            for i, opp in enumerate(system.get_opportunities()):
-                opp_listbox.insert(tk.END, f"[{i+1}] {opp.title} - {opp.location} ({opp.date})")
+            shown_opp_indices.clear()
+            for i, opp in system.find_opportunities(facets["accessibility"], facets["locations"]):
+                opp_listbox.insert(tk.END, opp_row(i, opp))
+                shown_opp_indices.append(i)
+
+        # Empties the list before search results stream in
+        def clear_opps():
+            view["recommended"] = False
+            opp_listbox.delete(0, tk.END)
+            shown_opp_indices.clear()
 
-        refresh_opps()
+        # Appends a batch of (index, opportunity) search results
+        def add_opps(items):
+            for i, opp in items:
+                opp_listbox.insert(tk.END, opp_row(i, opp))
+                shown_opp_indices.append(i)
+
+        # Narrows to the facet matches first (bitmap index, under the lock); the worker only matches terms
+        def opp_source():
+            return system.find_opportunities(facets["accessibility"], facets["locations"])
+
+        opp_search = TkSearchBox(e_search, opp_source, lambda terms, item: matches_terms(terms, item[1].title, item[1].description, item[1].location, item[1].date),
+                                 show_all_opps, clear_opps, add_opps)
+
+        # Function to show only the top recommended opportunities
+        def show_recommended():
+            e_search.delete(0, tk.END)
+            opp_search.search.cancel()
+            view["recommended"] = True
+            opp_listbox.delete(0, tk.END)
+            shown_opp_indices.clear()
+            for i, opp, score in system.recommend_opportunities(user, k=10):
+                opp_listbox.insert(tk.END, opp_row(i, opp))
+                shown_opp_indices.append(i)
+
+        apply_facets()
 
         # Function to display the description of the selected opportunity
         def show_description(event):
             selection = opp_listbox.curselection()
             if selection:
-                idx = selection[0]
+                idx = shown_opp_indices[selection[0]]
                 opp = system.get_opportunities()[idx]
                 desc_text.config(state="normal")  # Enable editing to update text
                 desc_text.delete("1.0", tk.END)
@@ -419,11 +4224,10 @@ def open_dashboard(user):
             if not selection:
                 messagebox.showwarning("No selection", "Select an opportunity to apply for.")
                 return
-            idx = selection[0]
+            idx = shown_opp_indices[selection[0]]
             app, msg = system.apply_to_opportunity(user, idx)
             if app:
-                messagebox.showinfo("Applied", msg)
-                refresh_apps()
+                messagebox.showinfo("Applied", msg)  # The new row arrives via on_changes
             else:
                 messagebox.showerror("Apply failed", msg)
 
@@ -432,23 +4236,30 @@ def open_dashboard(user):
         apps_listbox = tk.Listbox(right, width=40, height=12, bg="white", fg=DARK_GREEN)
         apps_listbox.pack(padx=6, pady=6)
 
+        shown_apps = []  # Applications in listbox row order
+
+        # Formats one application row
+        def app_row(app):
+            return f"{app.opportunity_title} - {app.status}"
+
         # Function to refresh the applications listbox
         def refresh_apps():
             apps_listbox.delete(0, tk.END)
-            for i, app in enumerate([a for a in system.applications if a.username == user.username]):
-                apps_listbox.insert(tk.END, f"{app.opportunity_title} - {app.status}")
+            shown_apps[:] = system.query_applications().user(user.username).all()
+            for app in shown_apps:
+                apps_listbox.insert(tk.END, app_row(app))
 
         # Function to show details of a selected application
         def show_application_details(event):
             selection = apps_listbox.curselection()
             if selection:
                 idx = selection[0]
-                apps = [a for a in system.applications if a.username == user.username]
-                if 0 <= idx < len(apps):
-                    app = apps[idx]
-                    opp = next(o for o in system.opportunities if o.title == app.opportunity_title and o.posted_by == app.posted_by)
+                if 0 <= idx < len(shown_apps):
+                    app = shown_apps[idx]
+                    opp = system.get_opportunity_for(app)  # None once the opportunity has been removed
                     recruit = system.get_user_by_username(app.posted_by)
-                    details = f"Opportunity Title: {app.opportunity_title}\nStatus: {app.status}\nLocation: {opp.location}\nDate: {opp.date}\nPosted By: {recruit.name if recruit else 'Unknown'}\nRecruit Email: {recruit.email if recruit else 'N/A'}"
+                    where = f"Location: {opp.location}\nDate: {opp.date}" if opp else "Opportunity no longer listed"
+                    details = f"Opportunity Title: {app.opportunity_title}\nStatus: {app.status}\n{where}\nPosted By: {recruit.name if recruit else 'Unknown'}\nRecruit Email: {recruit.email if recruit else 'N/A'}"
                     app_window = tk.Toplevel(dash)
                     app_window.title("Application Details")
                     app_window.geometry("300x200")
@@ -459,8 +4270,52 @@ def open_dashboard(user):
         refresh_apps()
         apps_listbox.bind("<<ListboxSelect>>", show_application_details)
 
-        make_button(right, "Refresh Opportunities", refresh_opps, width=28).pack(pady=4)
+        # Patches only the rows affected by a batch of change events
+        def on_changes(events):
+            rebuild_apps = rebuild_recommended = False
+            for event in events:
+                if isinstance(event, OpportunityPosted):
+                    if view["recommended"]:
+                        rebuild_recommended = True
+                    elif facets_accept(event.opportunity) and opp_search.accepts((event.index, event.opportunity)):
+                        opp_listbox.insert(tk.END, opp_row(event.index, event.opportunity))
+                        shown_opp_indices.append(event.index)
+                elif isinstance(event, OpportunityClosed):
+                    if view["recommended"]:
+                        rebuild_recommended = True
+                    opportunities = system.opportunities
+                    for row in range(len(shown_opp_indices) - 1, -1, -1):
+                        if opportunities[shown_opp_indices[row]] is event.opportunity:
+                            opp_listbox.delete(row)
+                            del shown_opp_indices[row]
+                elif isinstance(event, ApplicationCreated) and event.application.username == user.username:
+                    shown_apps.append(event.application)
+                    apps_listbox.insert(tk.END, app_row(event.application))
+                elif isinstance(event, ApplicationStatusChanged) and event.application.username == user.username:
+                    if event.requeued or event.application not in shown_apps:
+                        rebuild_apps = True
+                    else:
+                        row = shown_apps.index(event.application)
+                        apps_listbox.delete(row)
+                        apps_listbox.insert(row, app_row(event.application))
+            if rebuild_apps:
+                refresh_apps()
+            if rebuild_recommended:
+                show_recommended()
+
+        TkEventBatcher(dash, on_changes)
+
+        make_button(right, "Refresh Opportunities", apply_facets, width=28).pack(pady=4)
+        make_button(right, "Recommended for Me", show_recommended, width=28).pack(pady=4)
         make_button(right, "Refresh My Applications", refresh_apps, width=28).pack(pady=4)
+        # Function to show the volunteer's accepted commitments in time order
+        def show_schedule():
+            lines = [f"{datetime.fromtimestamp(start):%d/%m/%y %H:%M}-{datetime.fromtimestamp(end):%H:%M}  {app.opportunity_title}"
+                     for start, end, app in system.get_schedule(user.username)]
+            messagebox.showinfo("My Schedule", "\n".join(lines) or "No accepted commitments yet.")
+
+        make_button(right, "My Schedule", show_schedule, width=28).pack(pady=4)
+        make_button(right, "Archived Applications", lambda: open_archive_window(dash, "My Archived Applications", username=user.username), width=28).pack(pady=4)
         make_button(right, "Logout", dash.destroy, width=28).pack(pady=12)
 
     # RECRUIT DASHBOARD
@@ -475,6 +4330,16 @@ def open_dashboard(user):
         e_date = tk.Entry(create_frame, width=60); e_date.grid(row=2, column=1, pady=2)
         tk.Label(create_frame, text="Description", fg=DARK_GREEN, bg=GREEN_BG).grid(row=3, column=0, sticky="nw")
         e_desc = tk.Text(create_frame, width=45, height=4, bg="white", fg=DARK_GREEN); e_desc.grid(row=3, column=1, pady=4)
+        tk.Label(create_frame, text="Capacity", fg=DARK_GREEN, bg=GREEN_BG).grid(row=4, column=0, sticky="w")
+        e_capacity = tk.Entry(create_frame, width=10); e_capacity.grid(row=4, column=1, sticky="w", pady=2)
+        tk.Label(create_frame, text="Start-End (HH:MM)", fg=DARK_GREEN, bg=GREEN_BG).grid(row=4, column=1, padx=(90, 0), sticky="w")
+        e_start = tk.Entry(create_frame, width=6); e_start.grid(row=4, column=1, padx=(210, 0), sticky="w")
+        e_end = tk.Entry(create_frame, width=6); e_end.grid(row=4, column=1, padx=(260, 0), sticky="w")
+        tk.Label(create_frame, text="Accessible for", fg=DARK_GREEN, bg=GREEN_BG).grid(row=5, column=0, sticky="w")
+        provides_frame = tk.Frame(create_frame, bg=GREEN_BG); provides_frame.grid(row=5, column=1, sticky="w")
+        provide_vars = {tag: tk.IntVar() for tag in ACCESSIBILITY_TAGS}
+        for tag, var in provide_vars.items():
+            tk.Checkbutton(provides_frame, text=tag, variable=var, fg=DARK_GREEN, bg=GREEN_BG).pack(side="left")
 
         # Function to submit a new opportunity
         def submit_opportunity():
@@ -482,6 +4347,8 @@ def open_dashboard(user):
             loc = e_location.get().strip()
             date = e_date.get().strip()
             desc = e_desc.get("1.0", tk.END).strip()
+            capacity = e_capacity.get().strip()
+            start_time, end_time = e_start.get().strip(), e_end.get().strip()
             if len(title) < 3:
                 messagebox.showerror("Invalid", "Title must be at least 3 characters.")
                 return
@@ -494,65 +4361,197 @@ def open_dashboard(user):
             if len(desc) < 8:
                 messagebox.showerror("Invalid", "Description too short.")
                 return
-            system.post_opportunity(title, desc, loc, date, user.username)
+            if capacity and (not capacity.isdigit() or int(capacity) < 1):
+                messagebox.showerror("Invalid", "Capacity must be a positive number (leave blank for unlimited).")
+                return
+            start = end = None
+            if start_time or end_time:
+                day = parse_opp_date(date)
+                try:
+                    start_clock = datetime.strptime(start_time, "%H:%M").time()
+                    end_clock = datetime.strptime(end_time, "%H:%M").time()
+                except ValueError:
+                    messagebox.showerror("Invalid", "Enter start and end times as HH:MM.")
+                    return
+                if day is None or end_clock <= start_clock:
+                    messagebox.showerror("Invalid", "Times need a DD/MM/YY date and an end after the start.")
+                    return
+                start = datetime.combine(day, start_clock).strftime(OPP_TIME_FORMAT)
+                end = datetime.combine(day, end_clock).strftime(OPP_TIME_FORMAT)
+            matches = system.find_duplicate_opportunities(title, desc, loc)
+            if matches:
+                similar = "\n".join(f"- '{o.title}' by {o.posted_by} at {o.location} on {o.date} ({s:.0%} similar)" for _, o, s in matches[:5])
+                if not messagebox.askyesno("Possible Duplicate", f"This looks like existing opportunities:\n{similar}\n\nPost anyway?"):
+                    return
+            provides = {tag for tag, var in provide_vars.items() if var.get()}
+            system.post_opportunity(title, desc, loc, date, user.username, int(capacity) if capacity else None, start, end,
+                                    warn_duplicates=False, accessibility=provides)
             messagebox.showinfo("Posted", f"Opportunity '{title}' posted.")
-            e_title.delete(0, tk.END); e_location.delete(0, tk.END); e_date.delete(0, tk.END); e_desc.delete("1.0", tk.END)
-            refresh_opps_listboxes()
+            e_title.delete(0, tk.END); e_location.delete(0, tk.END); e_date.delete(0, tk.END); e_desc.delete("1.0", tk.END); e_capacity.delete(0, tk.END); e_start.delete(0, tk.END); e_end.delete(0, tk.END)
+            for var in provide_vars.values():
+                var.set(0)
 
-        make_button(create_frame, "Post Opportunity", submit_opportunity).grid(row=4, column=1, sticky="e", pady=6)
+        make_button(create_frame, "Post Opportunity", submit_opportunity).grid(row=6, column=1, sticky="e", pady=6)
 
         mid_frame = tk.LabelFrame(dash, text="Your Opportunities & Applications", padx=8, pady=8, bg=GREEN_BG, fg=DARK_GREEN)
         mid_frame.pack(fill="both", expand=True, padx=10, pady=8)
         tk.Label(mid_frame, text="Your Opportunities:", fg=DARK_GREEN, bg=GREEN_BG).grid(row=0, column=0, sticky="w")
         my_opp_listbox = tk.Listbox(mid_frame, width=40, height=8, bg="white", fg=DARK_GREEN)
         my_opp_listbox.grid(row=1, column=0, padx=6, pady=4)
-        tk.Label(mid_frame, text="Applications to your opportunities:", fg=DARK_GREEN, bg=GREEN_BG).grid(row=0, column=1, sticky="w", padx=8)
-        my_app_listbox = tk.Listbox(mid_frame, width=48, height=8, bg="white", fg=DARK_GREEN)
+        apps_header = tk.Frame(mid_frame, bg=GREEN_BG)
+        apps_header.grid(row=0, column=1, sticky="w", padx=8)
+        tk.Label(apps_header, text="Applications to your opportunities:", fg=DARK_GREEN, bg=GREEN_BG).pack(side="left")
+        tk.Label(apps_header, text="Search:", fg=DARK_GREEN, bg=GREEN_BG).pack(side="left", padx=(8, 0))
+        e_app_search = tk.Entry(apps_header, width=16); e_app_search.pack(side="left", padx=4)
+        tk.Label(apps_header, text="Needs:", fg=DARK_GREEN, bg=GREEN_BG).pack(side="left")
+        app_need_var = tk.StringVar(value="Any")  # Accessibility need applicants must have
+        app_need_menu = tk.OptionMenu(apps_header, app_need_var, "Any")
+        app_need_menu.pack(side="left")
+        my_app_listbox = tk.Listbox(mid_frame, width=48, height=8, bg="white", fg=DARK_GREEN, selectmode=tk.EXTENDED)  # Shift/Ctrl-click to select many
         my_app_listbox.grid(row=1, column=1, padx=8, pady=4)
 
+        shown_my_opps = []  # (index, opportunity) pairs in listbox row order
+        shown_apps = []     # Applications in listbox row order (all of get_applications_for_recruit unless searching or filtering)
+
+        # Formats one opportunity row with its status counts
+        def opp_row(i, opp):
+            counts = system.get_status_counts(user.username, opp.title)
+            cap = "" if opp.capacity is None else f"/{opp.capacity}"
+            closed = " [closed]" if opp.closed else ""
+            return f"[{i+1}] {opp.title} - {opp.location} ({opp.date}){closed} P:{counts['Pending']} A:{counts['Accepted']}{cap} R:{counts['Rejected']} W:{counts['Waitlisted']}"
+
+        # Formats one application row
+        def app_row(row, app):
+            return f"[{row+1}] {app.username} -> {app.opportunity_title} ({app.status})"
+
+        # Function to refresh the applications listbox only (re-running the search if one is active)
+        def refresh_apps_listbox():
+            app_search.run()
+
+        # Returns this recruit's applications, narrowed through the user bitmaps to applicants with the chosen need
+        def recruit_applications():
+            need = app_need_var.get()
+            query = system.query_applications().recruiter(user.username)
+            return (query if need == "Any" else query.applicant((need,))).all()
+
+        # True if an application's applicant has the chosen need (for rows arriving via events)
+        def applicant_accepts(app):
+            need = app_need_var.get()
+            applicant = system.get_user_by_username(app.username)
+            return need == "Any" or (applicant is not None and need in applicant.accessibility)
+
+        # Relabels the needs menu with applicant counts per accessibility tag
+        def refresh_need_menu():
+            counts = system.applicant_facet_counts(user.username)["accessibility"]
+            menu = app_need_menu["menu"]
+            menu.delete(0, tk.END)
+            for value in ("Any",) + ACCESSIBILITY_TAGS:
+                label = value if value == "Any" else f"{value} ({counts.get(value, 0)})"
+                menu.add_command(label=label, command=lambda v=value: (app_need_var.set(v), refresh_apps_listbox()))
+
+        # Lists every application to this recruit (from applicants with the chosen need)
+        def show_all_apps():
+            my_app_listbox.delete(0, tk.END)
+            shown_apps[:] = recruit_applications()
+            for i, app in enumerate(shown_apps):
+                my_app_listbox.insert(tk.END, app_row(i, app))
+
+        # Empties the list before search results stream in
+        def clear_apps():
+            my_app_listbox.delete(0, tk.END)
+            shown_apps.clear()
+
+        # Appends a batch of matching applications
+        def add_apps(items):
+            for app in items:
+                shown_apps.append(app)
+                my_app_listbox.insert(tk.END, app_row(len(shown_apps) - 1, app))
+
+        # Reads this recruit's applications from the indexes (under the lock); the worker only matches terms
+        def app_source():
+            return recruit_applications()
+
+        app_search = TkSearchBox(e_app_search, app_source,
+                                 lambda terms, app: matches_terms(terms, app.username, app.opportunity_title, app.status),
+                                 show_all_apps, clear_apps, add_apps)
+
+        # Returns the applications on the selected rows
+        def selected_apps():
+            return [shown_apps[row] for row in my_app_listbox.curselection() if row < len(shown_apps)]
+
+        # Decides every selected application with one call (and one save)
+        def decide_selected(new_status, verb):
+            apps = selected_apps()
+            if not apps:
+                messagebox.showwarning("Select", f"Select one or more applications to {verb}.")
+                return
+            results = system.set_application_status_many([(app, new_status) for app in apps], user.username)
+            failures = [msg for ok, msg in results if not ok]  # Updated rows are patched via on_changes
+            if len(results) == 1 and failures:
+                messagebox.showerror("Error", failures[0])
+            elif len(results) == 1:
+                messagebox.showinfo("Updated", results[0][1])
+            elif failures:
+                messagebox.showwarning("Updated", f"{len(results) - len(failures)} of {len(results)} updated.\n\n" + "\n".join(failures[:10]))
+            else:
+                messagebox.showinfo("Updated", f"{len(results)} application(s) updated.")
+
         # Function to refresh opportunities and applications listboxes
         def refresh_opps_listboxes():
             my_opp_listbox.delete(0, tk.END)
+            shown_my_opps.clear()
             for i, opp in enumerate(system.get_opportunities()):
                 if opp.posted_by == user.username:
-                    my_opp_listbox.insert(tk.END, f"[{i+1}] {opp.title} - {opp.location} ({opp.date})")
-            my_app_listbox.delete(0, tk.END)
-            apps = system.get_applications_for_recruit(user.username)
-            for i, app in enumerate(apps):
-                my_app_listbox.insert(tk.END, f"[{i+1}] {app.username} -> {app.opportunity_title} ({app.status})")
+                    my_opp_listbox.insert(tk.END, opp_row(i, opp))
+                    shown_my_opps.append((i, opp))
+            refresh_need_menu()
+            refresh_apps_listbox()
+
+        # Rewrites the count column of every row showing the given opportunity title
+        def patch_opp_counts(title):
+            for row, (i, opp) in enumerate(shown_my_opps):
+                if opp.title == title:
+                    my_opp_listbox.delete(row)
+                    my_opp_listbox.insert(row, opp_row(i, opp))
+
+        # Patches only the rows affected by a batch of change events
+        def on_changes(events):
+            rebuild_apps = False
+            for event in events:
+                if isinstance(event, OpportunityPosted) and event.opportunity.posted_by == user.username:
+                    my_opp_listbox.insert(tk.END, opp_row(event.index, event.opportunity))
+                    shown_my_opps.append((event.index, event.opportunity))
+                elif isinstance(event, OpportunityClosed) and event.opportunity.posted_by == user.username:
+                    patch_opp_counts(event.opportunity.title)
+                elif isinstance(event, (ApplicationCreated, ApplicationStatusChanged)) and event.application.posted_by == user.username:
+                    app = event.application
+                    if isinstance(event, ApplicationCreated):
+                        if applicant_accepts(app) and app_search.accepts(app):
+                            shown_apps.append(app)
+                            my_app_listbox.insert(tk.END, app_row(len(shown_apps) - 1, app))
+                    elif event.requeued or app not in shown_apps or not app_search.accepts(app):
+                        rebuild_apps = True
+                    else:
+                        row = shown_apps.index(app)
+                        my_app_listbox.delete(row)
+                        my_app_listbox.insert(row, app_row(row, app))
+                    patch_opp_counts(app.opportunity_title)
+            if rebuild_apps:
+                refresh_apps_listbox()
 
         refresh_opps_listboxes()
+        TkEventBatcher(dash, on_changes)
 
         app_btn_frame = tk.Frame(mid_frame, bg=GREEN_BG)
         app_btn_frame.grid(row=2, column=1, pady=6)
 
-        # Function to accept a selected application
+        # Function to accept the selected applications
         def accept_selected():
-            s = my_app_listbox.curselection()
-            if not s:
-                messagebox.showwarning("Select", "Select an application to accept.")
-                return
-            idx = s[0]
-            ok, msg = system.set_application_status(idx, "Accepted", user.username)
-            if ok:
-                messagebox.showinfo("Updated", msg)
-                refresh_opps_listboxes()
-            else:
-                messagebox.showerror("Error", msg)
+            decide_selected("Accepted", "accept")
 
-        # Function to reject a selected application
+        # Function to reject the selected applications
         def reject_selected():
-            s = my_app_listbox.curselection()
-            if not s:
-                messagebox.showwarning("Select", "Select an application to reject.")
-                return
-            idx = s[0]
-            ok, msg = system.set_application_status(idx, "Rejected", user.username)
-            if ok:
-                messagebox.showinfo("Updated", msg)
-                refresh_opps_listboxes()
-            else:
-                messagebox.showerror("Error", msg)
+            decide_selected("Rejected", "reject")
 
         # Function to view details of the applicant for a selected application
         def view_selected():
@@ -561,27 +4560,42 @@ def open_dashboard(user):
                 messagebox.showwarning("Select", "Select an application to view.")
                 return
             idx = s[0]
-            apps = system.get_applications_for_recruit(user.username)
-            app = apps[idx]
+            app = shown_apps[idx]
             applicant = system.get_user_by_username(app.username)
             if applicant:
-                details = f"Name: {applicant.name}\nEmail: {applicant.email}\nPhone: {applicant.phone}\nAge: {applicant.age}\nUsername: {applicant.username}\nDisabilities: {applicant.disabilities}"
+                details = f"Name: {applicant.name}\nEmail: {applicant.email}\nPhone: {applicant.phone}\nAge: {applicant.age}\nUsername: {applicant.username}\nDisabilities: {applicant.disabilities}\nAccessibility: {', '.join(sorted(applicant.accessibility)) or 'none'}\nLocation: {applicant.location or 'N/A'}"
                 messagebox.showinfo("Applicant Details", details)
             else:
                 messagebox.showerror("Error", "Applicant not found.")
 
+        # Function to show today's decisions and time-to-decision percentiles
+        def show_decision_stats():
+            today = system.get_decisions_on(user.username)
+            pct = system.get_time_to_decision(user.username)
+            def fmt(seconds):
+                return "n/a" if seconds is None else f"{seconds / 3600:.1f} h"
+            messagebox.showinfo("Decision Stats", f"Decisions today: {len(today)}\nTime to decision p50: {fmt(pct[50])}\np90: {fmt(pct[90])}\np99: {fmt(pct[99])}")
+
+        # Function to export applicants to a CSV or JSONL file
+        def export_selected():
+            path = filedialog.asksaveasfilename(parent=dash, title="Export Applicants", defaultextension=".csv",
+                                                filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+            if not path:
+                return
+            fmt = "jsonl" if path.endswith(".jsonl") else "csv"
+            count = system.export_applicants(user.username, path, fmt, include_archived=True)
+            messagebox.showinfo("Exported", f"Exported {count} applicant(s) to {path}.")
+
         # Function to process the next pending application
         def process_next():
             app, msg = system.process_next_pending(user.username)
             if app:
                 status = simpledialog.askstring("Process Application", f"Application by {app.username} for {app.opportunity_title}. Accept or Reject?")
                 if status in ["Accept", "Reject"]:
-                    app.status = "Accepted" if status == "Accept" else "Rejected"
-                    system.applications.append(app)  # Re-enqueue at end for history
-                    system.save()                   # Save updated data
+                    system.finish_pending(app, "Accepted" if status == "Accept" else "Rejected", user.username)
                     messagebox.showinfo("Processed", f"Application marked as {app.status}.")
-                    refresh_opps_listboxes()
                 else:
+                    system.finish_pending(app)  # Put it back, still pending
                     messagebox.showerror("Invalid", "Enter 'Accept' or 'Reject'.")
             else:
                 messagebox.showinfo("None", msg)
@@ -591,8 +4605,27 @@ def open_dashboard(user):
         make_button(app_btn_frame, "Reject", reject_selected, width=10).pack(side="left", padx=4)
         make_button(mid_frame, "Refresh", refresh_opps_listboxes).grid(row=2, column=0, padx=6, pady=6, sticky="w")
         make_button(mid_frame, "Process Next Pending", process_next).grid(row=3, column=0, pady=8, sticky="w")
+        make_button(mid_frame, "Archived History", lambda: open_archive_window(dash, "Archived Applications", posted_by=user.username)).grid(row=4, column=0, pady=4, sticky="w")
+        make_button(mid_frame, "Export Applicants", export_selected).grid(row=4, column=1, pady=4, sticky="e")
+        make_button(mid_frame, "Decision Stats", show_decision_stats).grid(row=4, column=1, pady=4, sticky="w", padx=8)
         make_button(mid_frame, "Logout", dash.destroy).grid(row=3, column=1, pady=8, sticky="e")
 
+# EXPIRY SWEEPS
+# Closes ended opportunities on the Tk thread (so dashboards get the events there), waking when the next one ends
+def sweep_expired():
+    system.expire_opportunities()
+    root.after(int(system.seconds_until_expiry() * 1000) + 1, sweep_expired)
+
+sweep_expired()
+
+# SHUTDOWN
+# Closes the system before the window goes, so queued notification emails are sent and saves are made durable
+def quit_application():
+    system.close()
+    root.destroy()
+
+root.protocol("WM_DELETE_WINDOW", quit_application)
+
 # MAIN WINDOW BUTTONS
 # Create a frame for main buttons
 btn_frame = tk.Frame(root, bg=GREEN_BG)
@@ -600,7 +4633,7 @@ btn_frame.pack(pady=16)
 # Buttons for opening register/login windows and quitting the application
 make_button(btn_frame, "Register", open_register_window).grid(row=0, column=0, padx=8)
 make_button(btn_frame, "Login", open_login_window).grid(row=0, column=1, padx=8)
-make_button(btn_frame, "Quit", root.quit).grid(row=0, column=2, padx=8)
+make_button(btn_frame, "Quit", quit_application).grid(row=0, column=2, padx=8)
 
 # Start the Tkinter event loop
 root.mainloop()
@@ -0,0 +1,24 @@
+"""Shared fixtures. VMS-Version-3.py is a script, so tests load everything above its GUI section as a module."""
+import os
+import sys
+import types
+
+import pytest
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "VMS-Version-3.py")
+
+
+# Executes the script up to the GUI section (the model, storage and CLI code) as a module named "vms"
+def load_vms():
+    with open(SOURCE) as f:
+        source = f.read()
+    module = types.ModuleType("vms")
+    module.__file__ = SOURCE
+    sys.modules["vms"] = module
+    exec(compile(source[:source.index("# GUI IMPLEMENTATION")], SOURCE, "exec"), module.__dict__)
+    return module
+
+
+@pytest.fixture(scope="session")
+def vms():
+    return load_vms()
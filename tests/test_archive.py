@@ -0,0 +1,20 @@
+"""ColdStore survives torn appends and never archives an application twice."""
+
+
+def test_torn_line_is_skipped_and_closed_off(vms, tmp_path):
+    store = vms.ColdStore(str(tmp_path / "data.archive.jsonl"))
+    store.append([{'app_id': "a", 'username': "v1"}])
+    with open(store.path, 'a') as f:
+        f.write('{"app_id": "b", "userna')  # Crash mid-append
+    store = vms.ColdStore(store.path)
+    assert store.append([{'app_id': "c", 'username': "v2"}]) == 1
+    assert [r['app_id'] for r in store] == ["a", "c"]
+    records, next_offset = store.page(0, 10)
+    assert [r['app_id'] for r in records] == ["a", "c"] and next_offset is None
+
+
+def test_retried_sweep_is_deduplicated(vms, tmp_path):
+    store = vms.ColdStore(str(tmp_path / "data.archive.jsonl"))
+    assert store.append([{'app_id': "a"}, {'app_id': "b"}]) == 2
+    assert vms.ColdStore(store.path).append([{'app_id': "b"}, {'app_id': "c"}]) == 1  # Save failed after the first append
+    assert [r['app_id'] for r in store] == ["a", "b", "c"]
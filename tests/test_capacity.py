@@ -0,0 +1,93 @@
+"""Capacity limits, FIFO waitlist promotion, and archived acceptances keeping their slots."""
+import time
+
+import pytest
+
+VOLUNTEERS = ("ann", "ben", "cat", "dan")
+
+
+def write_store(vms, path, date="01/06/30"):
+    users = [{'name': "Rita Recruit", 'email': "rita@example.org", 'phone': "0211234567", 'age': 40, 'username': "rita",
+              'password': "Passw0rd", 'role': "Recruit", 'disabilities': ""}]
+    users += [{'name': f"Vol {name}", 'email': f"{name}@example.org", 'phone': "0211234567", 'age': 30, 'username': name,
+               'password': "Passw0rd", 'role': "Volunteer", 'disabilities': ""} for name in VOLUNTEERS]
+    opportunities = [{'title': "Beach cleanup", 'description': "Help out", 'location': "Nelson", 'date': date, 'posted_by': "rita", 'capacity': 2},
+                     {'title': "Tree planting", 'description': "Help out", 'location': "Nelson", 'date': date, 'posted_by': "rita"}]
+    applications = [{'username': name, 'opportunity_title': "Beach cleanup", 'posted_by': "rita", 'status': "Pending",
+                     'updated_at': 1000.0 + i} for i, name in enumerate(VOLUNTEERS)]
+    vms.write_json_file(path, {'users': users, 'opportunities': opportunities, 'applications': applications}, "compact")
+
+
+def open_system(vms, path):
+    return vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+
+
+@pytest.fixture
+def system(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    write_store(vms, path)
+    system = open_system(vms, path)
+    yield system
+    system.close()
+
+
+def app_of(system, name, title="Beach cleanup"):
+    return next(a for a in system.applications if a.username == name and a.opportunity_title == title)
+
+
+def decide(system, name, status, title="Beach cleanup"):
+    return system.set_application_status_many([(app_of(system, name, title), status)], "rita")[0]
+
+
+def beach(system):
+    return system.opportunities[0]
+
+
+def test_accepting_past_capacity_waitlists(system):
+    assert decide(system, "ann", "Accepted")[0] and decide(system, "ben", "Accepted")[0]
+    assert system.slots_left(beach(system)) == 0
+    ok, msg = decide(system, "cat", "Accepted")
+    assert ok and msg.endswith("marked as Waitlisted.")
+    assert [app_of(system, name).status for name in VOLUNTEERS] == ["Accepted", "Accepted", "Waitlisted", "Pending"]
+    assert system.check_integrity() == []
+
+
+def test_freed_slot_promotes_oldest_waitlisted(system):
+    for name in VOLUNTEERS:
+        decide(system, name, "Accepted")  # cat then dan join the waitlist
+    decide(system, "ann", "Rejected")
+    assert app_of(system, "cat").status == "Accepted" and app_of(system, "dan").status == "Waitlisted"
+    assert system.history.entries[-1]['actor'] == "system"  # Promotion is not the recruiter's decision
+    decide(system, "ben", "Pending")
+    assert app_of(system, "dan").status == "Accepted"
+    assert system.slots_left(beach(system)) == 0
+    assert system.check_integrity() == []
+
+
+def test_promotion_skips_a_clashing_volunteer_but_keeps_their_place(system):
+    for name in VOLUNTEERS:
+        decide(system, name, "Accepted")
+    system.apply_to_opportunity(next(u for u in system.users if u.username == "cat"), 1)
+    decide(system, "cat", "Accepted", title="Tree planting")  # Same day as the beach cleanup
+    decide(system, "ann", "Rejected")
+    assert app_of(system, "dan").status == "Accepted" and app_of(system, "cat").status == "Waitlisted"
+    decide(system, "cat", "Rejected", title="Tree planting")
+    decide(system, "ben", "Rejected")
+    assert app_of(system, "cat").status == "Accepted"  # Still first in line once the clash is gone
+    assert system.check_integrity() == []
+
+
+def test_archived_acceptances_keep_their_slots(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    write_store(vms, path, date="01/06/20")  # Event already over, so decided applications can be archived
+    system = open_system(vms, path)
+    decide(system, "ann", "Accepted")
+    decide(system, "ben", "Accepted")
+    assert system.archive_closed_applications(now=time.time()) == 2
+    assert beach(system).archived_accepted == 2 and system.slots_left(beach(system)) == 0
+    system.close()
+    system = open_system(vms, path)  # Slots survive a reload through the stored counter
+    assert system.slots_left(beach(system)) == 0
+    ok, msg = decide(system, "cat", "Accepted")
+    assert ok and msg.endswith("marked as Waitlisted.")
+    system.close()
@@ -0,0 +1,54 @@
+"""Headless commands, driven through build_cli_parser as the script's entry point does."""
+import json
+
+import pytest
+
+
+def run(vms, *argv):
+    args = vms.build_cli_parser().parse_args(argv)
+    return args.func(args)
+
+
+def write_store(vms, path):
+    users = [{'name': "Rita Recruit", 'email': "rita@example.org", 'phone': "0211234567", 'age': 40, 'username': "rita",
+              'password': "Passw0rd", 'role': "Recruit", 'disabilities': ""}]
+    users += [{'name': f"Vol {name}", 'email': f"{name}@example.org", 'phone': "0211234567", 'age': 30, 'username': name,
+               'password': "Passw0rd", 'role': "Volunteer", 'disabilities': ""} for name in ("ann", "ben")]
+    opportunities = [{'title': title, 'description': "Help out", 'location': "Nelson", 'date': f"0{day}/06/30", 'posted_by': "rita"}
+                     for day, title in ((1, "Beach cleanup"), (2, "Tree planting"))]
+    applications = [{'app_id': f"{name}-{title[0]}", 'username': name, 'opportunity_title': title, 'posted_by': "rita", 'status': "Pending"}
+                    for name in ("ann", "ben") for title in ("Beach cleanup", "Tree planting")]
+    vms.write_json_file(path, {'users': users, 'opportunities': opportunities, 'applications': applications}, "compact")
+
+
+def test_set_status_skips_malformed_rows(vms, tmp_path, capsys):
+    store, updates = str(tmp_path / "data.json"), tmp_path / "updates.jsonl"
+    write_store(vms, store)
+    updates.write_text("\n".join([json.dumps({'app_id': "ann-B", 'status': "Accepted"}),
+                                  '{"app_id": "ben-B", "status": ',  # Torn line
+                                  json.dumps(["ben-T", "Accepted"]),  # Not an object
+                                  json.dumps({'app_id': "ben-B", 'status': "Rejected"})]) + "\n")
+    assert run(vms, "set-status", str(updates), "--file", store, "--codec", "compact", "--fsync", "never") == 1
+    err = capsys.readouterr().err
+    assert "not valid JSON" in err and "not a JSON object" in err and "Updated 2 application(s); skipped 2" in err
+    system = vms.VolunteerSystem(store, hash_workers=1)
+    assert {a.app_id: a.status for a in system.applications} == {"ann-B": "Accepted", "ann-T": "Pending", "ben-B": "Rejected", "ben-T": "Pending"}
+    assert [(e['app_id'], e['new']) for e in system.history.entries] == [("ann-B", "Accepted"), ("ben-B", "Rejected")]
+    system.close()
+
+
+def test_failed_save_records_no_history(vms, tmp_path):
+    store = str(tmp_path / "data.json")
+    write_store(vms, store)
+    system = vms.VolunteerSystem(store, hash_workers=1, fsync="never")
+    def refuse(*args):
+        raise OSError("disk full")
+    system.store.write = refuse
+    app = next(a for a in system.applications if a.app_id == "ann-B")
+    with pytest.raises(OSError):
+        system._apply_decisions([(app, "Accepted", "rita")])
+    assert system.history.entries == []
+    reloaded = vms.StatusHistory(system.history.path)
+    reloaded.load()
+    assert reloaded.entries == []
+    system.close()
@@ -0,0 +1,39 @@
+"""Storage codecs: every codec round-trips the same data, and reads detect the codec from the bytes alone."""
+import pytest
+
+
+def load(vms, path, codec):
+    with pytest.warns(vms.ScheduleConflictWarning):  # Synthetic data has overlapping acceptances
+        return vms.VolunteerSystem(path, hash_workers=1, codec=codec, fsync="never")
+
+
+def stored_bytes(vms, path):
+    with open(path, 'rb') as f:
+        return vms.strip_footer(f.read())
+
+
+@pytest.mark.parametrize("codec", ["pretty", "compact", "zlib", "lzma"])
+def test_codec_round_trips_and_is_detected(vms, tmp_path, codec):
+    source, path = str(tmp_path / "source.json"), str(tmp_path / "data.json")
+    vms.write_synthetic_file(source, "pretty", n_volunteers=20, n_recruiters=3, n_opportunities=10, n_applications=60)
+    system = load(vms, source, "pretty")
+    expected = system._snapshot_dict()
+    system.close()
+    vms.write_json_file(path, expected, codec)
+    raw = stored_bytes(vms, path)
+    assert vms.detect_codec(raw) == ("compact" if codec == "pretty" else codec)  # Indented JSON is still plain JSON
+    assert (b"\n    " in raw) == (codec == "pretty")
+    other = "lzma" if codec != "lzma" else "zlib"
+    system = load(vms, path, other)
+    assert system._snapshot_dict() == expected
+    system.save()  # Rewritten in the system's own codec, whatever it read
+    assert vms.detect_codec(stored_bytes(vms, path)) == other
+    assert vms.read_json_file(path) == expected
+    system.close()
+
+
+def test_compact_is_smaller_than_pretty(vms):
+    data = vms.make_synthetic_data(n_volunteers=20, n_recruiters=3, n_opportunities=10, n_applications=60)
+    sizes = {codec: len(vms.encode_document(data, codec)) for codec in vms.STORAGE_CODECS}
+    assert sizes["compact"] < sizes["pretty"] and sizes["zlib"] < sizes["compact"] and sizes["lzma"] < sizes["compact"]
+    assert vms.decode_document(vms.encode_document(data, "pretty")) == vms.decode_document(vms.encode_document(data, "compact")) == data
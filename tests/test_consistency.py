@@ -0,0 +1,76 @@
+"""Derived state (status counters, indexes, schedules, capacity) stays consistent through every mutation."""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def system(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    vms.write_synthetic_file(path, "compact", n_volunteers=40, n_recruiters=4, n_opportunities=30, n_applications=200)
+    with pytest.warns(vms.ScheduleConflictWarning):  # Random acceptances include some same-day pairs
+        system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    system.baseline_problems = set(system.check_integrity())
+    yield system
+    system.close()
+
+
+# Counters must match a recount exactly; integrity problems already in the generated data may remain but no new ones appear
+def assert_consistent(system):
+    assert system.check_status_counters() == []
+    assert set(system.check_integrity()) <= system.baseline_problems
+
+
+def test_loaded_store_is_consistent(system):
+    assert system.check_status_counters() == []
+    assert all("overlapping accepted commitments" in problem for problem in system.baseline_problems)
+
+
+def test_apply(vms, system):
+    volunteer = next(u for u in system.users if isinstance(u, vms.Volunteer))
+    applied = {(a.posted_by, a.opportunity_title) for a in volunteer.my_applications}
+    index = next(i for i, o in enumerate(system.opportunities) if (o.posted_by, o.title) not in applied and not o.closed)
+    app, msg = system.apply_to_opportunity(volunteer, index)
+    assert app is not None, msg
+    assert_consistent(system)
+
+
+@pytest.mark.parametrize("new_status", ["Accepted", "Rejected", "Waitlisted", "Pending"])
+def test_decide(system, new_status):
+    recruiter = system.applications[0].posted_by
+    system.set_application_status_many([(app, new_status) for app in system.get_applications_for_recruit(recruiter)], recruiter)
+    assert_consistent(system)
+
+
+def test_process_next_and_requeue(system):
+    recruiter = next(a.posted_by for a in system.applications if a.status == "Pending")
+    app, _ = system.process_next_pending(recruiter)
+    system.finish_pending(app)  # Back to the front, still Pending
+    assert_consistent(system)
+    app, _ = system.process_next_pending(recruiter)
+    system.finish_pending(app, "Accepted", recruiter)
+    assert_consistent(system)
+
+
+def test_archive(system):
+    app = system.applications[0]
+    system.set_application_status_many([(app, "Rejected")], app.posted_by)
+    assert system.archive_closed_applications(now=time.time() + 365 * 86400) > 0
+    assert_consistent(system)
+
+
+def test_bulk_decision_follows_the_application_not_its_row(system):
+    recruiter = next(r for r in {a.posted_by for a in system.applications}
+                     if sum(a.status == "Pending" for a in system.get_applications_for_recruit(r)) >= 2)
+    shown = system.get_applications_for_recruit(recruiter)  # The list the recruiter is looking at
+    before = {id(a): a.status for a in shown}
+    pending = [a for a in shown if a.status == "Pending"]
+    dequeued, _ = system.process_next_pending(recruiter)  # Every row after it shifts up in the live list
+    target = pending[-1]
+    results = system.set_application_status_many([(target, "Rejected"), (dequeued, "Rejected")], recruiter)
+    assert dequeued is pending[0]
+    assert results == [(True, f"Application by {target.username} marked as Rejected."), (False, "Invalid application selection.")]
+    assert [a for a in shown if a.status != before[id(a)]] == [target]
+    assert system.set_application_status_many([(pending[1], "Accepted")], "someone-else")[0][0] is False
+    system.finish_pending(dequeued)
+    assert_consistent(system)
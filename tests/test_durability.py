@@ -0,0 +1,97 @@
+"""Crash-safe files: CRC footers, fallback to the .bak generation, and recovery on the next save."""
+import os
+
+import pytest
+
+
+def write_store(vms, path, names):
+    users = [{'name': f"Vol {name}", 'email': f"{name}@example.org", 'phone': "0211234567", 'age': 30, 'username': name,
+              'password': "Passw0rd", 'role': "Volunteer", 'disabilities': ""} for name in names]
+    vms.write_json_file(path, {'users': users, 'opportunities': [], 'applications': []}, "compact")
+
+
+def usernames(data):
+    return [u['username'] for u in data['users']]
+
+
+def corrupt(path, how):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if how == "truncate":
+        raw = raw[:len(raw) // 2]  # Torn write
+    else:
+        middle = len(raw) // 2
+        raw = raw[:middle] + bytes([raw[middle] ^ 0x01]) + raw[middle + 1:]  # Flipped bit, still parseable length
+    with open(path, 'wb') as f:
+        f.write(raw)
+
+
+@pytest.mark.parametrize("codec", ["pretty", "compact", "zlib", "lzma"])
+def test_footer_round_trip(vms, tmp_path, codec):
+    path = str(tmp_path / "data.json")
+    vms.write_json_file(path, {'users': [], 'n': 1}, codec)
+    assert vms.read_json_file(path) == {'users': [], 'n': 1}
+
+
+@pytest.mark.parametrize("how", ["truncate", "flip"])
+def test_damaged_file_fails_footer_check(vms, tmp_path, how):
+    path = str(tmp_path / "data.json")
+    write_store(vms, path, ["ann"])
+    corrupt(path, how)
+    with pytest.raises(vms.CorruptFileError):
+        vms.read_json_file(path)
+
+
+def test_file_without_footer_still_loads(vms, tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"users": [], "opportunities": [], "applications": []}')
+    assert vms.read_json_file(str(path))['users'] == []
+
+
+def test_previous_generation_is_kept(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    write_store(vms, path, ["ann"])
+    write_store(vms, path, ["ann", "ben"])
+    assert usernames(vms.read_json_file(path + vms.BACKUP_SUFFIX)) == ["ann"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("how", ["truncate", "flip", "missing"])
+def test_load_falls_back_to_backup_and_next_save_repairs(vms, tmp_path, how):
+    path = str(tmp_path / "data.json")
+    write_store(vms, path, ["ann"])
+    write_store(vms, path, ["ann", "ben"])
+    if how == "missing":
+        os.unlink(path)
+    else:
+        corrupt(path, how)
+    with pytest.warns(RuntimeWarning, match="previous generation"):
+        system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    assert [u.username for u in system.users] == ["ann"]
+    assert system.store.files.recovered == {path}
+    system.register("Cat Volunteer", "cat@example.org", "0211234567", "30", "cat", "Passw0rd", "Passw0rd", "Volunteer", "")
+    assert system.store.files.recovered == set()
+    assert usernames(vms.read_json_file(path)) == ["ann", "cat"]
+    assert usernames(vms.read_json_file(path + vms.BACKUP_SUFFIX)) == ["ann"]  # The bad file never replaced the good backup
+    system.close()
+
+
+def test_both_generations_corrupt_is_an_error(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    write_store(vms, path, ["ann"])
+    write_store(vms, path, ["ann", "ben"])
+    corrupt(path, "truncate")
+    corrupt(path + vms.BACKUP_SUFFIX, "flip")
+    with pytest.raises(vms.CorruptFileError):
+        vms.read_with_fallback(path)
+
+
+def test_grouped_policy_fsyncs_once_per_group(vms, tmp_path):
+    files = vms.DurableFiles("grouped", group_saves=3, group_seconds=3600)
+    path = str(tmp_path / "data.json")
+    for i in range(7):
+        files.write([(path, {'n': i})], "compact")
+    assert (files.saves, files.syncs) == (7, 2)
+    files.flush()
+    assert files.syncs == 3
+    assert vms.read_json_file(path) == {'n': 6}
@@ -0,0 +1,113 @@
+"""Bitmap set algebra, FacetIndex selection and counts, and the system's facet indexes staying in step with its data."""
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+TAGS = ("wheelchair", "sensory", "seated")
+TOWNS = ("nelson", "napier", "dunedin")
+
+
+def test_bitmap_behaves_like_a_set(vms):
+    rng = random.Random(1)
+    a_rows = {rng.randrange(5000) for _ in range(300)}
+    b_rows = {rng.randrange(5000) for _ in range(300)} | {1023, 1024, 0}  # Chunk boundaries
+    a, b = vms.Bitmap(a_rows), vms.Bitmap(b_rows)
+    assert list(a) == sorted(a_rows) and len(a) == len(a_rows)
+    assert list(a & b) == sorted(a_rows & b_rows)
+    assert list(a | b) == sorted(a_rows | b_rows)
+    assert all(row in b for row in b_rows) and 4999 not in vms.Bitmap()
+    for row in list(b_rows)[:100]:
+        b.discard(row)
+        b_rows.discard(row)
+    assert b == vms.Bitmap(b_rows) and not vms.Bitmap() and not vms.Bitmap([7]) & vms.Bitmap([8])
+
+
+def brute_select(items, filters):
+    return [i for i, item in enumerate(items)
+            if set(filters.get("tags", ())) <= item.tags and (not filters.get("town") or item.town in filters["town"])]
+
+
+def brute_counts(items, filters):
+    rows = brute_select(items, filters)
+    towns = brute_select(items, {k: v for k, v in filters.items() if k != "town"})  # Alternatives count without their own filter
+    counts = {"tags": {}, "town": {}}
+    for i in rows:
+        for tag in items[i].tags:
+            counts["tags"][tag] = counts["tags"].get(tag, 0) + 1
+    for i in towns:
+        counts["town"][items[i].town] = counts["town"].get(items[i].town, 0) + 1
+    return counts
+
+
+def test_facet_index_matches_brute_force_through_updates(vms):
+    rng = random.Random(2)
+    def random_item():
+        return SimpleNamespace(tags=set(rng.sample(TAGS, rng.randint(0, 2))), town=rng.choice(TOWNS))
+    items = [random_item() for _ in range(2500)]
+    index = vms.FacetIndex({"tags": lambda item: item.tags, "town": lambda item: (item.town,)}, multi=("tags",))
+    index.rebuild(items)
+    for round_ in range(3):
+        for _ in range(20):
+            filters = {"tags": tuple(rng.sample(TAGS, rng.randint(0, 2))), "town": tuple(rng.sample(TOWNS, rng.randint(0, 2)))}
+            assert list(index.select(filters)) == brute_select(items, filters)
+            assert index.facet_counts(filters) == brute_counts(items, filters)
+        for row in rng.sample(range(len(items)), 300):
+            items[row] = random_item()
+            index.update(row, items[row])
+        items.append(random_item())
+        index.add(items[-1])
+        assert index.verify(items, "item") == []
+
+
+@pytest.fixture
+def system(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    vms.write_synthetic_file(path, "compact", n_volunteers=60, n_recruiters=4, n_opportunities=40, n_applications=300, seed=3)
+    with pytest.warns(vms.ScheduleConflictWarning):
+        system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    yield system
+    system.close()
+
+
+def expected_opportunities(vms, system, tags, towns, include_closed=False):
+    wanted = {vms.normalize_location(t) for t in towns}
+    return [(i, o) for i, o in enumerate(system.opportunities)
+            if set(tags) <= o.accessibility and (not wanted or vms.normalize_location(o.location) in wanted) and (include_closed or not o.closed)]
+
+
+def expected_applicant_counts(vms, system, recruiter):
+    names = {a.username for a in system.applications if a.posted_by == recruiter}
+    counts = {"accessibility": {}, "location": {}, "role": {}}
+    for user in system.users:
+        if user.username in names:
+            for name, values in (("accessibility", user.accessibility), ("location", vms.location_facet(user)), ("role", (user.role,))):
+                for value in values:
+                    counts[name][value] = counts[name].get(value, 0) + 1
+    return counts
+
+
+def test_system_facets_follow_expiry_and_posting(vms, system):
+    towns = ("Nelson", "Napier")
+    for tags in ((), ("wheelchair",), ("wheelchair", "seated")):
+        assert system.find_opportunities(tags, towns) == expected_opportunities(vms, system, tags, towns)
+    closed, _ = system.expire_opportunities(now=time.mktime((2026, 6, 1, 0, 0, 0, 0, 0, -1)))
+    assert closed  # Synthetic dates run from 2025 to 2027
+    assert system.find_opportunities((), towns) == expected_opportunities(vms, system, (), towns)
+    assert system.find_opportunities((), towns, include_closed=True) == expected_opportunities(vms, system, (), towns, include_closed=True)
+    open_count = len(expected_opportunities(vms, system, (), ()))
+    assert system.opportunity_facet_counts()["state"] == {"open": open_count, "closed": len(system.opportunities) - open_count}
+    system.post_opportunity("Ramp build", "Build a ramp", "Nelson, Tasman", "01/01/30", "recruiter0", warn_duplicates=False, accessibility=["wheelchair"])
+    assert system.find_opportunities(("wheelchair",), ("nelson",))[-1][1].title == "Ramp build"
+    assert system.opp_facets.verify(system.opportunities, "opportunity") == []
+    assert system.user_facets.verify(system.users, "user") == []
+
+
+def test_applicant_facets_follow_decisions_and_archiving(vms, system):
+    recruiter = system.applications[0].posted_by
+    assert system.applicant_facet_counts(recruiter) == expected_applicant_counts(vms, system, recruiter)
+    system.set_application_status_many([(a, "Rejected") for a in system.get_applications_for_recruit(recruiter)], recruiter)
+    assert system.applicant_facet_counts(recruiter) == expected_applicant_counts(vms, system, recruiter)
+    assert system.archive_closed_applications(now=time.time() + 365 * 86400) > 0
+    assert system.applicant_facet_counts(recruiter) == expected_applicant_counts(vms, system, recruiter)
@@ -0,0 +1,20 @@
+"""Status history queries attribute decisions to whoever made them."""
+import time
+
+
+def test_system_resolutions_are_not_recruiter_decisions(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    vms.write_json_file(path, {'users': [], 'opportunities': [], 'applications': []}, "compact")
+    system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    recruiter, _ = system.register("Rita Recruit", "rita@example.org", "0211234567", "40", "rita", "Passw0rd", "Passw0rd", "Recruit", "")
+    volunteers = [system.register(f"Vol {name}", f"{name}@example.org", "0211234567", "30", name, "Passw0rd", "Passw0rd", "Volunteer", "")[0]
+                  for name in ("ann", "ben")]
+    system.post_opportunity("Beach cleanup", "Pick up litter", "Nelson", "01/01/25", "rita", warn_duplicates=False)
+    for volunteer in volunteers:
+        system.apply_to_opportunity(volunteer, 0)
+    system.set_application_status(0, "Accepted", "rita")
+    closed, resolved = system.expire_opportunities(now=time.time() + 86400)  # Rejects ben's application as "system"
+    assert len(closed) == 1 and len(resolved) == 1
+    decisions = system.get_decisions_on("rita")
+    assert [(e['username'], e['new'], e['actor']) for e in decisions] == [("ann", "Accepted", "rita")]
+    system.close()
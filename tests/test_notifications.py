@@ -0,0 +1,57 @@
+"""NotificationDispatcher delivery against the local SMTPSink."""
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def sink(vms):
+    server = vms.SMTPSink(refuse=["nobody@example.org"])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def dispatcher(vms, sink, **options):
+    return vms.NotificationDispatcher("127.0.0.1", sink.server_address[1], workers=1, batch_wait=0.2, backoff=0.01, **options)
+
+
+def test_batch_is_delivered(vms, sink):
+    notifier = dispatcher(vms, sink)
+    for i in range(5):
+        notifier.enqueue(f"volunteer{i}@example.org", "Decision", "Accepted")
+    notifier.close()
+    stats = notifier.metrics()
+    assert (stats['sent'], stats['failed'], stats['retries']) == (5, 0, 0)
+    assert sorted(rcpt for _, (rcpt,), _ in sink.messages) == [f"<volunteer{i}@example.org>" for i in range(5)]
+
+
+def test_refused_recipient_fails_only_its_message(vms, sink):
+    notifier = dispatcher(vms, sink)
+    notifier.enqueue("nobody@example.org", "Decision", "Rejected")
+    for i in range(5):
+        notifier.enqueue(f"volunteer{i}@example.org", "Decision", "Accepted")
+    notifier.close()
+    stats = notifier.metrics()
+    assert (stats['sent'], stats['failed'], stats['retries']) == (5, 1, 0)
+    assert len(sink.messages) == 5
+
+
+def test_unreachable_server_retries_then_fails(vms, sink):
+    port = sink.server_address[1]
+    sink.shutdown()
+    sink.server_close()
+    notifier = vms.NotificationDispatcher("127.0.0.1", port, workers=1, batch_wait=0.2, backoff=0.01, max_retries=2, timeout=1)
+    notifier.enqueue("volunteer@example.org", "Decision", "Accepted")
+    notifier.close()
+    stats = notifier.metrics()
+    assert (stats['sent'], stats['failed'], stats['retries']) == (0, 1, 2)
+
+
+def test_permanent_error_classification(vms):
+    smtplib = vms.smtplib
+    assert vms.permanent_smtp_error(smtplib.SMTPRecipientsRefused({"a@x.org": (550, b"no")}))
+    assert not vms.permanent_smtp_error(smtplib.SMTPRecipientsRefused({"a@x.org": (451, b"later")}))
+    assert vms.permanent_smtp_error(smtplib.SMTPDataError(554, b"rejected"))
+    assert not vms.permanent_smtp_error(smtplib.SMTPServerDisconnected("gone"))
@@ -0,0 +1,24 @@
+"""Legacy plaintext and outdated hashes are upgraded, and persisted, on the first successful login."""
+import pytest
+
+
+@pytest.mark.parametrize("stored", ["plaintext", "weak"])
+def test_login_rehashes_and_saves(vms, tmp_path, stored):
+    path = str(tmp_path / "data.json")
+    password = "Passw0rd"
+    value = password if stored == "plaintext" else vms.hash_password(password, 500)
+    user = {'name': "Vol ann", 'email': "ann@example.org", 'phone': "0211234567", 'age': 30, 'username': "ann",
+            'password': value, 'role': "Volunteer", 'disabilities': ""}
+    vms.write_json_file(path, {'users': [user], 'opportunities': [], 'applications': []}, "compact")
+    system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    assert system.login("ann", "wrong") is None
+    assert vms.read_json_file(path)['users'][0]['password'] == value  # A failed login changes nothing
+    assert system.login("ann", password).username == "ann"
+    system.close()
+    upgraded = vms.read_json_file(path)['users'][0]['password']
+    assert upgraded.startswith(vms.HASH_SCHEME + "$1000$") and not vms.password_needs_rehash(upgraded, 1000)
+    assert vms.verify_password(password, upgraded) and not vms.verify_password("wrong", upgraded)
+    system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    assert system.login("ann", password) is not None
+    system.close()
+    assert vms.read_json_file(path)['users'][0]['password'] == upgraded  # Already current: not rehashed again
@@ -0,0 +1,89 @@
+"""The ApplicationQuery planner returns exactly what a full scan would, and explain() names the plan it used."""
+import itertools
+import random
+
+import pytest
+
+FILTERS = ("user", "recruiter", "opportunity", "status", "updated", "applicant")
+
+
+@pytest.fixture(scope="module")
+def system(vms, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("query") / "data.json")
+    vms.write_synthetic_file(path, "compact", n_volunteers=60, n_recruiters=5, n_opportunities=40, n_applications=600, seed=7)
+    with pytest.warns(vms.ScheduleConflictWarning):
+        system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    rng = random.Random(7)
+    for app in system.applications:
+        app.updated_at = rng.choice([None, rng.uniform(0, 100)])  # Not indexed, so safe to set directly
+    recruiter = system.applications[0].posted_by
+    app, _ = system.process_next_pending(recruiter)
+    system.finish_pending(app)  # Requeued at the front: position keys must keep list order
+    yield system
+    system.close()
+
+
+# Builds a random query with the chosen filters and the equivalent plain predicate
+def random_query(vms, system, rng, chosen):
+    query, checks = system.query_applications(), []
+    app = rng.choice(system.applications)
+    if "user" in chosen:
+        name = rng.choice([app.username, "nobody"])
+        query, checks = query.user(name), checks + [lambda a, name=name: a.username == name]
+    if "recruiter" in chosen:
+        query, checks = query.recruiter(app.posted_by), checks + [lambda a: a.posted_by == app.posted_by]
+    if "opportunity" in chosen:
+        other = rng.choice(system.opportunities)
+        key = rng.choice([(app.posted_by, app.opportunity_title), (other.posted_by, other.title)])
+        query, checks = query.opportunity(*key), checks + [lambda a: (a.posted_by, a.opportunity_title) == key]
+    if "status" in chosen:
+        statuses = tuple(rng.sample(vms.APPLICATION_STATUSES, rng.randint(1, 2)))
+        query, checks = query.status(*statuses), checks + [lambda a: a.status in statuses]
+    if "updated" in chosen:
+        start, end = rng.choice([(None, 50), (25, None), (10, 60)])
+        query = query.updated_between(start, end)
+        checks.append(lambda a: a.updated_at is not None and (start is None or a.updated_at >= start) and (end is None or a.updated_at < end))
+    if "applicant" in chosen:
+        tags = tuple(rng.sample(vms.ACCESSIBILITY_TAGS, rng.randint(0, 1)))
+        towns = tuple(rng.sample(sorted({u.location for u in system.users if u.location}), rng.randint(0, 2)))
+        query = query.applicant(tags, towns)
+        wanted = {vms.normalize_location(t) for t in towns}
+        matching = {u.username for u in system.users
+                    if set(tags) <= u.accessibility and (not wanted or vms.normalize_location(u.location) in wanted)}
+        checks.append(lambda a: a.username in matching)
+    return query, lambda a: all(check(a) for check in checks)
+
+
+@pytest.mark.parametrize("chosen", [c for r in range(len(FILTERS) + 1) for c in itertools.combinations(FILTERS, r)], ids=lambda c: "+".join(c) or "none")
+def test_planner_matches_full_scan(vms, system, chosen):
+    rng = random.Random("+".join(chosen))
+    for _ in range(5):
+        query, predicate = random_query(vms, system, rng, chosen)
+        expected = [a for a in system.applications if predicate(a)]
+        assert query.all() == expected
+        assert query.count() == len(expected)
+        assert query.first() is (expected[0] if expected else None)
+        assert query.limit(3).all() == expected[:3]
+        by_user = sorted(expected, key=lambda a: a.username, reverse=True)
+        assert query.order_by("username", descending=True).limit(4).all() == by_user[:4]
+        assert query.order_by("username", descending=True).all() == by_user
+
+
+def test_explain_names_the_smallest_bucket(vms, system):
+    app = next(a for a in system.applications if a.status == "Pending")
+    query = system.query_applications().status("Pending").recruiter(app.posted_by).user(app.username)
+    counts = {"status": sum(a.status == "Pending" for a in system.applications),
+              "posted_by": sum(a.posted_by == app.posted_by for a in system.applications),
+              "username": sum(a.username == app.username for a in system.applications)}
+    field = min(counts, key=counts.get)
+    assert query.plan()[1].field == field
+    lines = query.explain().splitlines()
+    assert lines[0].startswith("SEARCH applications USING INDEX " + field) and f"~{counts[field]} of {len(system.applications)} rows" in lines[0]
+    assert sum(line.startswith("FILTER ") for line in lines) == 2
+
+
+def test_explain_scans_without_an_indexed_filter(system):
+    query = system.query_applications().updated_between(0, 50).order_by("updated_at").limit(5)
+    assert query.plan() is None
+    assert query.explain().splitlines() == [f"SCAN applications (~{len(system.applications)} rows)", "FILTER updated_at in [0, 50)",
+                                            "SORT BY updated_at (top 5)"]
@@ -0,0 +1,125 @@
+"""Primary/follower replication over loopback: catch-up, resuming from the last applied seq, and promotion."""
+import socket
+import time
+from collections import Counter
+
+import pytest
+
+pytestmark = pytest.mark.filterwarnings("ignore::vms.ScheduleConflictWarning")  # Followers load the synthetic overlaps too
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def statuses(system):
+    return {a.app_id: a.status for a in system.applications}
+
+
+def unused_address():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()
+
+
+@pytest.fixture
+def primary(vms, tmp_path):
+    path = str(tmp_path / "primary.json")
+    vms.write_synthetic_file(path, "compact", n_volunteers=40, n_recruiters=4, n_opportunities=30, n_applications=200)
+    with pytest.warns(vms.ScheduleConflictWarning):
+        system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, codec="compact", fsync="never")
+    server = system.enable_replication(backlog=5)
+    yield system
+    server.close()
+    system.close()
+
+
+@pytest.fixture
+def make_follower(vms, tmp_path):
+    followers = []
+    def make(address, **options):
+        system = vms.VolunteerSystem(str(tmp_path / f"replica{len(followers)}.json"), hash_workers=1, codec="compact", fsync="never")
+        follower = vms.ReplicaFollower(system, address, **options)
+        applied = []
+        apply = follower.apply
+        def recording_apply(entries):
+            applied.append(list(entries))
+            apply(entries)
+        follower.apply = recording_apply  # Lets tests see whether a snapshot or journal entries arrived
+        follower.applied_batches = applied
+        followers.append(follower)
+        return follower
+    yield make
+    for follower in followers:
+        follower.close()
+        if follower.server is not None:
+            follower.server.close()
+        follower.system.close()
+
+
+def decide(system, count, status="Rejected"):
+    for app in [a for a in system.applications if a.status == "Pending"][:count]:
+        system.set_application_status_many([(app, status)], app.posted_by)
+
+
+def caught_up(follower, primary):
+    return follower.applied_seq == primary.replication.seq and statuses(follower.system) == statuses(primary)
+
+
+def test_follower_catches_up_and_stays_read_only(vms, primary, make_follower):
+    follower = make_follower(primary.replication.server_address)
+    wait_for(lambda: caught_up(follower, primary))
+    assert "snapshot" in follower.applied_batches[0][0]  # First contact: full snapshot
+    decide(primary, 3)
+    wait_for(lambda: caught_up(follower, primary))
+    assert len(follower.system.users) == len(primary.users) and len(follower.system.opportunities) == len(primary.opportunities)
+    assert follower.system.check_status_counters() == []
+    with pytest.raises(vms.ReadOnlyReplicaError):
+        follower.system.save()
+    wait_for(lambda: all(f['lag_entries'] == 0 for f in primary.replication.status()['followers'].values()))
+
+
+def test_follower_resumes_from_its_last_applied_seq(primary, make_follower):
+    follower = make_follower(primary.replication.server_address)
+    wait_for(lambda: caught_up(follower, primary))
+    resumed_from = follower.applied_seq
+    address, follower.primary_address = follower.primary_address, unused_address()  # Keep it away while the primary moves on
+    follower._sock.shutdown(socket.SHUT_RDWR)
+    wait_for(lambda: not follower.connected)
+    decide(primary, 3)  # Fewer entries than the primary's backlog
+    batches = len(follower.applied_batches)
+    follower.primary_address = address
+    wait_for(lambda: caught_up(follower, primary))
+    entries = [entry for batch in follower.applied_batches[batches:] for entry in batch]
+    assert not any("snapshot" in entry for entry in entries)
+    assert [entry['seq'] for entry in entries] == list(range(resumed_from + 1, primary.replication.seq + 1))
+
+
+def test_follower_too_far_behind_gets_a_snapshot(primary, make_follower):
+    follower = make_follower(primary.replication.server_address)
+    wait_for(lambda: caught_up(follower, primary))
+    address, follower.primary_address = follower.primary_address, unused_address()
+    follower._sock.shutdown(socket.SHUT_RDWR)
+    wait_for(lambda: not follower.connected)
+    decide(primary, 8)  # More entries than the backlog of 5 keeps
+    batches = len(follower.applied_batches)
+    follower.primary_address = address
+    wait_for(lambda: caught_up(follower, primary))
+    assert "snapshot" in follower.applied_batches[batches][0]
+
+
+def test_follower_promotes_itself_and_serves_followers(primary, make_follower):
+    follower = make_follower(primary.replication.server_address, promote_after=0.5, serve_address=("127.0.0.1", 0))
+    wait_for(lambda: caught_up(follower, primary))
+    expected, seq = statuses(primary), primary.replication.seq
+    primary.replication.close()  # Primary fails
+    wait_for(lambda: follower.promoted)
+    assert not follower.system.read_only and follower.server.seq == seq  # Journal numbering carries on
+    assert statuses(follower.system) == expected
+    decide(follower.system, 2, "Accepted")  # Writable now, and the writes are replicated onward
+    second = make_follower(follower.server.server_address)
+    wait_for(lambda: caught_up(second, follower.system))
+    assert Counter(statuses(second.system).values()) == Counter(statuses(follower.system).values())
@@ -0,0 +1,68 @@
+"""Accepted commitments never double-book a volunteer, through decisions, expiry and archiving."""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def system(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    users = [{'name': "Rita Recruit", 'email': "rita@example.org", 'phone': "0211234567", 'age': 40, 'username': "rita",
+              'password': "Passw0rd", 'role': "Recruit", 'disabilities': ""},
+             {'name': "Ann Volunteer", 'email': "ann@example.org", 'phone': "0211234567", 'age': 30, 'username': "ann",
+              'password': "Passw0rd", 'role': "Volunteer", 'disabilities': ""}]
+    opportunities = [{'title': title, 'description': "Help out", 'location': "Nelson", 'date': "01/06/30", 'posted_by': "rita"}
+                     for title in ("Beach cleanup", "Tree planting")]
+    applications = [{'username': "ann", 'opportunity_title': "Beach cleanup", 'posted_by': "rita", 'status': "Accepted"},  # Legacy: no updated_at
+                    {'username': "ann", 'opportunity_title': "Tree planting", 'posted_by': "rita", 'status': "Pending"}]
+    vms.write_json_file(path, {'users': users, 'opportunities': opportunities, 'applications': applications}, "compact")
+    system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    yield system
+    system.close()
+
+
+def app_for(system, title):
+    return next(a for a in system.applications if a.opportunity_title == title)
+
+
+def test_long_commitment_hides_no_clash(vms):
+    index = vms.ScheduleIndex()
+    index.add("ann", 0, 100, "long")
+    index.add("ann", 10, 20, "short")
+    assert index.conflict("ann", 50, 60) == "long"  # The previous interval [10,20) ends first; [0,100) still overlaps
+    assert index.conflict("ann", 50, 60, ignore="long") is None
+    assert index.conflict("ann", 100, 110) is None
+    assert index.overlaps() == [("ann", "long", "short")]
+
+
+def test_clashing_accept_is_refused_and_left_pending(vms, system):
+    pending = app_for(system, "Tree planting")
+    with pytest.raises(vms.ScheduleConflictError):
+        system._change_status(pending, "Accepted", "rita")
+    index = system.get_applications_for_recruit("rita").index(pending)
+    ok, msg = system.set_application_status(index, "Accepted", "rita")
+    assert not ok and "Beach cleanup" in msg
+    assert pending.status == "Pending"
+    assert system.check_integrity() == []
+
+
+def test_expiry_leaves_clashing_accept_open(system):
+    closed, resolved = system.expire_opportunities(now=time.time() + 10 * 365 * 86400, resolve_as="Accepted")
+    assert len(closed) == 2 and resolved == []
+    assert app_for(system, "Tree planting").status == "Pending"
+
+
+def test_archive_keeps_upcoming_commitment(vms, system):
+    assert system.archive_closed_applications(max_age_days=30, now=time.time() + 40 * 86400) == 0
+    accepted = app_for(system, "Beach cleanup")
+    assert [app for _, _, app in system.get_schedule("ann")] == [accepted]
+    index = system.get_applications_for_recruit("rita").index(app_for(system, "Tree planting"))
+    ok, _ = system.set_application_status(index, "Accepted", "rita")
+    assert not ok
+    assert system.check_integrity() == []
+
+
+def test_archive_takes_commitment_once_event_has_passed(system):
+    after_event = time.mktime((2030, 6, 3, 0, 0, 0, 0, 0, -1))
+    assert system.archive_closed_applications(max_age_days=30, now=after_event) == 1
+    assert system.get_schedule("ann") == []
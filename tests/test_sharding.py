@@ -0,0 +1,43 @@
+"""Sharded storage: a dashboard loads only its recruiter's shard, and a save rewrites only the shards it touched."""
+import os
+
+
+def write_store(vms, path):
+    users = [{'name': f"Rec {name}", 'email': f"{name}@example.org", 'phone': "0211234567", 'age': 40, 'username': name,
+              'password': "Passw0rd", 'role': "Recruit", 'disabilities': ""} for name in ("rita", "sam")]
+    users += [{'name': f"Vol {name}", 'email': f"{name}@example.org", 'phone': "0211234567", 'age': 30, 'username': name,
+               'password': "Passw0rd", 'role': "Volunteer", 'disabilities': ""} for name in ("ann", "ben")]
+    opportunities = [{'title': f"Cleanup {recruiter}", 'description': "Help out", 'location': "Nelson", 'date': "01/06/30",
+                      'posted_by': recruiter} for recruiter in ("rita", "sam")]
+    applications = [{'username': name, 'opportunity_title': f"Cleanup {recruiter}", 'posted_by': recruiter, 'status': "Pending"}
+                    for recruiter in ("rita", "sam") for name in ("ann", "ben")]
+    vms.write_json_file(path, {'users': users, 'opportunities': opportunities, 'applications': applications}, "compact")
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_recruiter_shard_loads_and_saves_alone(vms, tmp_path):
+    source, directory = str(tmp_path / "data.json"), str(tmp_path / "shards")
+    write_store(vms, source)
+    system = vms.VolunteerSystem(source, hash_workers=1, fsync="never")
+    system.store = vms.ShardedStore(directory, codec="compact", fsync="never")  # As convert_to_shards does
+    system.save()
+    system.close()
+    others = [os.path.join(directory, name) for name in ("users.json", "manifest.json", system.store.shard_name("sam"))]
+    before = [read_bytes(path) for path in others]
+
+    system = vms.VolunteerSystem(directory, hash_workers=1, storage="sharded", recruiter="rita", fsync="never")
+    assert len(system.users) == 4
+    assert {o.posted_by for o in system.opportunities} == {a.posted_by for a in system.applications} == {"rita"}
+    app = system.applications[0]
+    assert system.set_application_status_many([(app, "Accepted")], "rita")[0][0]
+    system.close()
+    assert [read_bytes(path) for path in others] == before  # Only rita's shard was rewritten
+
+    system = vms.VolunteerSystem(directory, hash_workers=1, storage="sharded", fsync="never")
+    assert sorted((a.posted_by, a.username, a.status) for a in system.applications) == [
+        ("rita", "ann", "Accepted"), ("rita", "ben", "Pending"), ("sam", "ann", "Pending"), ("sam", "ben", "Pending")]
+    system.close()
@@ -0,0 +1,52 @@
+"""ReadSnapshot shares the live lists instead of copying them and still reads a fixed point in time."""
+import pytest
+
+
+@pytest.fixture
+def system(vms, tmp_path):
+    path = str(tmp_path / "data.json")
+    vms.write_synthetic_file(path, "compact", n_volunteers=40, n_recruiters=4, n_opportunities=30, n_applications=200)
+    with pytest.warns(vms.ScheduleConflictWarning):
+        system = vms.VolunteerSystem(path, hash_iterations=1000, hash_workers=1, fsync="never")
+    yield system
+    system.close()
+
+
+def statuses(records):
+    return [(r.app_id, r.status) for r in records]
+
+
+def test_snapshot_reads_without_copying(system):
+    with system.read_snapshot() as snapshot:
+        assert snapshot._apps is system.applications
+        before = statuses(snapshot.applications())
+        stream = snapshot.applications()
+        first = next(stream)
+        volunteer = next(u for u in system.users if u.role == "Volunteer")
+        applied = {(a.posted_by, a.opportunity_title) for a in volunteer.my_applications}
+        index = next(i for i, o in enumerate(system.opportunities) if (o.posted_by, o.title) not in applied)
+        assert system.apply_to_opportunity(volunteer, index)[0] is not None  # Appends while a read is streaming
+        assert statuses([first, *stream]) == before
+        assert snapshot._apps is system.applications  # Appending never forced a copy
+
+
+def test_snapshot_survives_reorder_and_status_changes(system):
+    recruiter = next(a.posted_by for a in system.applications if a.status == "Pending")
+    with system.read_snapshot() as snapshot:
+        before = statuses(snapshot.applications())
+        app, _ = system.process_next_pending(recruiter)
+        system.finish_pending(app)  # Back to the front of a new list
+        system.set_application_status_many([(a, "Rejected") for a in system.get_applications_for_recruit(recruiter)[:5]], recruiter)
+        assert snapshot._apps is not system.applications
+        assert statuses(snapshot.applications()) == before
+
+
+def test_applicant_rows_release_their_snapshot(system):
+    recruiter = system.applications[0].posted_by
+    rows = list(system.iter_applicant_rows(recruiter))
+    assert rows and len(system._snapshots) == 0
+    stream = system.iter_applicant_rows(recruiter)
+    next(stream)
+    assert len(system._snapshots) == 1
+    stream.close()  # Abandoned part-way, e.g. the client went away
+    assert len(system._snapshots) == 0